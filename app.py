@@ -6,522 +6,32 @@ Similar to AlphaStreet style
 
 import streamlit as st
 import json
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
-import re
-import base64
-import io
-
-# Try to import anthropic, but make it optional for demo mode
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
-
-
-# Demo data for testing without API key
-DEMO_FINANCIAL_DATA = {
-    "company_name": "Apple Inc.",
-    "ticker": "AAPL",
-    "quarter": "Q4",
-    "fiscal_year": "FY2024",
-    "report_date": datetime.now().strftime("%Y-%m-%d"),
-    "current_quarter": {
-        "revenue": {"value": 89500, "currency": "USD"},
-        "net_income": {"value": 22956, "currency": "USD"},
-        "eps": {"value": 1.46, "diluted": True},
-        "gross_margin": {"value": 45.2},
-        "operating_income": {"value": 26885, "currency": "USD"}
-    },
-    "year_over_year": {
-        "revenue_change": 6.0,
-        "eps_change": 13.2,
-        "net_income_change": 10.5
-    },
-    "quarter_over_quarter": {
-        "revenue_change": 2.3,
-        "eps_change": 4.1
-    },
-    "estimates": {
-        "revenue_estimate": 87200,
-        "eps_estimate": 1.39,
-        "revenue_beat": True,
-        "eps_beat": True
-    },
-    "guidance": {
-        "next_quarter_revenue": {"low": 92000, "high": 96000},
-        "full_year_revenue": {"low": 380000, "high": 395000},
-        "next_quarter_eps": {"low": 1.50, "high": 1.58}
-    },
-    "historical_quarters": [
-        {"quarter": "Q1 FY24", "revenue": 81800, "eps": 1.29},
-        {"quarter": "Q2 FY24", "revenue": 84300, "eps": 1.33},
-        {"quarter": "Q3 FY24", "revenue": 87500, "eps": 1.40},
-        {"quarter": "Q4 FY24", "revenue": 89500, "eps": 1.46}
-    ],
-    "key_highlights": [
-        "iPhone revenue reached $43.8 billion, up 5% YoY",
-        "Services segment hit all-time high of $22.2 billion, growing 14% YoY",
-        "Returned $25 billion to shareholders through dividends and buybacks",
-        "Strong cash position of $162 billion"
-    ],
-    "segment_performance": [
-        {"segment": "iPhone", "revenue": 43800, "growth": 5.0},
-        {"segment": "Services", "revenue": 22200, "growth": 14.0},
-        {"segment": "Wearables", "revenue": 9000, "growth": -2.0},
-        {"segment": "Mac", "revenue": 7600, "growth": 3.0},
-        {"segment": "iPad", "revenue": 7000, "growth": 8.0}
-    ],
-    "ceo_quote": "We're thrilled to report another record-breaking quarter with strong performance across our product lineup and services.",
-    "outlook": "We expect continued growth driven by our services segment and upcoming product launches."
-}
-
-DEMO_ARTICLE_DATA = {
-    "headline": "Apple Q4 FY2024 Earnings Beat: Revenue Up 6% to $89.5B, EPS Surges 13%",
-    "subheadline": "Services segment hits all-time high as iPhone sales remain strong",
-    "lead": "Apple Inc. (NASDAQ: AAPL) reported stellar fourth-quarter results that exceeded Wall Street expectations, with revenue climbing 6% year-over-year to $89.5 billion and earnings per share jumping 13% to $1.46. The tech giant's performance was driven by robust iPhone sales and a record-breaking quarter for its high-margin Services business.",
-    "key_numbers": "Revenue of $89.5 billion topped analyst estimates of $87.2 billion, representing a $2.3 billion beat. Diluted EPS of $1.46 crushed the consensus estimate of $1.39 by 5%. Gross margin expanded to 45.2% from 44.5% in the year-ago quarter, reflecting improved operational efficiency and favorable product mix. The company generated operating income of $26.9 billion, up 8% year-over-year.",
-    "segment_details": "iPhone remained the largest revenue contributor at $43.8 billion, up 5% YoY despite a challenging smartphone market. The Services segment was the star performer, hitting an all-time high of $22.2 billion with 14% growth, driven by App Store, Apple Music, and iCloud subscriptions. Mac revenue came in at $7.6 billion (+3%), while iPad saw an 8% increase to $7.0 billion. Wearables, Home and Accessories declined 2% to $9.0 billion amid market saturation.",
-    "management_commentary": "CEO Tim Cook expressed optimism about the company's trajectory: 'We're thrilled to report another record-breaking quarter with strong performance across our product lineup and services. Our ecosystem continues to expand, and customer satisfaction remains at all-time highs.' CFO Luca Maestri highlighted the company's capital return program, noting that Apple returned $25 billion to shareholders this quarter through dividends and share repurchases.",
-    "outlook": "For Q1 FY2025, Apple guided revenue between $92 billion and $96 billion, representing 5-8% year-over-year growth. EPS is expected in the range of $1.50 to $1.58. Management expressed confidence in the upcoming holiday season, citing strong demand for the new iPhone lineup and continued momentum in Services. The company maintains a robust cash position of $162 billion, providing flexibility for future investments and shareholder returns.",
-    "conclusion": "Apple's Q4 results demonstrate the company's ability to deliver consistent growth despite macroeconomic headwinds. With a diversified revenue base, expanding services ecosystem, and loyal customer base, Apple remains well-positioned for continued success. The stock gained 2% in after-hours trading following the earnings release.",
-    "read_time": 4
-}
-
-# Page configuration
-st.set_page_config(
-    page_title="Earnings News Generator",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
+import os
+import threading
+import uuid
+
+# Heavy libraries (plotly, pandas, anthropic) are imported inside the functions
+# that need them; the modules below are cached after the first run
+import charts
+import dedup
+from checkpoints import CheckpointStore, article_inputs, extract_inputs
+from consensus import ConsensusStore, attach_consensus
+from demo import DEMO_FINANCIAL_DATA, DEMO_ARTICLE_DATA
+from hedging import HEDGE_ENABLED, get_hedger
+from history import ReportHistory, format_bytes
+from memprofile import MEMPROFILE_ENABLED, MemoryProfile, top_allocations, traced_memory
+from nlg import write_article, rewrite_sections, polish_article
+from pipeline import MODEL, ANTHROPIC_AVAILABLE, create_client, extract_financial_data, generate_news_article
+from ratelimit import RETRY_STATUSES, session_scope
+from report import (
+    generate_full_html_report, generate_email_html, generate_json_export,
+    generate_article_text, generate_metrics_csv
 )
-
-# Custom CSS for AlphaStreet-style news
-st.markdown("""
-<style>
-    .news-container {
-        background: #ffffff;
-        border-radius: 12px;
-        padding: 30px;
-        box-shadow: 0 2px 12px rgba(0,0,0,0.08);
-        margin-bottom: 20px;
-    }
-    .news-headline {
-        font-size: 32px;
-        font-weight: 700;
-        color: #1a1a2e;
-        line-height: 1.3;
-        margin-bottom: 15px;
-    }
-    .news-meta {
-        display: flex;
-        gap: 20px;
-        color: #666;
-        font-size: 14px;
-        margin-bottom: 20px;
-        padding-bottom: 15px;
-        border-bottom: 1px solid #eee;
-    }
-    .company-ticker {
-        background: #0066cc;
-        color: white;
-        padding: 4px 12px;
-        border-radius: 4px;
-        font-weight: 600;
-        font-size: 14px;
-    }
-    .news-body {
-        font-size: 17px;
-        line-height: 1.8;
-        color: #333;
-    }
-    .news-body p {
-        margin-bottom: 16px;
-    }
-    .metric-card {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 12px;
-        padding: 20px;
-        color: white;
-        text-align: center;
-        height: 100%;
-    }
-    .metric-card.green {
-        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-    }
-    .metric-card.blue {
-        background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
-    }
-    .metric-card.orange {
-        background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
-    }
-    .metric-card.red {
-        background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
-    }
-    .metric-value {
-        font-size: 28px;
-        font-weight: 700;
-        margin: 10px 0;
-    }
-    .metric-label {
-        font-size: 14px;
-        opacity: 0.9;
-    }
-    .metric-change {
-        font-size: 14px;
-        margin-top: 8px;
-    }
-    .change-positive {
-        color: #00ff88;
-    }
-    .change-negative {
-        color: #ff6b6b;
-    }
-    .highlight-box {
-        background: #f8f9fa;
-        border-left: 4px solid #0066cc;
-        padding: 15px 20px;
-        margin: 20px 0;
-        border-radius: 0 8px 8px 0;
-    }
-    .section-title {
-        font-size: 20px;
-        font-weight: 600;
-        color: #1a1a2e;
-        margin: 25px 0 15px 0;
-    }
-    .comparison-table {
-        width: 100%;
-        border-collapse: collapse;
-        margin: 15px 0;
-    }
-    .comparison-table th {
-        background: #f8f9fa;
-        padding: 12px;
-        text-align: left;
-        font-weight: 600;
-        border-bottom: 2px solid #dee2e6;
-    }
-    .comparison-table td {
-        padding: 12px;
-        border-bottom: 1px solid #eee;
-    }
-    .beat {
-        color: #28a745;
-        font-weight: 600;
-    }
-    .miss {
-        color: #dc3545;
-        font-weight: 600;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-
-def extract_financial_data(client, transcript):
-    """Use Claude to extract structured financial data from transcript"""
-
-    extraction_prompt = """Analyze this earnings call transcript and extract the following information in JSON format:
-
-{
-    "company_name": "Full company name",
-    "ticker": "Stock ticker symbol (e.g., AAPL)",
-    "quarter": "Q1/Q2/Q3/Q4",
-    "fiscal_year": "FY2024/FY2025 etc",
-    "report_date": "Date mentioned or today",
-
-    "current_quarter": {
-        "revenue": {"value": number in millions, "currency": "USD"},
-        "net_income": {"value": number in millions, "currency": "USD"},
-        "eps": {"value": number, "diluted": true/false},
-        "gross_margin": {"value": percentage number},
-        "operating_income": {"value": number in millions, "currency": "USD"}
-    },
-
-    "year_over_year": {
-        "revenue_change": percentage number (positive or negative),
-        "eps_change": percentage number,
-        "net_income_change": percentage number
-    },
-
-    "quarter_over_quarter": {
-        "revenue_change": percentage number,
-        "eps_change": percentage number
-    },
-
-    "estimates": {
-        "revenue_estimate": number in millions or null,
-        "eps_estimate": number or null,
-        "revenue_beat": true/false/null,
-        "eps_beat": true/false/null
-    },
-
-    "guidance": {
-        "next_quarter_revenue": {"low": number, "high": number} or null,
-        "full_year_revenue": {"low": number, "high": number} or null,
-        "next_quarter_eps": {"low": number, "high": number} or null
-    },
-
-    "historical_quarters": [
-        {"quarter": "Q4 2024", "revenue": number, "eps": number},
-        {"quarter": "Q3 2024", "revenue": number, "eps": number},
-        {"quarter": "Q2 2024", "revenue": number, "eps": number},
-        {"quarter": "Q1 2024", "revenue": number, "eps": number}
-    ],
-
-    "key_highlights": [
-        "Important bullet point 1",
-        "Important bullet point 2",
-        "Important bullet point 3"
-    ],
-
-    "segment_performance": [
-        {"segment": "Segment Name", "revenue": number, "growth": percentage}
-    ],
-
-    "ceo_quote": "Notable quote from CEO if available",
-    "outlook": "Brief outlook/guidance summary"
-}
-
-If any data is not available in the transcript, use null. Extract numbers without currency symbols.
-For historical quarters, estimate or use any mentioned comparative figures.
-
-TRANSCRIPT:
-""" + transcript
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=4000,
-        messages=[{"role": "user", "content": extraction_prompt}]
-    )
-
-    # Extract JSON from response
-    response_text = response.content[0].text
-
-    # Try to find JSON in the response
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if json_match:
-        try:
-            return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            st.error("Failed to parse financial data. Please try again.")
-            return None
-    return None
-
-
-def generate_news_article(client, financial_data, transcript):
-    """Generate professional news article from extracted data"""
-
-    article_prompt = f"""Based on this earnings data and transcript, write a professional financial news article in AlphaStreet style.
-
-FINANCIAL DATA:
-{json.dumps(financial_data, indent=2)}
-
-ORIGINAL TRANSCRIPT (for context):
-{transcript[:3000]}...
-
-Write the article with these sections:
-1. HEADLINE: Catchy, informative headline mentioning company, quarter, and key result (beat/miss)
-2. LEAD: 2-3 sentence summary of the key results
-3. KEY NUMBERS: Paragraph detailing revenue, EPS, and comparisons
-4. SEGMENT DETAILS: Performance by business segment if available
-5. MANAGEMENT COMMENTARY: Include CEO/CFO quotes or paraphrased insights
-6. OUTLOOK: Forward-looking guidance and expectations
-7. CONCLUSION: Brief wrap-up with stock context
-
-Format the response as JSON:
-{{
-    "headline": "The headline text",
-    "subheadline": "Optional subheadline",
-    "lead": "Opening paragraph",
-    "key_numbers": "Detailed numbers paragraph",
-    "segment_details": "Segment performance paragraph",
-    "management_commentary": "Quotes and insights paragraph",
-    "outlook": "Guidance and outlook paragraph",
-    "conclusion": "Closing paragraph",
-    "read_time": estimated minutes to read (number)
-}}
-
-Write in professional financial journalism style - factual, clear, and engaging."""
-
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=3000,
-        messages=[{"role": "user", "content": article_prompt}]
-    )
-
-    response_text = response.content[0].text
-    json_match = re.search(r'\{[\s\S]*\}', response_text)
-    if json_match:
-        try:
-            return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            return None
-    return None
-
-
-def create_revenue_chart(financial_data):
-    """Create revenue trend chart"""
-    historical = financial_data.get('historical_quarters', [])
-
-    if not historical:
-        # Create sample data if not available
-        current_rev = financial_data.get('current_quarter', {}).get('revenue', {}).get('value', 100)
-        yoy_change = financial_data.get('year_over_year', {}).get('revenue_change', 5) or 5
-
-        historical = [
-            {"quarter": "Q1", "revenue": current_rev * 0.9},
-            {"quarter": "Q2", "revenue": current_rev * 0.95},
-            {"quarter": "Q3", "revenue": current_rev * 0.98},
-            {"quarter": "Q4", "revenue": current_rev},
-        ]
-
-    quarters = [h['quarter'] for h in historical]
-    revenues = [h.get('revenue', 0) for h in historical]
-
-    fig = go.Figure()
-
-    # Bar chart for revenue
-    fig.add_trace(go.Bar(
-        x=quarters,
-        y=revenues,
-        marker_color=['#4facfe', '#4facfe', '#4facfe', '#00f2fe'],
-        text=[f"${r:,.0f}M" if r else "" for r in revenues],
-        textposition='outside',
-        name='Revenue'
-    ))
-
-    # Add trend line
-    fig.add_trace(go.Scatter(
-        x=quarters,
-        y=revenues,
-        mode='lines+markers',
-        line=dict(color='#ff6b6b', width=3),
-        marker=dict(size=10),
-        name='Trend'
-    ))
-
-    fig.update_layout(
-        title=dict(text='Quarterly Revenue Trend', font=dict(size=20)),
-        xaxis_title='Quarter',
-        yaxis_title='Revenue ($ Millions)',
-        template='plotly_white',
-        height=400,
-        showlegend=False,
-        margin=dict(t=50, b=50, l=50, r=50)
-    )
-
-    return fig
-
-
-def create_eps_chart(financial_data):
-    """Create EPS trend chart"""
-    historical = financial_data.get('historical_quarters', [])
-
-    if not historical:
-        current_eps = financial_data.get('current_quarter', {}).get('eps', {}).get('value', 1.0)
-        historical = [
-            {"quarter": "Q1", "eps": current_eps * 0.85},
-            {"quarter": "Q2", "eps": current_eps * 0.90},
-            {"quarter": "Q3", "eps": current_eps * 0.95},
-            {"quarter": "Q4", "eps": current_eps},
-        ]
-
-    quarters = [h['quarter'] for h in historical]
-    eps_values = [h.get('eps', 0) for h in historical]
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=quarters,
-        y=eps_values,
-        mode='lines+markers+text',
-        fill='tozeroy',
-        fillcolor='rgba(102, 126, 234, 0.2)',
-        line=dict(color='#667eea', width=3),
-        marker=dict(size=12, color='#667eea'),
-        text=[f"${e:.2f}" if e else "" for e in eps_values],
-        textposition='top center',
-        name='EPS'
-    ))
-
-    fig.update_layout(
-        title=dict(text='Earnings Per Share Trend', font=dict(size=20)),
-        xaxis_title='Quarter',
-        yaxis_title='EPS ($)',
-        template='plotly_white',
-        height=400,
-        showlegend=False,
-        margin=dict(t=50, b=50, l=50, r=50)
-    )
-
-    return fig
-
-
-def create_segment_chart(financial_data):
-    """Create segment performance pie/bar chart"""
-    segments = financial_data.get('segment_performance', [])
-
-    if not segments:
-        return None
-
-    segment_names = [s['segment'] for s in segments]
-    segment_revenues = [s.get('revenue', 0) for s in segments]
-
-    fig = go.Figure(data=[go.Pie(
-        labels=segment_names,
-        values=segment_revenues,
-        hole=0.4,
-        marker_colors=px.colors.qualitative.Set2
-    )])
-
-    fig.update_layout(
-        title=dict(text='Revenue by Segment', font=dict(size=20)),
-        template='plotly_white',
-        height=400,
-        margin=dict(t=50, b=50, l=50, r=50)
-    )
-
-    return fig
-
-
-def create_comparison_chart(financial_data):
-    """Create YoY comparison chart"""
-    yoy = financial_data.get('year_over_year', {})
-
-    metrics = ['Revenue', 'EPS', 'Net Income']
-    changes = [
-        yoy.get('revenue_change', 0) or 0,
-        yoy.get('eps_change', 0) or 0,
-        yoy.get('net_income_change', 0) or 0
-    ]
-
-    colors = ['#38ef7d' if c >= 0 else '#ff4b2b' for c in changes]
-
-    fig = go.Figure(data=[go.Bar(
-        x=metrics,
-        y=changes,
-        marker_color=colors,
-        text=[f"{c:+.1f}%" for c in changes],
-        textposition='outside'
-    )])
-
-    fig.update_layout(
-        title=dict(text='Year-over-Year Change', font=dict(size=20)),
-        xaxis_title='Metric',
-        yaxis_title='Change (%)',
-        template='plotly_white',
-        height=400,
-        showlegend=False,
-        margin=dict(t=50, b=50, l=50, r=50)
-    )
-
-    # Add zero line
-    fig.add_hline(y=0, line_dash="dash", line_color="gray")
-
-    return fig
+from sections import flatten_fields, unflatten_fields, changed_fields, affected_sections, regenerate_sections
+from singleflight import SingleFlight
+from store import ReportStore, DEFAULT_DATA_DIR
+from styles import PAGE_CONFIG, APP_CSS
 
 
 def render_metric_card(label, value, change=None, color="blue", prefix="", suffix=""):
@@ -574,11 +84,14 @@ def render_comparison_table(financial_data):
     yoy = financial_data.get('year_over_year', {})
     estimates = financial_data.get('estimates', {})
 
-    revenue = current.get('revenue', {}).get('value', 'N/A')
-    eps = current.get('eps', {}).get('value', 'N/A')
+    revenue = current.get('revenue', {}).get('value')
+    eps = current.get('eps', {}).get('value')
+
+    revenue_est = estimates.get('revenue_estimate')
+    eps_est = estimates.get('eps_estimate')
 
-    revenue_est = estimates.get('revenue_estimate', 'N/A')
-    eps_est = estimates.get('eps_estimate', 'N/A')
+    def fmt(value, template):
+        return template.format(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 'N/A'
 
     revenue_beat = estimates.get('revenue_beat')
     eps_beat = estimates.get('eps_beat')
@@ -604,384 +117,54 @@ def render_comparison_table(financial_data):
         </tr>
         <tr>
             <td><strong>Revenue</strong></td>
-            <td>${revenue:,.0f}M</td>
-            <td>${revenue_est:,.0f}M</td>
-            <td>{yoy.get('revenue_change', 'N/A')}%</td>
+            <td>{fmt(revenue, '${:,.0f}M')}</td>
+            <td>{fmt(revenue_est, '${:,.0f}M')}</td>
+            <td>{fmt(yoy.get('revenue_change'), '{}%')}</td>
             <td class="{rev_class}">{rev_status}</td>
         </tr>
         <tr>
             <td><strong>EPS</strong></td>
-            <td>${eps:.2f}</td>
-            <td>${eps_est:.2f}</td>
-            <td>{yoy.get('eps_change', 'N/A')}%</td>
+            <td>{fmt(eps, '${:.2f}')}</td>
+            <td>{fmt(eps_est, '${:.2f}')}</td>
+            <td>{fmt(yoy.get('eps_change'), '{}%')}</td>
             <td class="{eps_class}">{eps_status}</td>
         </tr>
     </table>
     """, unsafe_allow_html=True)
 
 
-# Function to generate complete HTML report with all charts and data
-def generate_full_html_report(financial_data, article_data):
-    """Generate a complete HTML report with embedded charts"""
-
-    ticker = financial_data.get('ticker', 'N/A')
-    company = financial_data.get('company_name', 'Company')
-    quarter = financial_data.get('quarter', 'Q4')
-    fy = financial_data.get('fiscal_year', 'FY2024')
-    read_time = article_data.get('read_time', 3)
-
-    current = financial_data.get('current_quarter', {})
-    yoy = financial_data.get('year_over_year', {})
-    estimates = financial_data.get('estimates', {})
-
-    # Get metric values
-    revenue = current.get('revenue', {}).get('value', 0)
-    eps = current.get('eps', {}).get('value', 0)
-    margin = current.get('gross_margin', {}).get('value', 0)
-    net_income = current.get('net_income', {}).get('value', 0)
-
-    rev_change = yoy.get('revenue_change', 0) or 0
-    eps_change = yoy.get('eps_change', 0) or 0
-    ni_change = yoy.get('net_income_change', 0) or 0
-
-    revenue_est = estimates.get('revenue_estimate', 0) or 0
-    eps_est = estimates.get('eps_estimate', 0) or 0
-    revenue_beat = estimates.get('revenue_beat')
-    eps_beat = estimates.get('eps_beat')
-
-    # Generate charts as HTML
-    revenue_chart = create_revenue_chart(financial_data)
-    eps_chart = create_eps_chart(financial_data)
-    comparison_chart = create_comparison_chart(financial_data)
-    segment_chart = create_segment_chart(financial_data)
-
-    revenue_chart_html = revenue_chart.to_html(full_html=False, include_plotlyjs='cdn')
-    eps_chart_html = eps_chart.to_html(full_html=False, include_plotlyjs=False)
-    comparison_chart_html = comparison_chart.to_html(full_html=False, include_plotlyjs=False)
-    segment_chart_html = segment_chart.to_html(full_html=False, include_plotlyjs=False) if segment_chart else "<p>Segment data not available</p>"
-
-    # Beat/Miss status
-    def get_status(beat):
-        if beat is True:
-            return '<span style="color: #28a745; font-weight: bold;">BEAT ✓</span>'
-        elif beat is False:
-            return '<span style="color: #dc3545; font-weight: bold;">MISS ✗</span>'
-        return 'N/A'
-
-    # Key highlights
-    highlights_html = ""
-    for h in financial_data.get('key_highlights', []):
-        highlights_html += f"<li>{h}</li>"
-
-    # Segment table
-    segment_table = ""
-    for seg in financial_data.get('segment_performance', []):
-        growth_color = "#28a745" if seg.get('growth', 0) >= 0 else "#dc3545"
-        segment_table += f"""
-        <tr>
-            <td>{seg.get('segment', 'N/A')}</td>
-            <td>${seg.get('revenue', 0):,.0f}M</td>
-            <td style="color: {growth_color}">{seg.get('growth', 0):+.1f}%</td>
-        </tr>
-        """
-
-    html_report = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{ticker} {quarter} {fy} Earnings Report</title>
-    <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-    <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #f5f5f5;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-            color: white;
-            padding: 30px;
-            border-radius: 12px;
-            margin-bottom: 25px;
-        }}
-        .headline {{
-            font-size: 28px;
-            font-weight: 700;
-            margin-bottom: 10px;
-        }}
-        .meta {{
-            display: flex;
-            gap: 20px;
-            flex-wrap: wrap;
-            font-size: 14px;
-            opacity: 0.9;
-        }}
-        .ticker {{
-            background: #0066cc;
-            padding: 4px 12px;
-            border-radius: 4px;
-            font-weight: 600;
-        }}
-        .section {{
-            background: white;
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 20px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-        }}
-        .section-title {{
-            font-size: 20px;
-            font-weight: 600;
-            color: #1a1a2e;
-            margin-bottom: 15px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #0066cc;
-        }}
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(4, 1fr);
-            gap: 15px;
-            margin-bottom: 25px;
-        }}
-        .metric-card {{
-            border-radius: 12px;
-            padding: 20px;
-            color: white;
-            text-align: center;
-        }}
-        .metric-card.blue {{ background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); }}
-        .metric-card.green {{ background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); }}
-        .metric-card.orange {{ background: linear-gradient(135deg, #fa709a 0%, #fee140 100%); }}
-        .metric-card.purple {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); }}
-        .metric-label {{ font-size: 14px; opacity: 0.9; }}
-        .metric-value {{ font-size: 28px; font-weight: 700; margin: 10px 0; }}
-        .metric-change {{ font-size: 13px; }}
-        .change-positive {{ color: #00ff88; }}
-        .change-negative {{ color: #ff6b6b; }}
-        .charts-grid {{
-            display: grid;
-            grid-template-columns: repeat(2, 1fr);
-            gap: 20px;
-        }}
-        .chart-container {{
-            background: white;
-            border-radius: 12px;
-            padding: 15px;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.08);
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 15px 0;
-        }}
-        th, td {{
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #eee;
-        }}
-        th {{
-            background: #f8f9fa;
-            font-weight: 600;
-        }}
-        .highlight-box {{
-            background: #f0f7fb;
-            border-left: 4px solid #0066cc;
-            padding: 15px 20px;
-            margin: 15px 0;
-            border-radius: 0 8px 8px 0;
-        }}
-        .article-body {{
-            font-size: 16px;
-            line-height: 1.8;
-        }}
-        .article-body p {{
-            margin-bottom: 15px;
-        }}
-        ul {{
-            margin-left: 20px;
-        }}
-        li {{
-            margin-bottom: 8px;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            color: #666;
-            font-size: 12px;
-        }}
-        @media print {{
-            body {{ background: white; }}
-            .section {{ box-shadow: none; border: 1px solid #eee; }}
-            .chart-container {{ page-break-inside: avoid; }}
-        }}
-        @media (max-width: 768px) {{
-            .metrics-grid {{ grid-template-columns: repeat(2, 1fr); }}
-            .charts-grid {{ grid-template-columns: 1fr; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <div class="headline">{article_data.get('headline', 'Earnings Report')}</div>
-        <div class="meta">
-            <span class="ticker">{ticker}</span>
-            <span>{company}</span>
-            <span>{quarter} {fy}</span>
-            <span>📅 {datetime.now().strftime('%B %d, %Y')}</span>
-            <span>⏱️ {read_time} min read</span>
-        </div>
-    </div>
-
-    <!-- Key Metrics -->
-    <div class="section">
-        <div class="section-title">📊 Key Metrics</div>
-        <div class="metrics-grid">
-            <div class="metric-card blue">
-                <div class="metric-label">Revenue</div>
-                <div class="metric-value">${revenue:,.0f}M</div>
-                <div class="metric-change {'change-positive' if rev_change >= 0 else 'change-negative'}">
-                    {'▲' if rev_change >= 0 else '▼'} {abs(rev_change):.1f}% YoY
-                </div>
-            </div>
-            <div class="metric-card green">
-                <div class="metric-label">EPS</div>
-                <div class="metric-value">${eps:.2f}</div>
-                <div class="metric-change {'change-positive' if eps_change >= 0 else 'change-negative'}">
-                    {'▲' if eps_change >= 0 else '▼'} {abs(eps_change):.1f}% YoY
-                </div>
-            </div>
-            <div class="metric-card orange">
-                <div class="metric-label">Gross Margin</div>
-                <div class="metric-value">{margin:.1f}%</div>
-            </div>
-            <div class="metric-card purple">
-                <div class="metric-label">Net Income</div>
-                <div class="metric-value">${net_income:,.0f}M</div>
-                <div class="metric-change {'change-positive' if ni_change >= 0 else 'change-negative'}">
-                    {'▲' if ni_change >= 0 else '▼'} {abs(ni_change):.1f}% YoY
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <!-- Estimates vs Actual -->
-    <div class="section">
-        <div class="section-title">📋 Estimates vs Actual</div>
-        <table>
-            <tr>
-                <th>Metric</th>
-                <th>Actual</th>
-                <th>Estimate</th>
-                <th>YoY Change</th>
-                <th>Status</th>
-            </tr>
-            <tr>
-                <td><strong>Revenue</strong></td>
-                <td>${revenue:,.0f}M</td>
-                <td>${revenue_est:,.0f}M</td>
-                <td>{rev_change:+.1f}%</td>
-                <td>{get_status(revenue_beat)}</td>
-            </tr>
-            <tr>
-                <td><strong>EPS</strong></td>
-                <td>${eps:.2f}</td>
-                <td>${eps_est:.2f}</td>
-                <td>{eps_change:+.1f}%</td>
-                <td>{get_status(eps_beat)}</td>
-            </tr>
-        </table>
-    </div>
-
-    <!-- Performance Charts -->
-    <div class="section">
-        <div class="section-title">📈 Performance Charts</div>
-        <div class="charts-grid">
-            <div class="chart-container">
-                {revenue_chart_html}
-            </div>
-            <div class="chart-container">
-                {eps_chart_html}
-            </div>
-            <div class="chart-container">
-                {comparison_chart_html}
-            </div>
-            <div class="chart-container">
-                {segment_chart_html}
-            </div>
-        </div>
-    </div>
-
-    <!-- Segment Performance Table -->
-    <div class="section">
-        <div class="section-title">📊 Segment Performance</div>
-        <table>
-            <tr>
-                <th>Segment</th>
-                <th>Revenue</th>
-                <th>YoY Growth</th>
-            </tr>
-            {segment_table}
-        </table>
-    </div>
-
-    <!-- Article Content -->
-    <div class="section">
-        <div class="section-title">📰 Full Article</div>
-        <div class="article-body">
-            <p><strong>{article_data.get('lead', '')}</strong></p>
-            <p>{article_data.get('key_numbers', '')}</p>
-
-            <h3 style="margin-top: 20px; color: #1a1a2e;">Segment Performance</h3>
-            <p>{article_data.get('segment_details', '')}</p>
-
-            <h3 style="margin-top: 20px; color: #1a1a2e;">Management Commentary</h3>
-            <div class="highlight-box">
-                {article_data.get('management_commentary', '')}
-            </div>
-
-            <h3 style="margin-top: 20px; color: #1a1a2e;">Outlook & Guidance</h3>
-            <p>{article_data.get('outlook', '')}</p>
-
-            <h3 style="margin-top: 20px; color: #1a1a2e;">Conclusion</h3>
-            <p>{article_data.get('conclusion', '')}</p>
-        </div>
-    </div>
-
-    <!-- Key Highlights -->
-    <div class="section">
-        <div class="section-title">🎯 Key Highlights</div>
-        <ul>
-            {highlights_html}
-        </ul>
-    </div>
+@st.cache_data(max_entries=32, show_spinner=False)
+def report_downloads(financial_data, article_data):
+    """Export files for a report, shared by every session viewing it"""
+    return {
+        "report": generate_full_html_report(financial_data, article_data),
+        "revenue": charts.chart_html('revenue', financial_data),
+        "eps": charts.chart_html('eps', financial_data),
+        "comparison": charts.chart_html('comparison', financial_data),
+        "segment": charts.chart_html('segment', financial_data),
+        "json": generate_json_export(financial_data, article_data),
+        "text": generate_article_text(financial_data, article_data),
+        "csv": generate_metrics_csv(financial_data),
+        "email": generate_email_html(financial_data, article_data),
+    }
 
-    <div class="footer">
-        Generated by Earnings News Generator | {datetime.now().strftime('%B %d, %Y at %H:%M')}
-    </div>
-</body>
-</html>
-    """
-    return html_report
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def report_chart_specs(financial_data):
+    """Plotly figure specs for a report; each caller gets its own copy to build figures from"""
+    return {name: build(financial_data) for name, build in charts.CHART_SPECS.items()}
 
-# Function to display all results
-def display_results(financial_data, article_data):
-    """Display the news article and all infographics"""
 
-    # Display the news article
+# Each part of the results view is a fragment: a widget interaction inside one
+# (e.g. a download click) reruns only that part, not the whole app
+@st.fragment
+def render_article_fragment(financial_data, article_data):
     render_news_article(article_data, financial_data)
 
+
+@st.fragment
+def render_metrics_fragment(financial_data):
+    """Metric cards and estimates table"""
     # Key Metrics Cards
     st.markdown("### 📊 Key Metrics")
 
@@ -1037,32 +220,41 @@ def display_results(financial_data, article_data):
     st.markdown("### 📋 Estimates vs Actual")
     render_comparison_table(financial_data)
 
+
+@st.fragment
+def render_charts_fragment(financial_data):
+    """Performance charts"""
+    import plotly.graph_objects as go
+
+    with memory_stage("charts"):
+        figures = {name: go.Figure(spec) if spec else None for name, spec in report_chart_specs(financial_data).items()}
+
     # Charts Section
     st.markdown("### 📈 Performance Charts")
 
     chart_col1, chart_col2 = st.columns(2)
 
     with chart_col1:
-        revenue_chart = create_revenue_chart(financial_data)
-        st.plotly_chart(revenue_chart, use_container_width=True)
+        st.plotly_chart(figures['revenue'], use_container_width=True)
 
     with chart_col2:
-        eps_chart = create_eps_chart(financial_data)
-        st.plotly_chart(eps_chart, use_container_width=True)
+        st.plotly_chart(figures['eps'], use_container_width=True)
 
     chart_col3, chart_col4 = st.columns(2)
 
     with chart_col3:
-        comparison_chart = create_comparison_chart(financial_data)
-        st.plotly_chart(comparison_chart, use_container_width=True)
+        st.plotly_chart(figures['comparison'], use_container_width=True)
 
     with chart_col4:
-        segment_chart = create_segment_chart(financial_data)
-        if segment_chart:
-            st.plotly_chart(segment_chart, use_container_width=True)
+        if figures['segment']:
+            st.plotly_chart(figures['segment'], use_container_width=True)
         else:
             st.info("Segment data not available")
 
+
+@st.fragment
+def render_full_article_fragment(financial_data, article_data):
+    """Article sections and key highlights"""
     # Full Article Content
     st.markdown("### 📰 Full Article")
 
@@ -1091,20 +283,25 @@ def display_results(financial_data, article_data):
         for highlight in highlights:
             st.markdown(f"- {highlight}")
 
+
+@st.fragment
+def render_exports_fragment(financial_data, article_data):
+    """Download buttons; a click reruns only this fragment"""
     # Export options
     st.markdown("---")
     st.markdown("### 📥 Export Options")
 
     ticker = financial_data.get('ticker', 'earnings')
+    with memory_stage("exports"):
+        downloads = report_downloads(financial_data, article_data)
 
     # Main export - Full HTML Report
     st.markdown("#### 🌟 Complete Report (Recommended)")
     st.markdown("*Download the full report with all charts, metrics, and article - ready to print or convert to PDF*")
 
-    full_html_report = generate_full_html_report(financial_data, article_data)
     st.download_button(
         "📊 Download Complete HTML Report (All Charts + Article)",
-        full_html_report,
+        downloads['report'],
         file_name=f"{ticker}_earnings_report.html",
         mime="text/html",
         use_container_width=True,
@@ -1116,24 +313,18 @@ def display_results(financial_data, article_data):
     st.markdown("---")
     st.markdown("#### 📈 Individual Charts")
 
-    # Generate charts for download
-    revenue_chart = create_revenue_chart(financial_data)
-    eps_chart = create_eps_chart(financial_data)
-    comparison_chart = create_comparison_chart(financial_data)
-    segment_chart = create_segment_chart(financial_data)
-
     chart_col1, chart_col2 = st.columns(2)
 
     with chart_col1:
         st.download_button(
             "📊 Revenue Chart (HTML)",
-            revenue_chart.to_html(full_html=True, include_plotlyjs='cdn'),
+            downloads['revenue'],
             file_name=f"{ticker}_revenue_chart.html",
             mime="text/html"
         )
         st.download_button(
             "📈 YoY Comparison Chart (HTML)",
-            comparison_chart.to_html(full_html=True, include_plotlyjs='cdn'),
+            downloads['comparison'],
             file_name=f"{ticker}_yoy_comparison.html",
             mime="text/html"
         )
@@ -1141,14 +332,14 @@ def display_results(financial_data, article_data):
     with chart_col2:
         st.download_button(
             "💰 EPS Chart (HTML)",
-            eps_chart.to_html(full_html=True, include_plotlyjs='cdn'),
+            downloads['eps'],
             file_name=f"{ticker}_eps_chart.html",
             mime="text/html"
         )
-        if segment_chart:
+        if downloads['segment']:
             st.download_button(
                 "🥧 Segment Chart (HTML)",
-                segment_chart.to_html(full_html=True, include_plotlyjs='cdn'),
+                downloads['segment'],
                 file_name=f"{ticker}_segment_chart.html",
                 mime="text/html"
             )
@@ -1156,86 +347,557 @@ def display_results(financial_data, article_data):
     st.markdown("---")
     st.markdown("#### 📄 Data Exports")
 
-    data_col1, data_col2, data_col3 = st.columns(3)
+    data_col1, data_col2, data_col3, data_col4 = st.columns(4)
 
     with data_col1:
         # Export as JSON
-        export_data = {
-            "financial_data": financial_data,
-            "article": article_data,
-            "generated_at": datetime.now().isoformat()
-        }
         st.download_button(
             "📄 Download JSON Data",
-            json.dumps(export_data, indent=2, default=str),
+            downloads['json'],
             file_name=f"{ticker}_data.json",
             mime="application/json"
         )
 
     with data_col2:
         # Export article as text
-        article_text = f"""
-{article_data.get('headline', '')}
-{'=' * 60}
+        st.download_button(
+            "📝 Download Article (TXT)",
+            downloads['text'],
+            file_name=f"{ticker}_article.txt",
+            mime="text/plain"
+        )
+
+    with data_col3:
+        # Export metrics as CSV
+        st.download_button(
+            "📊 Download Metrics (CSV)",
+            downloads['csv'],
+            file_name=f"{ticker}_metrics.csv",
+            mime="text/csv"
+        )
 
-{article_data.get('lead', '')}
+    with data_col4:
+        # Export article with static SVG charts for email
+        st.download_button(
+            "✉️ Download Email HTML (SVG)",
+            downloads['email'],
+            file_name=f"{ticker}_email.html",
+            mime="text/html"
+        )
 
-KEY NUMBERS
-{'-' * 40}
-{article_data.get('key_numbers', '')}
 
-SEGMENT PERFORMANCE
-{'-' * 40}
-{article_data.get('segment_details', '')}
+# Function to display all results
+def display_results(financial_data, article_data):
+    """Display the news article and all infographics"""
+    render_article_fragment(financial_data, article_data)
+    render_metrics_fragment(financial_data)
+    render_charts_fragment(financial_data)
+    render_full_article_fragment(financial_data, article_data)
+    render_exports_fragment(financial_data, article_data)
 
-MANAGEMENT COMMENTARY
-{'-' * 40}
-{article_data.get('management_commentary', '')}
 
-OUTLOOK & GUIDANCE
-{'-' * 40}
-{article_data.get('outlook', '')}
+@st.cache_resource
+def get_report_store():
+    """Process-wide store of processed reports"""
+    return ReportStore(DEFAULT_DATA_DIR)
 
-CONCLUSION
-{'-' * 40}
-{article_data.get('conclusion', '')}
 
-KEY HIGHLIGHTS
-{'-' * 40}
-""" + "\n".join([f"• {h}" for h in financial_data.get('key_highlights', [])])
+@st.cache_resource
+def get_fingerprint_index():
+    """Process-wide near-duplicate index over stored transcripts"""
+    return dedup.FingerprintIndex(os.path.join(DEFAULT_DATA_DIR, "fingerprints.jsonl"))
 
-        st.download_button(
-            "📝 Download Article (TXT)",
-            article_text,
-            file_name=f"{ticker}_article.txt",
-            mime="text/plain"
+
+@st.cache_resource
+def get_season_dashboard():
+    """Process-wide dashboard frames, refreshed incrementally from the report store"""
+    from dashboard import SeasonDashboard
+    return SeasonDashboard(get_report_store())
+
+
+@st.cache_resource
+def get_consensus_store():
+    """Process-wide consensus estimates by ticker and fiscal period"""
+    return ConsensusStore(DEFAULT_DATA_DIR)
+
+
+@st.cache_resource
+def get_checkpoints():
+    """Process-wide durable stage outputs, so failed generations resume where they stopped"""
+    return CheckpointStore(DEFAULT_DATA_DIR)
+
+
+@st.cache_resource
+def get_parquet_archive():
+    """Process-wide columnar archive of stored reports for analytics"""
+    from parquet_archive import ParquetArchive, ARCHIVE_DIR
+    return ParquetArchive(os.path.join(DEFAULT_DATA_DIR, ARCHIVE_DIR))
+
+
+def archive_reports():
+    """Bring the Parquet archive up to date with the report store, off the request path"""
+    threading.Thread(target=get_parquet_archive().sync, args=(get_report_store(),), daemon=True).start()
+
+
+@st.cache_resource
+def get_generation_flights():
+    """Process-wide single-flight group for report generation"""
+    return SingleFlight()
+
+
+ARTICLE_WRITERS = {
+    "claude": "Claude",
+    "template": "Templates (instant, no API call)",
+    "polish": "Templates + Claude polish",
+}
+
+
+def generate_report(api_key, transcript, fingerprint, digest, writer="claude", parallel=False):
+    """Extract, derive, write and store one report; returns its parts or an error message
+
+    Each stage is checkpointed, so a retry after a failure resumes from the
+    last completed one; "resumed" lists the stages that were reused. The
+    checkpoints are discarded once the report is stored.
+    """
+    from metrics import apply_derived_metrics
+
+    client = create_client(api_key)
+    checkpoints = get_checkpoints()
+    resumed = []
+    run_inputs = {"extract": extract_inputs(transcript, MODEL, parallel)}
+
+    def extract():
+        with api_queue_scope(), st.spinner("🔍 Extracting financial data..."):
+            return extract_financial_data(client, transcript, parallel=parallel)
+
+    with memory_stage("extract"):
+        financial_data, reused = checkpoints.run("extract", run_inputs["extract"], extract)
+    if reused:
+        resumed.append("extraction")
+
+    if not financial_data:
+        return {"error": "Failed to extract financial data. Please check the transcript and try again."}
+
+    with memory_stage("derive"):
+        financial_data = attach_consensus(financial_data, get_consensus_store())
+        run_inputs["derive"] = (financial_data,)
+        derived, _ = checkpoints.run("derive", run_inputs["derive"], lambda: dict(zip(
+            ("financial_data", "metric_flags"), apply_derived_metrics(financial_data)
+        )))
+        financial_data, metric_flags = derived["financial_data"], derived["metric_flags"]
+
+    def write():
+        if writer == "claude":
+            with api_queue_scope(), st.spinner("✍️ Generating news article..."):
+                return generate_news_article(client, financial_data, transcript)
+        article_data = write_article(financial_data)
+        if writer == "polish":
+            with api_queue_scope(), st.spinner("✍️ Polishing article..."):
+                article_data = polish_article(client, financial_data, article_data)
+        return article_data
+
+    run_inputs["article"] = article_inputs(financial_data, transcript, writer, MODEL)
+    with memory_stage("article"):
+        article_data, reused = checkpoints.run("article", run_inputs["article"], write)
+    if reused and writer != "template":
+        resumed.append("article")
+
+    if not article_data:
+        return {"error": "Failed to generate article. The extracted data is saved: "
+                         "click Generate again to retry from the article step."}
+
+    with memory_stage("store"):
+        report_id = get_report_store().save(transcript, financial_data, article_data)
+    checkpoints.complete(run_inputs)
+    get_fingerprint_index().add(report_id, fingerprint, digest)
+    archive_reports()
+    return {
+        "financial_data": financial_data,
+        "article_data": article_data,
+        "metric_flags": metric_flags,
+        "report_id": report_id,
+        "resumed": resumed,
+    }
+
+
+def api_queue_scope():
+    """Rate-limit session for this browser tab, showing its place in the shared API queue"""
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    placeholder = st.empty()
+    ctx = get_script_run_ctx()
+
+    def on_wait(position, delay):
+        # Section regeneration waits on worker threads
+        add_script_run_ctx(threading.current_thread(), ctx)
+        if position:
+            placeholder.info(f"⏳ Queued for the Claude API: {position} request(s) ahead of you")
+        elif delay:
+            placeholder.info(f"⏳ Next in line, waiting {delay}s for the API rate limit")
+        else:
+            placeholder.empty()
+
+    session_id = st.session_state.setdefault('api_session', uuid.uuid4().hex)
+    return session_scope(session_id, on_wait)
+
+
+def api_error_message(error):
+    """User-facing message for a failed API call"""
+    if getattr(error, "status_code", None) in RETRY_STATUSES:
+        return "The Claude API is rate limited or overloaded right now. Please try again in a minute."
+    return f"An error occurred: {str(error)}"
+
+
+def get_report_history():
+    """This session's recently viewed reports"""
+    return st.session_state.setdefault('report_history', ReportHistory())
+
+
+def get_memory_profile():
+    """This session's per-stage memory profile (inert unless NEWSMAKER_MEMPROFILE is set)"""
+    return st.session_state.setdefault('memory_profile', MemoryProfile())
+
+
+def memory_stage(name):
+    """Profile a block as a pipeline stage of this session"""
+    return get_memory_profile().stage(name)
+
+
+def render_hedging_stats():
+    """Sidebar summary of hedged API calls: how often they were hedged and what it did to the tail"""
+    report = get_hedger().report()
+    st.markdown("---")
+    st.header("📡 API Latency")
+    if report["observed_p50"] is None:
+        st.caption("No API calls yet.")
+        return
+    st.caption(
+        f"{report['calls']} call(s), {report['hedge_rate']:.1%} hedged ({report['hedge_wins']} won, "
+        f"{report['over_budget']} over budget)"
+    )
+    st.caption(
+        f"p50/p95/p99: {report['observed_p50']:.1f}s / {report['observed_p95']:.1f}s / {report['observed_p99']:.1f}s "
+        f"(first attempts alone: {report['unhedged_p50']:.1f}s / {report['unhedged_p95']:.1f}s / "
+        f"{report['unhedged_p99']:.1f}s)"
+    )
+
+
+def render_memory_profile():
+    """Sidebar table of this session's peak and retained memory per stage"""
+    import pandas as pd
+
+    profile = get_memory_profile()
+    st.markdown("---")
+    st.header("🧠 Memory Profile")
+    current, peak = traced_memory()
+    st.caption(f"Process: {format_bytes(current)} traced, {format_bytes(peak)} peak since last stage · "
+               f"this session retained {format_bytes(max(profile.retained, 0))}")
+    if profile.stages:
+        st.dataframe(pd.DataFrame([
+            {"Stage": row["stage"], "Calls": row["calls"], "Peak": format_bytes(row["peak"]),
+             "Retained": format_bytes(max(row["retained"], 0)), "Last peak": format_bytes(row["last_peak"])}
+            for row in profile.rows()
+        ]), hide_index=True, use_container_width=True)
+    if st.button("Show largest allocations"):
+        st.dataframe(pd.DataFrame(top_allocations(), columns=["Line", "Bytes", "Blocks"]), hide_index=True)
+
+
+def remember_report():
+    """Add the current report to the session history and make it the selected entry"""
+    financial_data = st.session_state['financial_data']
+    report_id = st.session_state.get('report_id')
+    key = report_id or "demo"
+    label = " ".join(str(financial_data.get(part) or '') for part in ('ticker', 'quarter', 'fiscal_year')).strip()
+    with memory_stage("history"):
+        get_report_history().add(
+            key, label or key, financial_data, st.session_state['article_data'],
+            st.session_state.get('metric_flags'), report_id
         )
+    st.session_state['history_key'] = key
 
-    with data_col3:
-        # Export metrics as CSV
-        current = financial_data.get('current_quarter', {})
-        yoy = financial_data.get('year_over_year', {})
-        estimates = financial_data.get('estimates', {})
 
-        csv_data = f"""Metric,Actual,Estimate,YoY Change,Status
-Revenue (M),{current.get('revenue', {}).get('value', 'N/A')},{estimates.get('revenue_estimate', 'N/A')},{yoy.get('revenue_change', 'N/A')}%,{'BEAT' if estimates.get('revenue_beat') else 'MISS' if estimates.get('revenue_beat') is False else 'N/A'}
-EPS,{current.get('eps', {}).get('value', 'N/A')},{estimates.get('eps_estimate', 'N/A')},{yoy.get('eps_change', 'N/A')}%,{'BEAT' if estimates.get('eps_beat') else 'MISS' if estimates.get('eps_beat') is False else 'N/A'}
-Gross Margin %,{current.get('gross_margin', {}).get('value', 'N/A')},,
-Net Income (M),{current.get('net_income', {}).get('value', 'N/A')},,{yoy.get('net_income_change', 'N/A')}%,
+def render_report_history():
+    """Sidebar switcher over the session history, with its memory footprint"""
+    history = get_report_history()
+    if not history:
+        return
 
-Segment,Revenue (M),Growth %
-""" + "\n".join([f"{s.get('segment', 'N/A')},{s.get('revenue', 'N/A')},{s.get('growth', 'N/A')}%" for s in financial_data.get('segment_performance', [])])
+    st.markdown("---")
+    st.header("🗂️ Recent Reports")
+    keys = history.keys()
+    current = st.session_state.get('history_key')
+    choice = st.selectbox(
+        "Open report", keys, index=keys.index(current) if current in keys else 0,
+        format_func=history.label, label_visibility="collapsed"
+    )
+    st.caption(
+        f"{len(history)}/{history.max_entries} reports · "
+        f"{format_bytes(history.nbytes)} of {format_bytes(history.max_bytes)}"
+    )
+    if choice != current:
+        entry = history.get(choice)
+        st.session_state['financial_data'] = entry['financial_data']
+        st.session_state['article_data'] = entry['article_data']
+        st.session_state['metric_flags'] = entry['metric_flags']
+        st.session_state['report_id'] = entry['report_id']
+        st.session_state['history_key'] = choice
+        st.session_state.pop('duplicate_match', None)
+        st.rerun()
+
+
+def render_consensus_import():
+    """Sidebar upload of a consensus estimates feed"""
+    import tempfile
+
+    consensus = get_consensus_store()
+    with st.expander(f"📈 Consensus Estimates ({len(consensus):,} loaded)"):
+        st.caption("Beat/miss is computed against these. Columns: ticker, period (e.g. Q4 FY2024), "
+                   "revenue_estimate (USD millions), eps_estimate.")
+        feed = st.file_uploader("Import CSV or Parquet", type=["csv", "parquet"], key="consensus_feed")
+        if feed is None or st.session_state.get('consensus_imported') == feed.file_id:
+            return
+        suffix = os.path.splitext(feed.name)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            f.write(feed.getvalue())
+        try:
+            imported = consensus.import_file(f.name)
+        except (ValueError, ImportError) as e:
+            st.error(f"Could not import {feed.name}: {e}")
+            return
+        finally:
+            os.remove(f.name)
+        st.session_state['consensus_imported'] = feed.file_id
+        st.success(f"Imported {imported:,} estimate(s)")
+
+
+def render_live_call(api_key):
+    """Follow a call in progress from a growing file or a local socket"""
+    import live
+
+    st.subheader("Follow a Live Earnings Call")
+    st.caption(
+        f"New paragraphs are extracted as they arrive. A flash headline appears once revenue and EPS are spoken, "
+        f"and the full article is written when the feed ends (`{live.END_MARKER}`, sender disconnects, "
+        f"or {live.IDLE_SECONDS}s without new text)."
+    )
+    if not api_key or not ANTHROPIC_AVAILABLE:
+        st.info("Live mode calls the Claude API: turn off Demo Mode and enter an API key.")
+        return
+
+    source = st.radio("Source", ["Transcript file", "Local socket"], horizontal=True)
+    if source == "Transcript file":
+        path = st.text_input("File being appended to", placeholder="/path/to/live_transcript.txt")
+    else:
+        port = st.number_input("Port", min_value=1024, max_value=65535, value=9750)
+    if not st.button("🎙️ Start Following", type="primary"):
+        return
+    if source == "Transcript file" and not path:
+        st.error("Enter the transcript file path.")
+        return
+
+    try:
+        feed = live.tail_file(path) if source == "Transcript file" else live.socket_feed(int(port))
+    except OSError as e:
+        st.error(f"Could not listen on port {port}: {e.strerror or e}")
+        return
+    call = live.LiveCall(create_client(api_key), consensus=get_consensus_store())
+    flash = st.empty()
+    status = st.empty()
+    preview = st.empty()
+    status.info("🎧 Waiting for transcript text...")
+
+    def on_update(call):
+        status.info(f"🎧 {len(call.transcript):,} characters received · {call.extractions} extraction(s)")
+        preview.json(call.financial_data, expanded=False)
+
+    try:
+        with api_queue_scope():
+            financial_data, metric_flags, article_data = live.run_live(
+                call, feed, on_update, on_flash=lambda headline: flash.success(f"⚡ {headline}")
+            )
+    except Exception as e:
+        st.error(api_error_message(e))
+        return
+    status.empty()
+    if not financial_data or not article_data:
+        st.error("The call ended before a report could be extracted.")
+        return
+
+    st.session_state['financial_data'] = financial_data
+    st.session_state['article_data'] = article_data
+    st.session_state['metric_flags'] = metric_flags
+    st.session_state['report_id'] = live.store_live_report(
+        get_report_store(), get_fingerprint_index(), call.transcript, financial_data, article_data
+    )
+    archive_reports()
+    st.session_state['generated'] = True
+    st.session_state.pop('duplicate_match', None)
+    remember_report()
+    st.rerun()
+
+
+def render_season_dashboard():
+    """Earnings-season overview across every report produced on a given day"""
+    from dashboard import surprise_table, beat_rates_by_sector, segment_leaders, guidance_changes
+
+    dashboard = get_season_dashboard()
+    dashboard.refresh()
+
+    days = dashboard.days()
+    if not days:
+        st.info("No stored reports yet. Generated reports appear here automatically.")
+        return
+
+    day = st.date_input("Reporting day", value=days[0])
+    reports = dashboard.for_day(day)
+    st.caption(f"{len(reports):,} report(s) on {day:%B %d, %Y} · {len(dashboard.reports):,} stored in total")
+    if reports.empty:
+        return
+
+    st.markdown("### 🎯 Revenue & EPS Surprise")
+    st.dataframe(
+        surprise_table(reports),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "revenue": st.column_config.NumberColumn("Revenue ($M)", format="%.0f"),
+            "revenue_estimate": st.column_config.NumberColumn("Rev. Estimate ($M)", format="%.0f"),
+            "revenue_surprise_pct": st.column_config.NumberColumn("Rev. Surprise", format="%+.1f%%"),
+            "eps": st.column_config.NumberColumn("EPS", format="$%.2f"),
+            "eps_estimate": st.column_config.NumberColumn("EPS Estimate", format="$%.2f"),
+            "eps_surprise_pct": st.column_config.NumberColumn("EPS Surprise", format="%+.1f%%"),
+            "yoy_revenue_change": st.column_config.NumberColumn("Rev. YoY", format="%+.1f%%"),
+        }
+    )
 
-        st.download_button(
-            "📊 Download Metrics (CSV)",
-            csv_data,
-            file_name=f"{ticker}_metrics.csv",
-            mime="text/csv"
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("### 🏭 Beat Rates by Sector")
+        st.dataframe(beat_rates_by_sector(reports), use_container_width=True)
+    with col2:
+        st.markdown("### 🚀 Segment Growth Leaders")
+        st.dataframe(segment_leaders(dashboard.segments, reports["id"]), hide_index=True, use_container_width=True)
+
+    st.markdown("### 🧭 Guidance Raises & Cuts")
+    changes = guidance_changes(dashboard.reports)
+    changes = changes[changes["id"].isin(reports["id"])].drop(columns="id")
+    if changes.empty:
+        st.caption("No prior full-year guidance on record for today's reporters.")
+    else:
+        st.dataframe(changes, hide_index=True, use_container_width=True)
+
+
+def render_duplicate_notice(match_info):
+    """Explain that a stored result was reused and show what differs"""
+    st.info(
+        f"♻️ This transcript matches a previously processed one "
+        f"({match_info['similarity']:.0%} similar) - showing the stored result. "
+        f"Turn off duplicate reuse in the sidebar to regenerate."
+    )
+    changes = match_info.get('changes', [])
+    with st.expander(f"Differing passages ({len(changes)})"):
+        if not changes:
+            st.caption("No differences after normalization.")
+        for change in changes:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.caption("Stored transcript")
+                st.text(change['previous'] or "—")
+            with col2:
+                st.caption("Submitted transcript")
+                st.text(change['submitted'] or "—")
+
+
+def format_field_value(value):
+    """Show a financial_data leaf as editable text"""
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def parse_field_value(text, original):
+    """Parse edited text back into the type of the original leaf"""
+    if isinstance(original, str):
+        return text
+    try:
+        return json.loads(text)
+    except (TypeError, json.JSONDecodeError):
+        return text
+
+
+def render_data_editor(financial_data, article_data, api_key, writer="claude"):
+    """Editable data panel that regenerates only the affected article sections"""
+    import pandas as pd
+    from metrics import apply_derived_metrics, strip_derived
+
+    fields = flatten_fields(financial_data)
+
+    with st.expander("✏️ Edit Extracted Data"):
+        st.caption("Correct any extracted value - only the article sections written from it are regenerated.")
+        edited = st.data_editor(
+            pd.DataFrame({"Field": list(fields), "Value": [format_field_value(v) for v in fields.values()]}),
+            disabled=["Field"],
+            hide_index=True,
+            use_container_width=True,
+            key=f"financial_data_editor_{st.session_state.get('history_key')}"
         )
 
+        if not st.button("🔄 Apply Corrections", use_container_width=True):
+            return
+
+        new_data, metric_flags = apply_derived_metrics(strip_derived(unflatten_fields({
+            field: parse_field_value(value, fields[field])
+            for field, value in zip(edited["Field"], edited["Value"])
+        })))
+        changed = changed_fields(financial_data, new_data)
+        if not changed:
+            st.info("No changes to apply.")
+            return
+
+        sections = affected_sections(changed)
+        if writer == "claude" and api_key and ANTHROPIC_AVAILABLE:
+            try:
+                client = create_client(api_key)
+                with api_queue_scope(), st.spinner(f"✍️ Regenerating {', '.join(sections)}..."):
+                    article_data = regenerate_sections(client, new_data, article_data, sections)
+            except Exception as e:
+                st.error(api_error_message(e))
+                return
+        else:
+            # Template sections are rewritten instantly, without the API
+            article_data = rewrite_sections(new_data, article_data, sections)
+
+        st.session_state['financial_data'] = new_data
+        st.session_state['article_data'] = article_data
+        st.session_state['metric_flags'] = metric_flags
+        st.session_state['regenerated_sections'] = {"fields": changed, "sections": sections}
+
+        remember_report()
+
+        report_id = st.session_state.get('report_id')
+        record = get_report_store().load(report_id) if report_id else None
+        if record:
+            get_report_store().save(record['transcript'], new_data, article_data, report_id=report_id)
+            archive_reports()
+        st.rerun()
+
+
+def render_metric_flags(metric_flags):
+    """Warn where the extracted answers disagree with the derived arithmetic"""
+    if not metric_flags:
+        return
+    lines = "\n".join(
+        f"- `{flag['field']}`: transcript/LLM said **{flag['reported']}**, numbers give **{flag['derived']}**"
+        for flag in metric_flags
+    )
+    st.warning(f"⚠️ Derived metrics disagree with the extracted values (derived values are shown):\n{lines}")
+
 
 # Main Application
 def main():
+    from metrics import apply_derived_metrics
+
+    st.set_page_config(**PAGE_CONFIG)
+    st.markdown(APP_CSS, unsafe_allow_html=True)
+
     st.title("📊 Earnings News Generator")
     st.markdown("*Transform earnings call transcripts into professional news articles with infographics*")
 
@@ -1249,8 +911,29 @@ def main():
         if not demo_mode:
             api_key = st.text_input("Claude API Key", type="password", help="Enter your Anthropic API key")
             st.caption("Get free API key at [console.anthropic.com](https://console.anthropic.com/)")
+            reuse_duplicates = st.toggle(
+                "♻️ Reuse results for duplicate transcripts", value=True,
+                help="Serve the stored article when the same call was already processed"
+            )
+            duplicate_threshold = st.slider(
+                "Duplicate similarity threshold", 0.89, 1.0, dedup.DEFAULT_THRESHOLD, 0.01,
+                disabled=not reuse_duplicates
+            )
+            writer = st.radio(
+                "Article writer", list(ARTICLE_WRITERS), format_func=ARTICLE_WRITERS.get,
+                help="Templates write the article from the extracted numbers in milliseconds"
+            )
+            parallel_extraction = st.toggle(
+                "⚡ Parallel extraction", value=False,
+                help="Extract metrics, guidance, segments and highlights as concurrent smaller requests: "
+                     "faster, but the transcript is sent once per group"
+            )
+            render_consensus_import()
         else:
             api_key = None
+            reuse_duplicates = False
+            writer = "template"
+            parallel_extraction = False
             st.success("Demo mode active - using sample Apple earnings data")
 
         st.markdown("---")
@@ -1267,7 +950,7 @@ def main():
         st.markdown("**Powered by Claude AI**")
 
     # Main content area
-    tab1, tab2 = st.tabs(["📝 Input Transcript", "📰 Generated News"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📝 Input Transcript", "📰 Generated News", "📊 Earnings Season", "🎙️ Live Call"])
 
     with tab1:
         st.subheader("Paste Earnings Call Transcript")
@@ -1314,9 +997,11 @@ def main():
             with st.spinner("🔍 Loading demo data..."):
                 time.sleep(1)  # Simulate processing
 
-            st.session_state['financial_data'] = DEMO_FINANCIAL_DATA
+            st.session_state['financial_data'], st.session_state['metric_flags'] = apply_derived_metrics(DEMO_FINANCIAL_DATA)
             st.session_state['article_data'] = DEMO_ARTICLE_DATA
+            st.session_state['report_id'] = None
             st.session_state['generated'] = True
+            remember_report()
 
         # Real API mode
         else:
@@ -1332,45 +1017,105 @@ def main():
                 st.error("Anthropic library not installed. Run: pip install anthropic")
                 st.stop()
 
-            try:
-                client = anthropic.Anthropic(api_key=api_key)
-
-                with st.spinner("🔍 Extracting financial data..."):
-                    financial_data = extract_financial_data(client, transcript)
-
-                if not financial_data:
-                    st.error("Failed to extract financial data. Please check the transcript and try again.")
+            st.session_state.pop('duplicate_match', None)
+            store = get_report_store()
+            index = get_fingerprint_index()
+            fingerprint, digest = dedup.fingerprint_transcript(transcript)
+
+            match = index.query(fingerprint, digest, duplicate_threshold) if reuse_duplicates else None
+            record = store.load(match.report_id) if match else None
+
+            if record:
+                st.session_state['financial_data'], st.session_state['metric_flags'] = apply_derived_metrics(
+                    attach_consensus(record['financial_data'], get_consensus_store())
+                )
+                st.session_state['article_data'] = record['article_data']
+                st.session_state['report_id'] = match.report_id
+                st.session_state['duplicate_match'] = {
+                    "report_id": match.report_id,
+                    "similarity": match.similarity,
+                    "changes": dedup.diff_passages(record['transcript'], transcript),
+                }
+                st.session_state['generated'] = True
+                remember_report()
+
+            else:
+                waiting = st.empty()
+                try:
+                    # Editors pasting the same transcript at once share one generation
+                    result, _ = get_generation_flights().do(
+                        (digest, MODEL, writer, parallel_extraction),
+                        lambda: generate_report(api_key, transcript, fingerprint, digest, writer, parallel_extraction),
+                        on_join=lambda: waiting.info(
+                            "⏳ Another editor is already generating a report from this transcript. "
+                            "You'll get the same result when it finishes."
+                        )
+                    )
+                except Exception as e:
+                    st.error(api_error_message(e))
                     st.stop()
+                waiting.empty()
 
-                with st.spinner("✍️ Generating news article..."):
-                    article_data = generate_news_article(client, financial_data, transcript)
-
-                if not article_data:
-                    st.error("Failed to generate article. Please try again.")
+                if result.get('error'):
+                    st.error(result['error'])
                     st.stop()
 
-                st.session_state['financial_data'] = financial_data
-                st.session_state['article_data'] = article_data
+                st.session_state['financial_data'] = result['financial_data']
+                st.session_state['article_data'] = result['article_data']
+                st.session_state['metric_flags'] = result['metric_flags']
+                st.session_state['report_id'] = result['report_id']
+                st.session_state['resumed_stages'] = result['resumed']
                 st.session_state['generated'] = True
+                remember_report()
 
-            except Exception as e:
-                st.error(f"An error occurred: {str(e)}")
-                st.stop()
+    with st.sidebar:
+        render_report_history()
 
     # Display results in tab2
     with tab2:
-        if st.session_state.get('generated') and st.session_state.get('financial_data') and st.session_state.get('article_data'):
+        if st.session_state.get('financial_data') and st.session_state.get('article_data'):
             financial_data = st.session_state['financial_data']
             article_data = st.session_state['article_data']
 
             if st.session_state.get('generated'):
                 st.success("✅ News article generated successfully!")
-                st.session_state['generated'] = False  # Reset flag
+                st.session_state['generated'] = False  # Reset flag; the report stays open until another is chosen
+                resumed = st.session_state.pop('resumed_stages', None)
+                if resumed:
+                    st.info(f"♻️ Resumed from an earlier attempt: reused the saved {' and '.join(resumed)}.")
+
+            if st.session_state.get('duplicate_match'):
+                render_duplicate_notice(st.session_state['duplicate_match'])
+
+            render_metric_flags(st.session_state.get('metric_flags'))
+
+            regenerated = st.session_state.pop('regenerated_sections', None)
+            if regenerated:
+                st.success(
+                    f"✅ Updated {len(regenerated['fields'])} field(s); regenerated: "
+                    f"{', '.join(regenerated['sections']) or 'no sections'}"
+                )
+
+            render_data_editor(financial_data, article_data, api_key, writer)
 
             display_results(financial_data, article_data)
         else:
             st.info("👈 Enter a transcript and click 'Generate News' to create your earnings article, or enable Demo Mode to see a sample.")
 
+    with tab3:
+        render_season_dashboard()
+
+    with tab4:
+        render_live_call(api_key)
+
+    # Last, so this run's display stages are included
+    if MEMPROFILE_ENABLED or HEDGE_ENABLED:
+        with st.sidebar:
+            if HEDGE_ENABLED:
+                render_hedging_stats()
+            if MEMPROFILE_ENABLED:
+                render_memory_profile()
+
 
 if __name__ == "__main__":
     main()
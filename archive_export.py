@@ -0,0 +1,244 @@
+"""
+Streaming Archive Export
+Writes every artifact of many reports into one ZIP archive, generating and
+deflating each artifact on the fly so memory stays constant, and resuming
+from a journal if an export is interrupted
+
+Usage: python archive_export.py OUTPUT.zip [--data-dir DIR] [--ticker T ...] [--workers N]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+import charts
+from render_pool import default_workers, render_stage
+from report import (
+    generate_full_html_report, generate_email_html, generate_json_export,
+    generate_article_text, generate_metrics_csv
+)
+
+
+CHUNK_SIZE = 64 * 1024
+ZIP32_LIMIT = 0xFFFFFFFF
+FLAGS = 0x0808  # data descriptor follows the data, UTF-8 file names
+
+
+def report_artifacts(financial_data, article_data):
+    """Yield (file name, text) for each export artifact, built one at a time"""
+    ticker = financial_data.get('ticker', 'earnings')
+
+    yield f"{ticker}_earnings_report.html", generate_full_html_report(financial_data, article_data)
+    for name, file_name in (("revenue", "revenue_chart"), ("eps", "eps_chart"),
+                            ("comparison", "yoy_comparison"), ("segment", "segment_chart")):
+        html = charts.chart_html(name, financial_data)
+        if html:
+            yield f"{ticker}_{file_name}.html", html
+    yield f"{ticker}_data.json", generate_json_export(financial_data, article_data)
+    yield f"{ticker}_article.txt", generate_article_text(financial_data, article_data)
+    yield f"{ticker}_metrics.csv", generate_metrics_csv(financial_data)
+    yield f"{ticker}_email.html", generate_email_html(financial_data, article_data)
+
+
+def _dos_datetime(timestamp):
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class StreamingZipWriter:
+    """Minimal ZIP writer for non-seekable streams
+
+    Entries are deflated chunk by chunk and followed by a data descriptor, so
+    nothing is buffered beyond one chunk. Only the central directory metadata
+    (a few dozen bytes per entry) is kept until close().
+    """
+
+    def __init__(self, fileobj, offset=0, entries=None, level=6):
+        self.fileobj = fileobj
+        self.offset = offset
+        self.entries = list(entries or [])
+        self.level = level
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.offset += len(data)
+
+    def write_entry(self, name, chunks, timestamp=None):
+        """Write one entry from an iterable of bytes/str chunks; return its directory record"""
+        encoded_name = name.encode("utf-8")
+        dos_time, dos_date = _dos_datetime(timestamp or time.time())
+        header_offset = self.offset
+
+        self._write(struct.pack("<IHHHHHIIIHH", 0x04034b50, 20, FLAGS, 8, dos_time, dos_date,
+                                0, 0, 0, len(encoded_name), 0) + encoded_name)
+
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+        crc = size = compressed = 0
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            data = compressor.compress(chunk)
+            compressed += len(data)
+            self._write(data)
+        data = compressor.flush()
+        compressed += len(data)
+        self._write(data)
+
+        if max(size, compressed, header_offset) > ZIP32_LIMIT:
+            raise ValueError(f"{name}: archives over 4 GB are not supported")
+        self._write(struct.pack("<IIII", 0x08074b50, crc, compressed, size))
+
+        entry = {"name": name, "offset": header_offset, "crc": crc, "compressed": compressed,
+                 "size": size, "time": dos_time, "date": dos_date}
+        self.entries.append(entry)
+        return entry
+
+    def close(self):
+        """Write the central directory"""
+        directory_offset = self.offset
+        for entry in self.entries:
+            encoded_name = entry["name"].encode("utf-8")
+            self._write(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014b50, 20, 20, FLAGS, 8,
+                                    entry["time"], entry["date"], entry["crc"], entry["compressed"],
+                                    entry["size"], len(encoded_name), 0, 0, 0, 0, 0,
+                                    entry["offset"]) + encoded_name)
+        directory_size = self.offset - directory_offset
+        if len(self.entries) > 0xFFFF or directory_offset > ZIP32_LIMIT:
+            raise ValueError("archives over 65535 entries or 4 GB are not supported")
+        self._write(struct.pack("<IHHHHIIH", 0x06054b50, 0, 0, len(self.entries), len(self.entries),
+                                directory_size, directory_offset, 0))
+
+
+def _chunked(text):
+    for start in range(0, len(text), CHUNK_SIZE):
+        yield text[start:start + CHUNK_SIZE]
+
+
+def _report_folder(key, financial_data):
+    ticker = financial_data.get('ticker') or 'report'
+    return f"{ticker}_{financial_data.get('quarter', '')}{financial_data.get('fiscal_year', '')}_{key}".replace("/", "-")
+
+
+def render_report(payload):
+    """(key, folder, [(file name, text), ...]) for one report; runs in a worker process"""
+    key, financial_data, article_data = payload
+    return key, _report_folder(key, financial_data), list(report_artifacts(financial_data, article_data))
+
+
+def _read_journal(journal_path):
+    done, offset, entries = set(), 0, []
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn final line: resume from the last complete report
+            done.add(record["report"])
+            offset = record["offset"]
+            entries.extend(record["entries"])
+    return done, offset, entries
+
+
+def export_archive(reports, path, resume=True, workers=1):
+    """Write (key, financial_data, article_data) reports to a ZIP file on disk
+
+    After each report the new directory records and the file offset are
+    appended to PATH.journal; rerunning after a crash truncates the archive
+    back to the last complete report and skips everything already written.
+    Artifacts are rendered by `workers` processes; the archive itself is
+    written in report order by this process. Returns the number of reports
+    written in this run.
+    """
+    journal_path = path + ".journal"
+    done, offset, entries = set(), 0, []
+    if resume and os.path.exists(journal_path) and os.path.exists(path):
+        done, offset, entries = _read_journal(journal_path)
+    else:
+        open(journal_path, "w").close()
+
+    written = 0
+    with open(path, "r+b" if offset else "wb") as f, open(journal_path, "a", encoding="utf-8") as journal:
+        f.truncate(offset)
+        f.seek(offset)
+        writer = StreamingZipWriter(f, offset=offset, entries=entries)
+
+        pending = (report for report in reports if report[0] not in done)
+        for key, folder, artifacts in render_stage(render_report, pending, workers):
+            first_entry = len(writer.entries)
+            for file_name, text in artifacts:
+                writer.write_entry(f"{folder}/{file_name}", _chunked(text))
+            f.flush()
+            os.fsync(f.fileno())
+            journal.write(json.dumps({"report": key, "offset": writer.offset,
+                                      "entries": writer.entries[first_entry:]}) + "\n")
+            journal.flush()
+            written += 1
+
+        writer.close()
+
+    os.remove(journal_path)
+    return written
+
+
+class _ChunkSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return b"".join(chunks)
+
+
+def stream_archive(reports, workers=1):
+    """Yield the ZIP archive as byte chunks, e.g. for an HTTP response body"""
+    sink = _ChunkSink()
+    writer = StreamingZipWriter(sink)
+    for key, folder, artifacts in render_stage(render_report, reports, workers):
+        for file_name, text in artifacts:
+            writer.write_entry(f"{folder}/{file_name}", _chunked(text))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def stored_reports(store, tickers=None):
+    """(key, financial_data, article_data) for stored reports, loaded lazily"""
+    for report_id in store.ids():
+        record = store.load(report_id)
+        if not record:
+            continue
+        if tickers and record['financial_data'].get('ticker') not in tickers:
+            continue
+        yield report_id, record['financial_data'], record['article_data']
+
+
+def main(argv=None):
+    from store import ReportStore, DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Export stored reports as one ZIP archive")
+    parser.add_argument("output", help="path of the .zip file to write")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--ticker", action="append", help="only export these tickers")
+    parser.add_argument("--restart", action="store_true", help="ignore an interrupted export and start over")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="rendering processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    written = export_archive(stored_reports(ReportStore(args.data_dir), args.ticker), args.output,
+                             resume=not args.restart, workers=args.workers)
+    print(f"Wrote {written} report(s) to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
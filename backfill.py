@@ -0,0 +1,293 @@
+"""
+Bulk Backfill
+Regenerates reports for a directory of past transcripts through the Message
+Batches API: a batch of extraction requests, then a batch of article requests,
+each polled until it ends. Results are stored exactly like interactive runs and
+can be exported or published in the same pass. Batches bill at half the
+synchronous price and don't compete with editors for per-minute rate limits
+
+With --writer template only the extraction goes through a batch; articles are
+written locally from templates as soon as it ends
+
+Usage: python backfill.py TRANSCRIPT_DIR [--data-dir DIR] [--writer claude|template] [--export OUT.zip] [--site DIR]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import dedup
+from checkpoints import CheckpointStore, article_inputs, extract_inputs
+from consensus import ConsensusStore, attach_consensus
+from pipeline import (
+    MODEL, MODEL_PRICES, BATCH_DISCOUNT, create_client, extraction_request, article_request, parse_json_response
+)
+from store import ReportStore, DEFAULT_DATA_DIR, transcript_hash, write_json_atomic
+
+
+STATE_FILE = ".backfill-state.json"
+MAX_BATCH_REQUESTS = 10000
+# The Message Batches API rejects batches over 256 MB; leave room for the request envelope
+MAX_BATCH_BYTES = 256 * 1024 * 1024 - 64 * 1024
+POLL_SECONDS = 60
+
+
+def load_transcripts(directory):
+    """{report id: transcript} for every .txt file in the directory"""
+    transcripts = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            transcript = f.read()
+        if transcript.strip():
+            transcripts[transcript_hash(transcript)[:16]] = transcript
+    return transcripts
+
+
+def split_batches(items):
+    """Consecutive runs of batch request items within MAX_BATCH_REQUESTS and MAX_BATCH_BYTES serialized"""
+    batches, current, size = [], [], 0
+    for item in items:
+        item_size = len(json.dumps(item, separators=(",", ":")).encode("utf-8")) + 1
+        if current and (len(current) >= MAX_BATCH_REQUESTS or size + item_size > MAX_BATCH_BYTES):
+            batches.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += item_size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def submit_batches(client, requests):
+    """Submit {custom id: params} as one or more message batches; returns the batch ids"""
+    items = [{"custom_id": custom_id, "params": params} for custom_id, params in requests.items()]
+    return [client.messages.batches.create(requests=batch).id for batch in split_batches(items)]
+
+
+def wait_for_batches(client, batch_ids, poll=POLL_SECONDS, on_progress=None):
+    """Poll until every batch has ended"""
+    while True:
+        batches = [client.messages.batches.retrieve(batch_id) for batch_id in batch_ids]
+        if on_progress:
+            on_progress(batches)
+        if all(batch.processing_status == "ended" for batch in batches):
+            return batches
+        time.sleep(poll)
+
+
+def batch_results(client, batch_ids, usage):
+    """{custom id: reply text} for succeeded requests and {custom id: reason} for the rest
+
+    Token usage of succeeded requests is added to `usage`.
+    """
+    replies, failures = {}, {}
+    for batch_id in batch_ids:
+        for entry in client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type != "succeeded":
+                failures[entry.custom_id] = result.type
+                continue
+            usage["input_tokens"] += result.message.usage.input_tokens
+            usage["output_tokens"] += result.message.usage.output_tokens
+            replies[entry.custom_id] = result.message.content[0].text
+    return replies, failures
+
+
+def _batch_phase(client, state, state_path, phase, requests, poll, usage, on_progress):
+    """Submit (or resume) a phase's batches and return their results
+
+    The state keeps each phase's batch ids and the custom ids submitted in
+    them, so a resumed run with transcripts added since the first submit
+    sends those in a follow-up batch instead of dropping them.
+    """
+    if not requests:
+        return {}, {}
+    entry = state.get(phase, {"batches": [], "custom_ids": []})
+    submitted = set(entry["custom_ids"])
+    missing = {custom_id: params for custom_id, params in requests.items() if custom_id not in submitted}
+    if missing:
+        entry["batches"] = entry["batches"] + submit_batches(client, missing)
+        entry["custom_ids"] = entry["custom_ids"] + list(missing)
+        state[phase] = entry
+        write_json_atomic(state_path, state)
+    wait_for_batches(client, entry["batches"], poll, on_progress)
+    return batch_results(client, entry["batches"], usage)
+
+
+def run_backfill(client, transcripts, store, index, state_path, model=MODEL, poll=POLL_SECONDS, on_progress=None,
+                 writer="claude", consensus=None, checkpoints=None):
+    """Extract and write articles for the transcripts in two batches and store the reports
+
+    Batch ids are kept in state_path, so an interrupted run resumes polling the
+    batches it already submitted instead of paying for them twice. With a
+    CheckpointStore, extractions and articles completed by an earlier run that
+    failed before storing its report (or by a failed attempt in the app) are
+    reused and left out of the batches; each report's checkpoints are
+    discarded once it is stored.
+    """
+    from metrics import apply_derived_metrics
+
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, encoding="utf-8") as f:
+            state = json.load(f)
+    usage = {"input_tokens": 0, "output_tokens": 0}
+    failures = {}
+    checkpoints = checkpoints or CheckpointStore(store.root)
+
+    extracted = {}
+    for report_id, transcript in transcripts.items():
+        data = checkpoints.get("extract", extract_inputs(transcript, model))
+        if data:
+            extracted[report_id] = data
+    replies, failed = _batch_phase(
+        client, state, state_path, "extraction",
+        {report_id: extraction_request(transcript, model)
+         for report_id, transcript in transcripts.items() if report_id not in extracted},
+        poll, usage, on_progress
+    )
+    failures.update(failed)
+    for report_id, text in replies.items():
+        if report_id not in transcripts or report_id in extracted:
+            continue  # stored before an interrupted run was resumed
+        data = parse_json_response(text)
+        if data:
+            extracted[report_id] = data
+            checkpoints.put("extract", extract_inputs(transcripts[report_id], model), data)
+        else:
+            failures[report_id] = "unparseable extraction"
+
+    financial_data, derive_inputs = {}, {}
+    for report_id, data in extracted.items():
+        data = attach_consensus(data, consensus)
+        derive_inputs[report_id] = (data,)
+        derived, _ = checkpoints.run("derive", derive_inputs[report_id], lambda: dict(zip(
+            ("financial_data", "metric_flags"), apply_derived_metrics(data)
+        )))
+        financial_data[report_id] = derived["financial_data"]
+
+    def article_key(report_id):
+        return article_inputs(financial_data[report_id], transcripts[report_id], writer, model)
+
+    articles = {}
+    for report_id in financial_data:
+        article_data = checkpoints.get("article", article_key(report_id))
+        if article_data:
+            articles[report_id] = article_data
+    if writer == "template":
+        from nlg import write_article
+        articles.update({report_id: write_article(fd) for report_id, fd in financial_data.items()
+                         if report_id not in articles})
+    else:
+        replies, failed = _batch_phase(
+            client, state, state_path, "articles",
+            {report_id: article_request(fd, transcripts[report_id], model)
+             for report_id, fd in financial_data.items() if report_id not in articles},
+            poll, usage, on_progress
+        )
+        failures.update(failed)
+        for report_id, text in replies.items():
+            if report_id in financial_data and report_id not in articles:
+                articles[report_id] = parse_json_response(text)
+    for report_id, article_data in articles.items():
+        if article_data:
+            checkpoints.put("article", article_key(report_id), article_data)
+
+    written = {}
+    for report_id, article_data in articles.items():
+        if report_id not in financial_data:
+            continue
+        if not article_data:
+            failures[report_id] = "unparseable article"
+            continue
+        transcript = transcripts[report_id]
+        store.save(transcript, financial_data[report_id], article_data, report_id=report_id)
+        checkpoints.complete({"extract": extract_inputs(transcript, model), "derive": derive_inputs[report_id],
+                              "article": article_key(report_id)})
+        index.add(report_id, *dedup.fingerprint_transcript(transcript))
+        written[report_id] = financial_data[report_id].get('ticker')
+
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return {"written": written, "failures": failures, **usage}
+
+
+def batch_cost(model, input_tokens, output_tokens):
+    """(batch cost, synchronous cost) in USD"""
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    full_price = (input_tokens * input_price + output_tokens * output_price) / 1e6
+    return full_price * BATCH_DISCOUNT, full_price
+
+
+def _print_progress(batches):
+    counts = {}
+    for batch in batches:
+        for key, value in batch.request_counts.model_dump().items():
+            counts[key] = counts.get(key, 0) + value
+    print(f"  {time.strftime('%H:%M:%S')} " + ", ".join(f"{key} {value}" for key, value in counts.items() if value))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill reports for past transcripts through the Message Batches API")
+    parser.add_argument("transcripts", help="directory of .txt transcripts")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between status checks")
+    parser.add_argument("--writer", choices=["claude", "template"], default="claude",
+                        help="write articles with a second batch or locally from templates")
+    parser.add_argument("--force", action="store_true", help="regenerate transcripts that are already stored")
+    parser.add_argument("--export", help="also write the backfilled reports to this .zip archive")
+    parser.add_argument("--site", help="also rebuild the static site in this directory")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise SystemExit("Set ANTHROPIC_API_KEY")
+
+    store = ReportStore(args.data_dir)
+    index = dedup.FingerprintIndex(os.path.join(args.data_dir, "fingerprints.jsonl"))
+    transcripts = load_transcripts(args.transcripts)
+    if not args.force:
+        transcripts = {report_id: t for report_id, t in transcripts.items() if report_id not in store}
+    print(f"Backfilling {len(transcripts)} transcript(s) with {args.model}")
+
+    start = time.perf_counter()
+    result = run_backfill(create_client(api_key), transcripts, store, index,
+                          os.path.join(args.transcripts, STATE_FILE), args.model, args.poll, _print_progress, args.writer,
+                          ConsensusStore(args.data_dir))
+    elapsed = time.perf_counter() - start
+
+    for report_id, ticker in sorted(result["written"].items(), key=lambda item: str(item[1])):
+        print(f"  {ticker or '?':<8} {report_id}")
+    for report_id, reason in sorted(result["failures"].items()):
+        print(f"  FAILED   {report_id}: {reason}")
+    cost, full_cost = batch_cost(args.model, result["input_tokens"], result["output_tokens"])
+    print(f"Stored {len(result['written'])} report(s), {len(result['failures'])} failed, in {elapsed / 60:.1f} min; "
+          f"{result['input_tokens']:,} input / {result['output_tokens']:,} output tokens, "
+          f"${cost:.2f} (synchronous: ${full_cost:.2f})")
+
+    from parquet_archive import ParquetArchive, ARCHIVE_DIR
+    archive = ParquetArchive(os.path.join(args.data_dir, ARCHIVE_DIR))
+    archived = archive.sync(store)
+    archive.compact()
+    print(f"Archived {archived} report(s) to {archive.root}")
+
+    if args.export:
+        from archive_export import export_archive
+        from render_pool import default_workers
+        reports = ((record['id'], record['financial_data'], record['article_data'])
+                   for record in map(store.load, result["written"]) if record)
+        written = export_archive(reports, args.export, workers=default_workers())
+        print(f"Exported {written} report(s) to {args.export}")
+    if args.site:
+        from render_pool import default_workers
+        from sitegen import build_site
+        stats = build_site(store, args.site, workers=default_workers())
+        print(f"Site: rendered {stats['rendered']} report page(s) in {args.site}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,608 @@
+"""
+Benchmarks
+Micro-benchmarks for the headless parts of the generator
+
+Usage: python benchmarks.py <name> [options]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+
+def bench_dedup(args):
+    """Near-duplicate lookup latency against a large fingerprint index"""
+    import dedup
+
+    rng = random.Random(42)
+    index = dedup.FingerprintIndex()
+    fingerprints = [rng.getrandbits(dedup.SIMHASH_BITS) for _ in range(args.size)]
+    for i, fp in enumerate(fingerprints):
+        index.add(f"r{i}", fp)
+
+    # Half the probes are near-duplicates (a few flipped bits), half are unseen
+    probes = []
+    for i in range(args.queries):
+        fp = fingerprints[rng.randrange(args.size)] if i % 2 == 0 else rng.getrandbits(dedup.SIMHASH_BITS)
+        for _ in range(rng.randrange(4)):
+            fp ^= 1 << rng.randrange(dedup.SIMHASH_BITS)
+        probes.append(fp)
+
+    start = time.perf_counter()
+    hits = sum(1 for fp in probes if index.query(fp))
+    elapsed = time.perf_counter() - start
+
+    print(f"index size:     {len(index):,}")
+    print(f"queries:        {args.queries:,} ({hits:,} matched)")
+    print(f"mean lookup:    {elapsed / args.queries * 1e6:.1f} µs")
+
+
+def bench_metrics(args):
+    """Vectorized derived-metric computation over a batch of reports"""
+    import metrics
+
+    rng = random.Random(42)
+    reports = []
+    for _ in range(args.size):
+        revenue = rng.uniform(1000, 100000)
+        eps = rng.uniform(0.1, 5)
+        reports.append({
+            "current_quarter": {"revenue": {"value": revenue}, "eps": {"value": eps}, "net_income": {"value": revenue * 0.2}},
+            "prior_year_quarter": {"revenue": revenue / rng.uniform(0.8, 1.3), "eps": eps / rng.uniform(0.8, 1.3), "net_income": revenue * 0.18},
+            "prior_quarter": {"revenue": revenue / rng.uniform(0.9, 1.1), "eps": eps / rng.uniform(0.9, 1.1)},
+            "estimates": {"revenue_estimate": revenue * rng.uniform(0.95, 1.05), "eps_estimate": eps * rng.uniform(0.9, 1.1),
+                          "revenue_beat": rng.random() < 0.5},
+            "guidance": {"next_quarter_revenue": {"low": revenue, "high": revenue * 1.05}},
+        })
+
+    start = time.perf_counter()
+    derived, flags = metrics.derive_batch(reports)
+    elapsed = time.perf_counter() - start
+
+    print(f"reports:        {len(reports):,}")
+    print(f"flags raised:   {len(flags):,}")
+    print(f"total:          {elapsed * 1e3:.1f} ms ({elapsed / len(reports) * 1e6:.1f} µs/report)")
+
+
+def season_records(size, seed=42):
+    """Synthetic stored reports for an earnings season spread over four quarters"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(size):
+        revenue = rng.uniform(1000, 100000)
+        records.append({
+            "id": f"r{i}",
+            "created_at": "2024-10-31T18:00:00",
+            "financial_data": {
+                "ticker": f"T{i % (size // 4 or 1)}",
+                "quarter": f"Q{i * 4 // size + 1}",
+                "fiscal_year": "FY2024",
+                "sector": rng.choice(["Technology", "Financials", "Energy", "Health Care"]),
+                "current_quarter": {"revenue": {"value": revenue}, "eps": {"value": rng.uniform(0.1, 5)}},
+                "estimates": {"revenue_estimate": revenue * rng.uniform(0.95, 1.05), "eps_estimate": 1.0},
+                "guidance": {"full_year_revenue": {"low": revenue * 4, "high": revenue * 4.2}},
+                "segment_performance": [{"segment": s, "revenue": revenue / 3, "growth": rng.uniform(-10, 30)} for s in "ABC"],
+            },
+        })
+    return records
+
+
+def bench_dashboard(args):
+    """Earnings-season aggregation over a day's worth of stored reports"""
+    import dashboard
+
+    records = season_records(args.size)
+    start = time.perf_counter()
+    reports, segments = dashboard.report_frames(records)
+    built = time.perf_counter()
+    dashboard.surprise_table(reports)
+    dashboard.beat_rates_by_sector(reports)
+    dashboard.segment_leaders(segments, reports["id"])
+    dashboard.guidance_changes(reports)
+    aggregated = time.perf_counter()
+
+    print(f"reports:        {len(reports):,} ({len(segments):,} segments)")
+    print(f"frame build:    {(built - start) * 1e3:.1f} ms")
+    print(f"aggregations:   {(aggregated - built) * 1e3:.1f} ms")
+
+
+SAMPLE_FINANCIAL_DATA = {
+    "company_name": "Apple Inc.",
+    "ticker": "AAPL",
+    "quarter": "Q4",
+    "fiscal_year": "FY2024",
+    "current_quarter": {
+        "revenue": {"value": 89500}, "net_income": {"value": 22956},
+        "eps": {"value": 1.46}, "gross_margin": {"value": 45.2},
+    },
+    "year_over_year": {"revenue_change": 6.0, "eps_change": 13.2, "net_income_change": 10.5},
+    "estimates": {"revenue_estimate": 87200, "eps_estimate": 1.39, "revenue_beat": True, "eps_beat": True},
+    "historical_quarters": [
+        {"quarter": "Q1 FY24", "revenue": 81800, "eps": 1.29},
+        {"quarter": "Q2 FY24", "revenue": 84300, "eps": 1.33},
+        {"quarter": "Q3 FY24", "revenue": 87500, "eps": 1.40},
+        {"quarter": "Q4 FY24", "revenue": 89500, "eps": 1.46},
+    ],
+    "key_highlights": ["Services segment hit an all-time high"],
+    "segment_performance": [
+        {"segment": "iPhone", "revenue": 43800, "growth": 5.0},
+        {"segment": "Services", "revenue": 22200, "growth": 14.0},
+        {"segment": "Mac", "revenue": 7600, "growth": 3.0},
+    ],
+}
+
+
+def _figures_per_second(render, reports):
+    start = time.perf_counter()
+    count = sum(render(fd) for fd in reports)
+    return count / (time.perf_counter() - start)
+
+
+def bench_charts(args):
+    """Figures per second: plotly graph_objects + to_html versus plain dict specs"""
+    import plotly.graph_objects as go
+    import charts
+
+    reports = [SAMPLE_FINANCIAL_DATA] * max(1, args.size // 1000)
+
+    def via_graph_objects(fd):
+        count = 0
+        for build in charts.CHART_SPECS.values():
+            go.Figure(build(fd)).to_html(full_html=False, include_plotlyjs=False)
+            count += 1
+        return count
+
+    def via_specs(fd):
+        count = 0
+        for name in charts.CHART_SPECS:
+            charts.chart_html(name, fd, full_html=False, include_plotlyjs=False)
+            count += 1
+        return count
+
+    slow = _figures_per_second(via_graph_objects, reports)
+    fast = _figures_per_second(via_specs, reports)
+    print(f"graph_objects:  {slow:,.0f} figures/s")
+    print(f"dict specs:     {fast:,.0f} figures/s ({fast / slow:.0f}x)")
+
+
+def bench_svg(args):
+    """Static SVG chart rendering speed and size"""
+    import svg_charts
+
+    runs = max(1, args.size // 50)
+    start = time.perf_counter()
+    for _ in range(runs):
+        rendered = [svg_charts.chart_svg(name, SAMPLE_FINANCIAL_DATA) for name in svg_charts.SVG_CHARTS]
+    elapsed = time.perf_counter() - start
+
+    print(f"charts:         {len(rendered)} x {runs:,} runs")
+    print(f"per chart:      {elapsed / (runs * len(rendered)) * 1e6:.0f} µs")
+    print(f"per report:     {sum(len(svg) for svg in rendered if svg) / 1024:.1f} KB")
+
+
+def bench_ratelimit(args):
+    """Shared limiter against the local API stand-in: one heavy session plus light ones"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import mock_api
+    import ratelimit
+    from pipeline import create_client
+
+    server = mock_api.start_server(requests_per_minute=60, tokens_per_minute=10 ** 7, overload=0.05, latency=0.05)
+    client = create_client("local").with_options(base_url=server.base_url)
+    # Start over-optimistic: the first responses' headers pull the buckets down to the server's limits
+    limiter = ratelimit.RateLimiter(requests_per_minute=1000, tokens_per_minute=10 ** 7)
+    sessions = {"heavy": max(1, args.queries // 30), "light-1": 8, "light-2": 8}
+
+    def run(session):
+        start = time.perf_counter()
+        limiter.call(lambda: client.messages.with_raw_response.create(
+            model="local", max_tokens=50, messages=[{"role": "user", "content": "headline"}]
+        ), 60, session)
+        return session, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sum(sessions.values())) as executor:
+        jobs = [executor.submit(run, "heavy") for _ in range(sessions["heavy"])]
+        time.sleep(0.2)
+        jobs += [executor.submit(run, name) for name in sessions if name != "heavy" for _ in range(sessions[name])]
+        results = [job.result() for job in jobs]
+    elapsed = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"calls:          {len(results):,} in {elapsed:.1f}s (server limit 60/min)")
+    print(f"server:         {server.counts}")
+    print(f"limiter:        {limiter.stats}")
+    for name in sessions:
+        waits = sorted(wait for session, wait in results if session == name)
+        print(f"{name:<8}        {len(waits):3} calls, median {waits[len(waits) // 2]:.2f}s, max {waits[-1]:.2f}s")
+
+
+def bench_nlg(args):
+    """Template article writer throughput"""
+    import nlg
+
+    runs = max(1, args.size // 10)
+    start = time.perf_counter()
+    for _ in range(runs):
+        article = nlg.write_article(SAMPLE_FINANCIAL_DATA)
+    elapsed = time.perf_counter() - start
+
+    print(f"articles:       {runs:,}")
+    print(f"per article:    {elapsed / runs * 1e3:.3f} ms ({sum(len(v.split()) for v in article.values() if isinstance(v, str))} words)")
+
+
+def large_report():
+    """A report with many segments, quarters and highlights, and a long article"""
+    from demo import DEMO_ARTICLE_DATA
+
+    fd = dict(SAMPLE_FINANCIAL_DATA)
+    fd["segment_performance"] = [
+        {"segment": f"Segment {i}", "revenue": 1000 + 250 * i, "growth": i % 9 - 3} for i in range(24)
+    ]
+    fd["historical_quarters"] = [
+        {"quarter": f"Q{i % 4 + 1} FY{20 + i // 4}", "revenue": 60000 + 900 * i, "eps": 1.0 + i / 50} for i in range(16)
+    ]
+    fd["key_highlights"] = [f"Highlight {i}: services revenue reached a new record" for i in range(30)]
+    article = {key: value * 6 if isinstance(value, str) else value for key, value in DEMO_ARTICLE_DATA.items()}
+    return fd, article
+
+
+RERUN_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import app
+import benchmarks
+fd, article = benchmarks.large_report()
+{call}
+"""
+
+RESULT_FRAGMENTS = {
+    "article": "app.render_article_fragment(fd, article)",
+    "metrics": "app.render_metrics_fragment(fd)",
+    "charts": "app.render_charts_fragment(fd)",
+    "full article": "app.render_full_article_fragment(fd, article)",
+    "exports": "app.render_exports_fragment(fd, article)",
+}
+WHOLE_APP = "st.session_state.setdefault('financial_data', fd)\nst.session_state.setdefault('article_data', article)\napp.main()"
+
+
+def bench_rerun(args):
+    """Results-tab rerun time on a large report: whole-app rerun versus each fragment alone"""
+    import logging
+    import os
+    import statistics
+    from streamlit.testing.v1 import AppTest
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    runs = max(3, args.queries // 200)
+
+    def median_rerun(call):
+        at = AppTest.from_string(RERUN_SCRIPT.format(root=root, call=call), default_timeout=120)
+        at.run()  # warm caches and imports
+        # Bare-mode context warnings from AppTest are noise here (streamlit resets levels on import)
+        logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - start)
+        if at.exception:
+            raise SystemExit(at.exception[0].message)
+        return statistics.median(times)
+
+    fd, _ = large_report()
+    full = median_rerun(WHOLE_APP)
+    print(f"report:         {len(fd['segment_performance'])} segments, {len(fd['key_highlights'])} highlights, "
+          f"median of {runs} reruns")
+    print(f"whole app:      {full * 1e3:7.1f} ms")
+    for name, call in RESULT_FRAGMENTS.items():
+        elapsed = median_rerun(call)
+        print(f"{name + ':':<16}{elapsed * 1e3:7.1f} ms  ({full / elapsed:.1f}x faster)")
+
+
+def bench_archive(args):
+    """Loading a season for analytics: JSON report files vs the compacted Parquet archive"""
+    import tempfile
+    import dashboard
+    from parquet_archive import ParquetArchive
+    from store import ReportStore, write_json_atomic
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = ReportStore(data_dir)
+        for record in season_records(args.size):
+            write_json_atomic(os.path.join(store.reports_dir, f"{record['id']}.json"), record)
+        archive = ParquetArchive(os.path.join(data_dir, "archive"))
+
+        start = time.perf_counter()
+        archive.sync(store)
+        synced = time.perf_counter()
+        archive.compact()
+        compacted = time.perf_counter()
+
+        start_json = time.perf_counter()
+        reports, _ = dashboard.report_frames(list(store.iter_reports()))
+        json_elapsed = time.perf_counter() - start_json
+
+        start_parquet = time.perf_counter()
+        frame = archive.read(columns=["ticker", "sector", "revenue", "eps", "revenue_surprise_pct", "eps_beat"])
+        parquet_elapsed = time.perf_counter() - start_parquet
+
+        start_quarter = time.perf_counter()
+        quarter = archive.read(columns=["ticker", "revenue"], periods=["FY2024Q4"])
+        quarter_elapsed = time.perf_counter() - start_quarter
+
+    print(f"reports:        {len(reports):,} JSON, {len(frame):,} archived ({len(quarter):,} in FY2024Q4)")
+    print(f"sync + compact: {(synced - start) * 1e3:.0f} ms + {(compacted - synced) * 1e3:.0f} ms")
+    print(f"JSON load:      {json_elapsed * 1e3:.1f} ms")
+    print(f"Parquet load:   {parquet_elapsed * 1e3:.1f} ms (6 columns)")
+    print(f"one quarter:    {quarter_elapsed * 1e3:.1f} ms (2 columns)")
+
+
+# Per-stage peak ceilings for bench_memory: fixed bytes + bytes per transcript character.
+# Only extraction and storage see the whole transcript; the article prompt takes its first 3,000 characters
+MEMORY_SIZES = (10_000, 50_000, 100_000, 500_000)
+MEMORY_CEILINGS = {
+    "extract": (1_000_000, 8),
+    "derive": (512_000, 0),
+    "article": (512_000, 0),
+    "store": (256_000, 4),
+    "history": (512_000, 0),
+    "exports": (1_000_000, 0),
+}
+
+
+def bench_hedging(args):
+    """Extraction-sized calls against a stand-in with 2% stragglers, without and with hedging"""
+    import hedging
+    import mock_api
+    from pipeline import create_client, extraction_request
+    import ratelimit
+    from ratelimit import RateLimiter, create_message
+
+    server = mock_api.start_server(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, latency=0.05,
+                                   slow=0.02, slow_latency=0.5)
+    client = create_client("local").with_options(base_url=server.base_url)
+    request = extraction_request("Contoso reported revenue of $1.2 billion.")
+    calls = max(100, args.queries // 10)
+    random.seed(7)
+
+    for enabled in (False, True):
+        # Fresh process-wide limiter and hedging policy for each run
+        hedging._hedger = hedging.Hedger(enabled=enabled)
+        ratelimit._limiter = RateLimiter(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+        for _ in range(calls):
+            create_message(client, **request)
+        report = hedging.get_hedger().report()
+        print(f"{'hedged' if enabled else 'unhedged':<9} p50 {report['observed_p50'] * 1e3:5.0f} ms  "
+              f"p95 {report['observed_p95'] * 1e3:5.0f} ms  p99 {report['observed_p99'] * 1e3:5.0f} ms  "
+              f"hedge rate {report['hedge_rate']:.1%} ({report['hedge_wins']} won, "
+              f"{report['over_budget']} over budget)")
+    print(f"first attempts alone: p99 {report['unhedged_p99'] * 1e3:.0f} ms")
+    server.shutdown()
+
+
+def bench_memory(args):
+    """Peak and retained memory per pipeline stage for 10k-500k character transcripts, against ceilings"""
+    import tempfile
+    import mock_api
+    from history import ReportHistory, format_bytes
+    from memprofile import MemoryProfile
+    from metrics import apply_derived_metrics
+    from pipeline import create_client, extract_financial_data, generate_news_article
+    from report import generate_full_html_report, generate_email_html
+    from store import ReportStore
+
+    server = mock_api.start_server(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+    client = create_client("local").with_options(base_url=server.base_url)
+    client.rate_limited = False
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "evals", "golden", "contoso_q1_fy2026.txt"),
+              encoding="utf-8") as f:
+        paragraph = f.read()
+
+    def run(transcript, profile):
+        with tempfile.TemporaryDirectory() as data_dir:
+            with profile.stage("extract"):
+                financial_data = extract_financial_data(client, transcript)
+            with profile.stage("derive"):
+                financial_data, _ = apply_derived_metrics(financial_data)
+            with profile.stage("article"):
+                article_data = generate_news_article(client, financial_data, transcript)
+            with profile.stage("store"):
+                ReportStore(data_dir).save(transcript, financial_data, article_data)
+            with profile.stage("history"):
+                ReportHistory().add("report", "report", financial_data, article_data)
+            with profile.stage("exports"):
+                generate_full_html_report(financial_data, article_data)
+                generate_email_html(financial_data, article_data)
+
+    # Warm imports, template caches and connection pools so they are not charged to the first size
+    run(paragraph, MemoryProfile(enabled=False))
+
+    failures = []
+    print(f"{'chars':>8}  {'stage':<9} {'peak':>10} {'retained':>10} {'ceiling':>10}")
+    for size in MEMORY_SIZES:
+        profile = MemoryProfile(enabled=True)
+        run((paragraph * (size // len(paragraph) + 1))[:size], profile)
+        for row in profile.rows():
+            fixed, per_char = MEMORY_CEILINGS[row["stage"]]
+            ceiling = fixed + per_char * size
+            over = row["peak"] > ceiling
+            if over:
+                failures.append(f"{row['stage']} at {size:,} chars")
+            print(f"{size:>8,}  {row['stage']:<9} {format_bytes(row['peak']):>10} "
+                  f"{format_bytes(max(row['retained'], 0)):>10} {format_bytes(ceiling):>10}{'  OVER' if over else ''}")
+    server.shutdown()
+
+    if failures:
+        raise SystemExit(f"Memory ceilings exceeded: {', '.join(failures)}")
+    print("All stages within their memory ceilings")
+
+
+def bench_extraction(args):
+    """Monolithic vs schema-partitioned parallel extraction against the local API stand-in"""
+    import mock_api
+    from pipeline import EXTRACTION_GROUPS, create_client, extract_financial_data, extraction_request, group_prompt
+
+    # Generation-bound replies: latency grows with output tokens, as with the real API
+    server = mock_api.start_server(requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9, output_rate=200)
+    client = create_client("local").with_options(base_url=server.base_url)
+    client.rate_limited = False
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "evals", "golden", "contoso_q1_fy2026.txt"),
+              encoding="utf-8") as f:
+        transcript = f.read()
+
+    results = {}
+    for mode in ("monolithic", "parallel"):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            results[mode] = extract_financial_data(client, transcript, parallel=mode == "parallel")
+            timings.append(time.perf_counter() - start)
+        print(f"{mode:<15} median {sorted(timings)[1] * 1e3:6.0f} ms")
+    server.shutdown()
+
+    print(f"  monolithic      {len(mock_api.reply_text(extraction_request(transcript)['messages'][0]['content'])) // 4:5} output tokens")
+    for name in EXTRACTION_GROUPS:
+        print(f"  group {name:<11} {len(mock_api.reply_text(group_prompt(name) + transcript)) // 4:5} output tokens")
+    monolithic_input = len(extraction_request(transcript)["messages"][0]["content"]) // 4
+    parallel_input = sum(len(group_prompt(name) + transcript) // 4 for name in EXTRACTION_GROUPS)
+    print(f"input tokens:   {monolithic_input:,} monolithic, {parallel_input:,} parallel")
+    print(f"same result:    {results['parallel'] == results['monolithic']}")
+
+
+def bench_render(args):
+    """Rendering-stage throughput (all export artifacts per report) as workers are added"""
+    from archive_export import render_report
+    from demo import DEMO_ARTICLE_DATA
+    from render_pool import default_workers, render_stage
+
+    count = max(1, args.size // 25)
+    payloads = [(f"r{i}", SAMPLE_FINANCIAL_DATA, DEMO_ARTICLE_DATA) for i in range(count)]
+    cores = default_workers()
+    steps = sorted({1, *(2 ** i for i in range(1, cores.bit_length())), cores, cores * 2})
+
+    print(f"reports:        {count:,} ({cores} core(s) available)")
+    baseline = None
+    for workers in steps:
+        start = time.perf_counter()
+        rendered = sum(1 for _ in render_stage(render_report, payloads, workers))
+        rate = rendered / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{workers:>3} worker(s):   {rate:8.0f} reports/s  ({rate / baseline:.2f}x)")
+
+
+# Cold-start budgets in seconds, each measured in a fresh interpreter
+IMPORT_BUDGETS = {
+    "headless import": 0.3,
+    "worker startup": 0.5,
+    "first render": 3.0,
+}
+HEAVY_MODULES = ("streamlit", "plotly", "pandas", "pyarrow", "anthropic")
+# Modules that render, archive or schedule without the UI; they import HEAVY_MODULES only when used
+HEADLESS_MODULES = (
+    "pipeline", "report", "archive_export", "sitegen", "parquet_archive", "watcher", "hedging", "checkpoints", "nlg",
+)
+
+_HEADLESS_SCRIPT = f"""
+import sys
+import {", ".join(HEADLESS_MODULES)}
+loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]
+if loaded:
+    sys.exit("headless import pulled in: " + ", ".join(loaded))
+"""
+
+_WORKER_SCRIPT = """
+from demo import DEMO_FINANCIAL_DATA, DEMO_ARTICLE_DATA
+from archive_export import report_artifacts
+for _ in report_artifacts(DEMO_FINANCIAL_DATA, DEMO_ARTICLE_DATA):
+    pass
+"""
+
+_RENDER_SCRIPT = """
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=60).run()
+if app.exception:
+    raise SystemExit(app.exception[0].value)
+"""
+
+COLD_START_SCRIPTS = {
+    "headless import": _HEADLESS_SCRIPT,
+    "worker startup": _WORKER_SCRIPT,
+    "first render": _RENDER_SCRIPT,
+}
+
+
+def heavy_imports(*modules):
+    """HEAVY_MODULES loaded by importing the given modules in a fresh interpreter; RuntimeError if that fails"""
+    import subprocess
+
+    script = f"import sys\nimport {', '.join(modules)}\nprint(*[m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip() or f"importing {', '.join(modules)} exited with {result.returncode}")
+    return result.stdout.split()
+
+
+def cold_start_time(name, runs=3):
+    """Best wall time of COLD_START_SCRIPTS[name] in a fresh interpreter; RuntimeError if it fails"""
+    import subprocess
+
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", COLD_START_SCRIPTS[name]], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        elapsed = time.perf_counter() - start
+        if result.returncode:
+            raise RuntimeError(result.stderr.strip() or f"{name} exited with {result.returncode}")
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_imports(args):
+    """Cold-start times against IMPORT_BUDGETS (tests/test_imports.py checks them when NEWSMAKER_IMPORT_BUDGETS=1)"""
+    over = []
+    for name in COLD_START_SCRIPTS:
+        elapsed = cold_start_time(name)
+        budget = IMPORT_BUDGETS[name]
+        print(f"{name + ':':<16}{elapsed * 1000:7.0f} ms  (budget {budget * 1000:.0f} ms)")
+        if elapsed > budget:
+            over.append(name)
+    if over:
+        raise SystemExit(f"over budget: {', '.join(over)}")
+
+
+BENCHMARKS = {
+    "archive": bench_archive,
+    "charts": bench_charts,
+    "dashboard": bench_dashboard,
+    "dedup": bench_dedup,
+    "extraction": bench_extraction,
+    "hedging": bench_hedging,
+    "imports": bench_imports,
+    "memory": bench_memory,
+    "metrics": bench_metrics,
+    "nlg": bench_nlg,
+    "ratelimit": bench_ratelimit,
+    "render": bench_render,
+    "rerun": bench_rerun,
+    "svg": bench_svg,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Earnings News Generator benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--size", type=int, default=50000, help="number of stored items")
+    parser.add_argument("--queries", type=int, default=2000, help="number of lookups")
+    args = parser.parse_args(argv)
+    BENCHMARKS[args.name](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
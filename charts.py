@@ -0,0 +1,282 @@
+"""
+Chart Specs
+Plain dict/JSON plotly figure specs for the report charts, serialized straight
+to HTML without building plotly graph_objects (and paying for their validation)
+"""
+
+import json
+import uuid
+
+
+PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Subset of plotly's "plotly_white" template covering the trace types used here
+PLOTLY_WHITE = {
+    "data": {
+        "bar": [{"type": "bar", "error_x": {"color": "#2a3f5f"}, "error_y": {"color": "#2a3f5f"},
+                 "marker": {"line": {"color": "white", "width": 0.5}}}],
+        "pie": [{"type": "pie", "automargin": True}],
+        "scatter": [{"type": "scatter"}],
+    },
+    "layout": {
+        "autotypenumbers": "strict",
+        "colorway": ["#636efa", "#EF553B", "#00cc96", "#ab63fa", "#FFA15A",
+                     "#19d3f3", "#FF6692", "#B6E880", "#FF97FF", "#FECB52"],
+        "font": {"color": "#2a3f5f"},
+        "hovermode": "closest",
+        "hoverlabel": {"align": "left"},
+        "paper_bgcolor": "white",
+        "plot_bgcolor": "white",
+        "xaxis": {"gridcolor": "#EBF0F8", "linecolor": "#EBF0F8", "ticks": "", "title": {"standoff": 15},
+                  "zerolinecolor": "#EBF0F8", "automargin": True, "zerolinewidth": 2},
+        "yaxis": {"gridcolor": "#EBF0F8", "linecolor": "#EBF0F8", "ticks": "", "title": {"standoff": 15},
+                  "zerolinecolor": "#EBF0F8", "automargin": True, "zerolinewidth": 2},
+        "shapedefaults": {"line": {"color": "#2a3f5f"}},
+        "title": {"x": 0.05},
+    },
+}
+
+# plotly.express.colors.qualitative.Set2
+SET2 = ['rgb(102,194,165)', 'rgb(252,141,98)', 'rgb(141,160,203)', 'rgb(231,138,195)',
+        'rgb(166,216,84)', 'rgb(255,217,47)', 'rgb(229,196,148)', 'rgb(179,179,179)']
+
+
+def _layout(title, xaxis_title=None, yaxis_title=None, showlegend=False):
+    layout = {
+        "title": {"text": title, "font": {"size": 20}},
+        "template": PLOTLY_WHITE,
+        "height": 400,
+        "margin": {"t": 50, "b": 50, "l": 50, "r": 50},
+    }
+    if xaxis_title:
+        layout["xaxis"] = {"title": {"text": xaxis_title}}
+    if yaxis_title:
+        layout["yaxis"] = {"title": {"text": yaxis_title}}
+    if showlegend is not None:
+        layout["showlegend"] = showlegend
+    return layout
+
+
+def _current(financial_data, metric, default):
+    value = ((financial_data.get('current_quarter') or {}).get(metric) or {}).get('value')
+    return default if value is None else value
+
+
+def revenue_history(financial_data):
+    """Historical quarters for the revenue chart, synthesized when missing"""
+    historical = financial_data.get('historical_quarters')
+
+    if not historical:
+        # Create sample data if not available
+        current_rev = _current(financial_data, 'revenue', 100)
+        historical = [
+            {"quarter": "Q1", "revenue": current_rev * 0.9},
+            {"quarter": "Q2", "revenue": current_rev * 0.95},
+            {"quarter": "Q3", "revenue": current_rev * 0.98},
+            {"quarter": "Q4", "revenue": current_rev},
+        ]
+    return historical
+
+
+def eps_history(financial_data):
+    """Historical quarters for the EPS chart, synthesized when missing"""
+    historical = financial_data.get('historical_quarters')
+
+    if not historical:
+        current_eps = _current(financial_data, 'eps', 1.0)
+        historical = [
+            {"quarter": "Q1", "eps": current_eps * 0.85},
+            {"quarter": "Q2", "eps": current_eps * 0.90},
+            {"quarter": "Q3", "eps": current_eps * 0.95},
+            {"quarter": "Q4", "eps": current_eps},
+        ]
+    return historical
+
+
+def yoy_changes(financial_data):
+    """(metric, change) pairs for the YoY comparison chart"""
+    yoy = financial_data.get('year_over_year') or {}
+    return [
+        ('Revenue', yoy.get('revenue_change') or 0),
+        ('EPS', yoy.get('eps_change') or 0),
+        ('Net Income', yoy.get('net_income_change') or 0),
+    ]
+
+
+def revenue_chart_spec(financial_data):
+    """Revenue bars with trend line"""
+    historical = revenue_history(financial_data)
+    quarters = [h['quarter'] for h in historical]
+    revenues = [h.get('revenue', 0) for h in historical]
+
+    return {
+        "data": [
+            {
+                "type": "bar",
+                "x": quarters,
+                "y": revenues,
+                "marker": {"color": ['#4facfe', '#4facfe', '#4facfe', '#00f2fe']},
+                "text": [f"${r:,.0f}M" if r else "" for r in revenues],
+                "textposition": "outside",
+                "name": "Revenue",
+            },
+            {
+                "type": "scatter",
+                "x": quarters,
+                "y": revenues,
+                "mode": "lines+markers",
+                "line": {"color": "#ff6b6b", "width": 3},
+                "marker": {"size": 10},
+                "name": "Trend",
+            },
+        ],
+        "layout": _layout('Quarterly Revenue Trend', 'Quarter', 'Revenue ($ Millions)'),
+    }
+
+
+def eps_chart_spec(financial_data):
+    """EPS area chart"""
+    historical = eps_history(financial_data)
+    quarters = [h['quarter'] for h in historical]
+    eps_values = [h.get('eps', 0) for h in historical]
+
+    return {
+        "data": [{
+            "type": "scatter",
+            "x": quarters,
+            "y": eps_values,
+            "mode": "lines+markers+text",
+            "fill": "tozeroy",
+            "fillcolor": "rgba(102, 126, 234, 0.2)",
+            "line": {"color": "#667eea", "width": 3},
+            "marker": {"size": 12, "color": "#667eea"},
+            "text": [f"{'-' if e < 0 else ''}${abs(e):.2f}" if e else "" for e in eps_values],
+            "textposition": "top center",
+            "name": "EPS",
+        }],
+        "layout": _layout('Earnings Per Share Trend', 'Quarter', 'EPS ($)'),
+    }
+
+
+def segment_chart_spec(financial_data):
+    """Revenue by segment donut, or None without segment data"""
+    segments = financial_data.get('segment_performance')
+
+    if not segments:
+        return None
+
+    return {
+        "data": [{
+            "type": "pie",
+            "labels": [s['segment'] for s in segments],
+            "values": [s.get('revenue', 0) for s in segments],
+            "hole": 0.4,
+            "marker": {"colors": SET2},
+        }],
+        "layout": _layout('Revenue by Segment', showlegend=None),
+    }
+
+
+def comparison_chart_spec(financial_data):
+    """YoY change bars with a dashed zero line"""
+    metrics, changes = zip(*yoy_changes(financial_data))
+
+    layout = _layout('Year-over-Year Change', 'Metric', 'Change (%)')
+    layout["shapes"] = [{
+        "type": "line", "xref": "x domain", "x0": 0, "x1": 1, "yref": "y", "y0": 0, "y1": 0,
+        "line": {"dash": "dash", "color": "gray"},
+    }]
+
+    return {
+        "data": [{
+            "type": "bar",
+            "x": list(metrics),
+            "y": list(changes),
+            "marker": {"color": ['#38ef7d' if c >= 0 else '#ff4b2b' for c in changes]},
+            "text": [f"{c:+.1f}%" for c in changes],
+            "textposition": "outside",
+        }],
+        "layout": layout,
+    }
+
+
+CHART_SPECS = {
+    "revenue": revenue_chart_spec,
+    "eps": eps_chart_spec,
+    "comparison": comparison_chart_spec,
+    "segment": segment_chart_spec,
+}
+
+
+def spec_to_html(spec, full_html=True, include_plotlyjs='cdn', div_id=None):
+    """Serialize a figure spec the way plotly's Figure.to_html does"""
+    div_id = div_id or str(uuid.uuid4())
+    height = spec.get("layout", {}).get("height")
+    style = f"height:{height}px; width:100%;" if height else "height:100%; width:100%;"
+    data = json.dumps(spec.get("data", []), separators=(',', ':')).replace("</", "<\\/")
+    layout = json.dumps(spec.get("layout", {}), separators=(',', ':')).replace("</", "<\\/")
+
+    script_tag = f'<script charset="utf-8" src="{PLOTLY_CDN}"></script>' if include_plotlyjs == 'cdn' else ""
+    div = (
+        f'<div>{script_tag}'
+        f'<div id="{div_id}" class="plotly-graph-div" style="{style}"></div>'
+        f'<script type="text/javascript">window.PLOTLYENV=window.PLOTLYENV || {{}};'
+        f'if (document.getElementById("{div_id}")) {{'
+        f'Plotly.newPlot("{div_id}", {data}, {layout}, {{"responsive": true}})}};</script></div>'
+    )
+    if not full_html:
+        return div
+    return f'<html>\n<head><meta charset="utf-8" /></head>\n<body>\n{div}\n</body>\n</html>'
+
+
+def chart_html(name, financial_data, full_html=True, include_plotlyjs='cdn'):
+    """HTML for one named chart, or None when the chart has no data"""
+    spec = CHART_SPECS[name](financial_data)
+    if spec is None:
+        return None
+    return spec_to_html(spec, full_html=full_html, include_plotlyjs=include_plotlyjs)
+
+
+def chart_div(name, financial_data):
+    """Chart placeholder plus its JSON spec, drawn by the shared charts.js asset; None without data"""
+    spec = CHART_SPECS[name](financial_data)
+    if spec is None:
+        return None
+    layout = {key: value for key, value in spec["layout"].items() if key != "template"}
+    payload = json.dumps({"data": spec["data"], "layout": layout}, separators=(',', ':')).replace("</", "<\\/")
+    height = layout.get("height", 400)
+    return (
+        f'<div class="plotly-graph-div" style="height:{height}px; width:100%;"></div>'
+        f'<script type="application/json" class="figure-spec">{payload}</script>'
+    )
+
+
+def charts_js():
+    """Shared script that draws every chart_div on a page with the common template"""
+    template = json.dumps(PLOTLY_WHITE, separators=(',', ':'))
+    return f"""(function () {{
+  var template = {template};
+  function draw() {{
+    document.querySelectorAll("script.figure-spec").forEach(function (node) {{
+      var spec = JSON.parse(node.textContent);
+      spec.layout.template = template;
+      Plotly.newPlot(node.previousElementSibling, spec.data, spec.layout, {{"responsive": true}});
+    }});
+  }}
+  if (document.readyState === "loading") {{
+    document.addEventListener("DOMContentLoaded", draw);
+  }} else {{
+    draw();
+  }}
+}})();
+"""
+
+
+def validate_specs(financial_data):
+    """Build every spec through plotly graph_objects once; raises ValueError on an invalid property"""
+    import plotly.graph_objects as go
+
+    for build in CHART_SPECS.values():
+        spec = build(financial_data)
+        if spec is not None:
+            go.Figure(spec)
@@ -0,0 +1,138 @@
+"""
+Stage Checkpoints
+Durable outputs of each pipeline stage (extract, derive, article),
+keyed by a hash of the stage's inputs. A run that fails part-way - an article
+call that errors, a reply that isn't valid JSON, a crashed batch - resumes
+from the last completed stage instead of paying for the earlier LLM work
+again. They are resume points only: once the report is stored, the run's
+checkpoints are discarded, so generating the same transcript again calls the
+model again
+
+Usage: python checkpoints.py status [--data-dir DIR]
+       python checkpoints.py prune [--days 30] [--data-dir DIR]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+from store import DEFAULT_DATA_DIR, transcript_hash, write_json_atomic
+
+
+CHECKPOINT_DIR = "checkpoints"
+STAGES = ("extract", "derive", "article")
+
+
+def stage_key(*inputs):
+    """Content hash of a stage's inputs (any JSON-serializable values)"""
+    encoded = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+def extract_inputs(transcript, model, parallel=False):
+    """What an extraction depends on: the transcript, the model and the prompt(s)"""
+    from pipeline import EXTRACTION_GROUPS, EXTRACTION_PROMPT
+    return transcript_hash(transcript), model, EXTRACTION_GROUPS if parallel else EXTRACTION_PROMPT
+
+
+def article_inputs(financial_data, transcript, writer, model):
+    """What an article depends on: the derived data, the transcript and how it is written"""
+    return financial_data, transcript_hash(transcript), writer, model
+
+
+class CheckpointStore:
+    """One JSON file per stage output, DATA_DIR/checkpoints/<stage>/<input hash>.json
+
+    Only successful outputs are kept: a stage whose compute returns None is
+    run again next time.
+    """
+
+    def __init__(self, root=DEFAULT_DATA_DIR):
+        self.root = os.path.join(root, CHECKPOINT_DIR)
+
+    def _path(self, stage, inputs):
+        return os.path.join(self.root, stage, f"{stage_key(stage, *inputs)}.json")
+
+    def get(self, stage, inputs):
+        """Stored output of a stage for these inputs, or None
+
+        `inputs` is a tuple of everything the stage's output depends on.
+        """
+        try:
+            with open(self._path(stage, inputs), encoding="utf-8") as f:
+                return json.load(f)["output"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, stage, inputs, output):
+        os.makedirs(os.path.join(self.root, stage), exist_ok=True)
+        write_json_atomic(self._path(stage, inputs), {"stage": stage, "created_at": time.time(), "output": output})
+
+    def run(self, stage, inputs, compute):
+        """(output, resumed): the checkpointed output for inputs, else compute() checkpointed"""
+        output = self.get(stage, inputs)
+        if output is not None:
+            return output, True
+        output = compute()
+        if output is not None:
+            self.put(stage, inputs, output)
+        return output, False
+
+    def discard(self, stage, inputs):
+        """Remove the checkpoint for these inputs, if any"""
+        try:
+            os.remove(self._path(stage, inputs))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, run_inputs):
+        """Discard a finished run's resume points; run_inputs is {stage: inputs} for every stage"""
+        for stage, inputs in run_inputs.items():
+            self.discard(stage, inputs)
+
+    def counts(self):
+        """{stage: number of checkpoints}"""
+        return {
+            stage: len([name for name in os.listdir(os.path.join(self.root, stage)) if name.endswith(".json")])
+            if os.path.isdir(os.path.join(self.root, stage)) else 0
+            for stage in STAGES
+        }
+
+    def prune(self, max_age_days=30):
+        """Delete checkpoints older than max_age_days; returns how many"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        for stage in STAGES:
+            directory = os.path.join(self.root, stage)
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed += 1
+        return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or prune pipeline stage checkpoints")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="count checkpoints per stage")
+    prune_parser = commands.add_parser("prune", help="delete old checkpoints")
+    prune_parser.add_argument("--days", type=float, default=30)
+    args = parser.parse_args(argv)
+
+    checkpoints = CheckpointStore(args.data_dir)
+    if args.command == "status":
+        for stage, count in checkpoints.counts().items():
+            print(f"{stage:<8} {count:,}")
+    else:
+        print(f"Removed {checkpoints.prune(args.days):,} checkpoint(s) older than {args.days:g} day(s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Consensus Estimates
+Local store of analyst consensus (revenue and EPS estimates) keyed by ticker
+and fiscal period, imported in bulk from CSV or Parquet feeds. Reports take
+their estimates from here instead of from the transcript, so beat/miss and
+surprise are computed against the actual consensus
+
+Usage: python consensus.py import FILE [FILE ...] [--data-dir DIR]
+       python consensus.py show TICKER PERIOD [--data-dir DIR]
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import threading
+import time
+
+from store import DEFAULT_DATA_DIR
+
+
+CONSENSUS_FILE = "consensus.csv"
+FIELDS = ["ticker", "period", "revenue_estimate", "eps_estimate"]
+
+# Accepted feed column names -> store field
+COLUMN_ALIASES = {
+    "ticker": ["ticker", "symbol"],
+    "period": ["period", "fiscal_period"],
+    "quarter": ["quarter", "fiscal_quarter"],
+    "fiscal_year": ["fiscal_year", "year"],
+    "revenue_estimate": ["revenue_estimate", "revenue_consensus", "revenue_est", "revenue"],
+    "eps_estimate": ["eps_estimate", "eps_consensus", "eps_est", "eps"],
+}
+
+QUARTER = r"Q\s*([1-4])|\b([1-4])\s*Q"
+YEAR = r"(\d{4}|\d{2})"
+
+
+def period_key(quarter, fiscal_year=""):
+    """Canonical "FY2024Q4" for any of "Q4" + "FY2024", "Q4 FY24", "4Q24", "2024Q4" ...; None if unparseable"""
+    text = f"{quarter or ''} {fiscal_year or ''}".upper()
+    match = re.search(QUARTER, text)
+    if not match:
+        return None
+    year = re.search(YEAR, text[:match.start()] + " " + text[match.end():])
+    if not year:
+        return None
+    year = int(year.group(1))
+    return f"FY{year + 2000 if year < 100 else year}Q{match.group(1) or match.group(2)}"
+
+
+def _period_keys(text):
+    """period_key over a pandas Series of period strings"""
+    text = text.fillna("").astype(str).str.upper()
+    quarter = text.str.extract(QUARTER)
+    quarter = quarter[0].fillna(quarter[1])
+    year = text.str.replace(QUARTER, " ", n=1, regex=True).str.extract(YEAR)[0]
+    year = year.astype("float64")
+    year = year.where(year >= 100, year + 2000)
+    keys = "FY" + year.astype("Int64").astype(str) + "Q" + quarter
+    return keys.where(quarter.notna() & year.notna())
+
+
+def _number(value):
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class ConsensusStore:
+    """{(ticker, period): estimates} loaded from DATA_DIR/consensus.csv"""
+
+    def __init__(self, root=DEFAULT_DATA_DIR):
+        self.path = os.path.join(root, CONSENSUS_FILE)
+        self._estimates = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    self._estimates[(row["ticker"], row["period"])] = {
+                        "revenue_estimate": _number(row["revenue_estimate"]),
+                        "eps_estimate": _number(row["eps_estimate"]),
+                    }
+
+    def __len__(self):
+        return len(self._estimates)
+
+    def lookup(self, ticker, quarter, fiscal_year=""):
+        """Estimates for a ticker's fiscal period, or None"""
+        key = period_key(quarter, fiscal_year)
+        if not ticker or not key:
+            return None
+        return self._estimates.get((str(ticker).upper().strip(), key))
+
+    def import_file(self, path):
+        """Merge a CSV or Parquet consensus feed into the store; returns the number of rows imported
+
+        The feed needs a ticker column, a period column (or quarter and
+        fiscal_year columns), and revenue (USD millions) and/or EPS estimate
+        columns; see COLUMN_ALIASES for accepted names. Later rows win.
+        """
+        import pandas as pd
+
+        frame = pd.read_parquet(path) if path.endswith((".parquet", ".pq")) else pd.read_csv(path)
+        frame.columns = [str(column).strip().lower() for column in frame.columns]
+        columns = {}
+        for field, aliases in COLUMN_ALIASES.items():
+            columns[field] = next((alias for alias in aliases if alias in frame.columns), None)
+        if not columns["ticker"] or not (columns["period"] or columns["quarter"]):
+            raise ValueError(f"{path}: needs a ticker column and a period (or quarter and fiscal_year) column")
+        if not (columns["revenue_estimate"] or columns["eps_estimate"]):
+            raise ValueError(f"{path}: needs a revenue or EPS estimate column")
+
+        if columns["period"]:
+            periods = frame[columns["period"]].astype(str)
+        else:
+            periods = frame[columns["quarter"]].astype(str) + " " + (
+                frame[columns["fiscal_year"]].astype(str) if columns["fiscal_year"] else "")
+        rows = pd.DataFrame({
+            "ticker": frame[columns["ticker"]].astype(str).str.upper().str.strip(),
+            "period": _period_keys(periods),
+        })
+        for field in ("revenue_estimate", "eps_estimate"):
+            rows[field] = pd.to_numeric(frame[columns[field]], errors="coerce") if columns[field] else float("nan")
+        rows = rows.dropna(subset=["period"]).astype(object).where(rows.notna(), None)
+
+        with self._lock:
+            for ticker, period, revenue, eps in rows.itertuples(index=False, name=None):
+                self._estimates[(ticker, period)] = {"revenue_estimate": revenue, "eps_estimate": eps}
+            self._save()
+        return len(rows)
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for (ticker, period), estimates in sorted(self._estimates.items()):
+                writer.writerow([ticker, period, estimates["revenue_estimate"], estimates["eps_estimate"]])
+        os.replace(tmp_path, self.path)
+
+
+def attach_consensus(financial_data, consensus):
+    """financial_data with its estimates taken from the consensus store
+
+    Reports without a consensus entry are returned unchanged; beat/miss and
+    surprise are derived afterwards by metrics.apply_derived_metrics.
+    """
+    if not financial_data or consensus is None:
+        return financial_data
+    estimates = consensus.lookup(financial_data.get('ticker'), financial_data.get('quarter'),
+                                 financial_data.get('fiscal_year'))
+    if estimates is None:
+        return financial_data
+    return {**financial_data, "estimates": {**estimates, "source": "consensus"}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the local consensus estimates store")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="merge CSV/Parquet consensus feeds into the store")
+    import_parser.add_argument("files", nargs="+")
+    show_parser = commands.add_parser("show", help="print the estimates for one ticker and period")
+    show_parser.add_argument("ticker")
+    show_parser.add_argument("period", help='e.g. "Q4 FY2024" or 4Q24')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    consensus = ConsensusStore(args.data_dir)
+    if args.command == "show":
+        print(consensus.lookup(args.ticker, args.period) or "No consensus for that ticker and period")
+        return
+
+    imported = sum(consensus.import_file(path) for path in args.files)
+    print(f"Imported {imported:,} row(s); {len(consensus):,} ticker-period(s) in {consensus.path} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
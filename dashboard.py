@@ -0,0 +1,165 @@
+"""
+Earnings Season Dashboard
+Vectorized pandas aggregation over every stored report: surprise table, beat
+rates by sector, segment growth leaders and guidance raises/cuts
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from consensus import _period_keys
+from metrics import raw_frame, derive_metrics
+
+
+REPORT_COLUMNS = [
+    "id", "ticker", "company", "sector", "quarter", "fiscal_year", "created_at",
+    "revenue", "revenue_estimate", "revenue_surprise_pct", "revenue_beat",
+    "eps", "eps_estimate", "eps_surprise_pct", "eps_beat",
+    "yoy_revenue_change", "yoy_eps_change", "full_year_revenue_mid", "next_quarter_revenue_mid",
+]
+SEGMENT_COLUMNS = ["id", "ticker", "segment", "revenue", "growth"]
+
+
+def report_frames(records):
+    """Report-level and segment-level frames for a batch of stored records"""
+    if not records:
+        empty = pd.DataFrame(columns=REPORT_COLUMNS).astype({"created_at": "datetime64[ns]"})
+        return empty, pd.DataFrame(columns=SEGMENT_COLUMNS)
+
+    reports = [r['financial_data'] for r in records]
+    raw = raw_frame(reports)
+    derived = derive_metrics(raw)
+
+    meta = pd.DataFrame({
+        "id": [r['id'] for r in records],
+        "ticker": [fd.get('ticker') for fd in reports],
+        "company": [fd.get('company_name') for fd in reports],
+        "sector": [fd.get('sector') or "Unknown" for fd in reports],
+        "quarter": [fd.get('quarter') for fd in reports],
+        "fiscal_year": [fd.get('fiscal_year') for fd in reports],
+        "created_at": pd.to_datetime([r.get('created_at') for r in records], errors="coerce"),
+    })
+    frame = pd.concat([meta, raw, derived], axis=1)[REPORT_COLUMNS]
+
+    segments = pd.DataFrame([
+        {
+            "id": record['id'],
+            "ticker": fd.get('ticker'),
+            "segment": seg.get('segment'),
+            "revenue": seg.get('revenue'),
+            "growth": seg.get('growth'),
+        }
+        for record, fd in zip(records, reports)
+        for seg in fd.get('segment_performance') or []
+        if isinstance(seg, dict)
+    ], columns=SEGMENT_COLUMNS)
+    segments[["revenue", "growth"]] = segments[["revenue", "growth"]].apply(pd.to_numeric, errors="coerce")
+
+    return frame, segments
+
+
+def surprise_table(reports):
+    """Revenue/EPS actual vs estimate per company, biggest revenue surprise first"""
+    columns = [
+        "ticker", "company", "sector", "quarter", "fiscal_year",
+        "revenue", "revenue_estimate", "revenue_surprise_pct", "revenue_beat",
+        "eps", "eps_estimate", "eps_surprise_pct", "eps_beat", "yoy_revenue_change",
+    ]
+    return reports[columns].sort_values("revenue_surprise_pct", ascending=False, na_position="last")
+
+
+def beat_rates_by_sector(reports):
+    """Share of companies beating revenue and EPS estimates per sector"""
+    grouped = reports.assign(
+        revenue_beat=reports["revenue_beat"].astype("Float64"),
+        eps_beat=reports["eps_beat"].astype("Float64"),
+    ).groupby("sector")
+    rates = pd.DataFrame({
+        "reports": grouped["id"].count(),
+        "revenue_beat_rate": grouped["revenue_beat"].mean() * 100,
+        "eps_beat_rate": grouped["eps_beat"].mean() * 100,
+        "avg_revenue_surprise_pct": grouped["revenue_surprise_pct"].mean(),
+        "avg_eps_surprise_pct": grouped["eps_surprise_pct"].mean(),
+    })
+    return rates.sort_values("reports", ascending=False).round(1)
+
+
+def segment_leaders(segments, report_ids, n=15):
+    """Fastest-growing segments among the given reports"""
+    selected = segments[segments["id"].isin(report_ids)].dropna(subset=["growth"])
+    return selected.nlargest(n, "growth")[["ticker", "segment", "revenue", "growth"]]
+
+
+def guidance_changes(reports):
+    """Full-year revenue guidance midpoint versus the same company's previous quarter of that fiscal year
+
+    Reports are ordered by fiscal period, not created_at (which every save
+    rewrites). A quarter stored more than once counts with its latest report;
+    reports without a recognizable period are left out.
+    """
+    periods = _period_keys(reports["quarter"].fillna("").astype(str) + " " + reports["fiscal_year"].fillna("").astype(str))
+    ordered = (
+        reports.assign(period=periods, period_year=periods.str[:6])
+        .dropna(subset=["period"])
+        .sort_values(["ticker", "period", "created_at"])
+        .drop_duplicates(["ticker", "period"], keep="last")
+    )
+    previous = ordered.groupby(["ticker", "period_year"])["full_year_revenue_mid"].shift()
+    change_pct = ((ordered["full_year_revenue_mid"] - previous) / previous.abs() * 100).round(1)
+    action = np.select([change_pct > 0, change_pct < 0], ["Raised", "Cut"], "Maintained")
+    changes = pd.DataFrame({
+        "id": ordered["id"],
+        "ticker": ordered["ticker"],
+        "company": ordered["company"],
+        "period": ordered["period"],
+        "previous_mid": previous,
+        "current_mid": ordered["full_year_revenue_mid"],
+        "change_pct": change_pct,
+        "action": np.where(change_pct.isna(), None, action),
+    })
+    return changes.dropna(subset=["action"])
+
+
+def _replace_rows(frame, stale_ids, new_rows):
+    kept = frame[~frame["id"].isin(stale_ids)]
+    if kept.empty:
+        return new_rows.reset_index(drop=True)
+    if new_rows.empty:
+        return kept.reset_index(drop=True)
+    return pd.concat([kept, new_rows], ignore_index=True)
+
+
+class SeasonDashboard:
+    """Report frames kept in memory and refreshed incrementally from a ReportStore"""
+
+    def __init__(self, store):
+        self.store = store
+        self.mtimes = {}
+        self.reports, self.segments = report_frames([])
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Load only the reports added or changed since the last refresh; return how many"""
+        with self._lock:
+            current = self.store.modified_times()
+            changed = [report_id for report_id, mtime in current.items() if self.mtimes.get(report_id) != mtime]
+            stale = set(changed) | (self.mtimes.keys() - current.keys())
+            if not stale:
+                return 0
+
+            records = [r for r in (self.store.load(report_id) for report_id in changed) if r]
+            new_reports, new_segments = report_frames(records)
+            self.reports = _replace_rows(self.reports, stale, new_reports)
+            self.segments = _replace_rows(self.segments, stale, new_segments)
+            self.mtimes = current
+            return len(changed)
+
+    def days(self):
+        """Reporting days with at least one stored report, newest first"""
+        return sorted(self.reports["created_at"].dropna().dt.date.unique(), reverse=True)
+
+    def for_day(self, day):
+        """Reports produced on the given day"""
+        return self.reports[self.reports["created_at"].dt.date == day]
@@ -0,0 +1,185 @@
+"""
+Near-Duplicate Transcript Detection
+SimHash fingerprints over normalized transcripts with a banded lookup index,
+so the same call re-sent by another vendor reuses the earlier extraction
+"""
+
+import json
+import os
+import re
+import difflib
+import hashlib
+from collections import Counter
+
+
+SIMHASH_BITS = 64
+BANDS = 4
+BAND_BITS = SIMHASH_BITS // BANDS
+MAX_DISTANCE = 2 * BANDS - 1
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.9
+
+# "Tim Cook, CEO:", "Operator:", "[Sample - Replace with actual transcript]"
+SPEAKER_LABEL = re.compile(r"^\s*(?:\[[^\]\n]{0,80}\]|[^\n:.!?]{1,60}:)\s*", re.MULTILINE)
+DISCLAIMER = re.compile(
+    r"forward[- ]looking statements?|safe harbor|copyright|all rights reserved|"
+    r"transcript (?:is )?provided by|may not be (?:reproduced|redistributed)|"
+    r"for informational purposes",
+    re.IGNORECASE
+)
+TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+
+class DuplicateMatch:
+    """A stored report that a submitted transcript nearly duplicates"""
+
+    def __init__(self, report_id, similarity):
+        self.report_id = report_id
+        self.similarity = similarity
+
+    def __repr__(self):
+        return f"DuplicateMatch({self.report_id!r}, {self.similarity:.3f})"
+
+
+def normalize_transcript(transcript):
+    """Strip speaker labels, disclaimers, punctuation and whitespace differences"""
+    lines = [
+        SPEAKER_LABEL.sub("", line)
+        for line in transcript.splitlines()
+        if not DISCLAIMER.search(line)
+    ]
+    return " ".join(TOKEN.findall(" ".join(lines).lower()))
+
+
+def simhash(tokens):
+    """64-bit SimHash over word shingles of a token list"""
+    if len(tokens) >= SHINGLE_SIZE:
+        shingles = (" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1))
+    else:
+        shingles = iter([" ".join(tokens)])
+
+    # Count (byte position, byte value) pairs instead of looping over 64 bits per shingle
+    byte_counts = Counter()
+    total = 0
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest()
+        byte_counts.update(enumerate(digest))
+        total += 1
+
+    ones = [0] * SIMHASH_BITS
+    for (position, value), count in byte_counts.items():
+        for bit in range(8):
+            if value >> bit & 1:
+                ones[position * 8 + bit] += count
+
+    fingerprint = 0
+    for bit, count in enumerate(ones):
+        if count * 2 > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def fingerprint_transcript(transcript):
+    """Return (simhash, exact digest) of the normalized transcript"""
+    normalized = normalize_transcript(transcript)
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return simhash(normalized.split()), digest
+
+
+def similarity(fp_a, fp_b):
+    """Fraction of matching SimHash bits"""
+    return 1 - (fp_a ^ fp_b).bit_count() / SIMHASH_BITS
+
+
+def _bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [(fingerprint >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+
+class FingerprintIndex:
+    """In-memory banded SimHash index backed by an append-only JSONL file
+
+    Two fingerprints within 2 * BANDS - 1 differing bits have at least one
+    band that differs in at most one bit, so probing each band key and its
+    single-bit flips finds every match while touching only a few buckets.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.fingerprints = {}
+        self.exact = {}
+        self.buckets = [{} for _ in range(BANDS)]
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line after a crash
+                self._insert(entry["id"], int(entry["simhash"], 16), entry.get("digest"))
+
+    def _insert(self, report_id, fingerprint, digest):
+        self.fingerprints[report_id] = fingerprint
+        if digest:
+            self.exact[digest] = report_id
+        for band, key in zip(self.buckets, _bands(fingerprint)):
+            band.setdefault(key, []).append(report_id)
+
+    def add(self, report_id, fingerprint, digest=None):
+        """Index a processed transcript and persist it"""
+        if report_id in self.fingerprints:
+            return
+        self._insert(report_id, fingerprint, digest)
+        if self.path:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"id": report_id, "simhash": f"{fingerprint:016x}", "digest": digest}) + "\n")
+
+    def query(self, fingerprint, digest=None, threshold=DEFAULT_THRESHOLD):
+        """Best stored match at or above the similarity threshold, or None"""
+        if digest and digest in self.exact:
+            return DuplicateMatch(self.exact[digest], 1.0)
+
+        max_distance = min(int((1 - threshold) * SIMHASH_BITS), MAX_DISTANCE)
+        flips = [0] if max_distance < BANDS else [0] + [1 << bit for bit in range(BAND_BITS)]
+        best_id, best_distance = None, max_distance + 1
+        seen = set()
+        for band, key in zip(self.buckets, _bands(fingerprint)):
+            for flip in flips:
+                for report_id in band.get(key ^ flip, ()):
+                    if report_id in seen:
+                        continue
+                    seen.add(report_id)
+                    distance = (fingerprint ^ self.fingerprints[report_id]).bit_count()
+                    if distance < best_distance:
+                        best_id, best_distance = report_id, distance
+
+        if best_id is None:
+            return None
+        return DuplicateMatch(best_id, 1 - best_distance / SIMHASH_BITS)
+
+
+def _passages(transcript):
+    return [" ".join(line.split()) for line in transcript.splitlines() if line.strip()]
+
+
+def diff_passages(previous, submitted):
+    """List the passages that differ between a stored and a submitted transcript"""
+    old, new = _passages(previous), _passages(submitted)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    changes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        changes.append({
+            "change": tag,
+            "previous": "\n".join(old[i1:i2]),
+            "submitted": "\n".join(new[j1:j2]),
+        })
+    return changes
@@ -0,0 +1,77 @@
+"""
+Demo Data
+Sample Apple earnings data and article used in demo mode and cold-start checks
+"""
+
+from datetime import datetime
+
+
+# Demo data for testing without API key
+DEMO_FINANCIAL_DATA = {
+    "company_name": "Apple Inc.",
+    "ticker": "AAPL",
+    "sector": "Technology",
+    "quarter": "Q4",
+    "fiscal_year": "FY2024",
+    "report_date": datetime.now().strftime("%Y-%m-%d"),
+    "current_quarter": {
+        "revenue": {"value": 89500, "currency": "USD"},
+        "net_income": {"value": 22956, "currency": "USD"},
+        "eps": {"value": 1.46, "diluted": True},
+        "gross_margin": {"value": 45.2},
+        "operating_income": {"value": 26885, "currency": "USD"}
+    },
+    "year_over_year": {
+        "revenue_change": 6.0,
+        "eps_change": 13.2,
+        "net_income_change": 10.5
+    },
+    "quarter_over_quarter": {
+        "revenue_change": 2.3,
+        "eps_change": 4.1
+    },
+    "estimates": {
+        "revenue_estimate": 87200,
+        "eps_estimate": 1.39,
+        "revenue_beat": True,
+        "eps_beat": True
+    },
+    "guidance": {
+        "next_quarter_revenue": {"low": 92000, "high": 96000},
+        "full_year_revenue": {"low": 380000, "high": 395000},
+        "next_quarter_eps": {"low": 1.50, "high": 1.58}
+    },
+    "historical_quarters": [
+        {"quarter": "Q1 FY24", "revenue": 81800, "eps": 1.29},
+        {"quarter": "Q2 FY24", "revenue": 84300, "eps": 1.33},
+        {"quarter": "Q3 FY24", "revenue": 87500, "eps": 1.40},
+        {"quarter": "Q4 FY24", "revenue": 89500, "eps": 1.46}
+    ],
+    "key_highlights": [
+        "iPhone revenue reached $43.8 billion, up 5% YoY",
+        "Services segment hit all-time high of $22.2 billion, growing 14% YoY",
+        "Returned $25 billion to shareholders through dividends and buybacks",
+        "Strong cash position of $162 billion"
+    ],
+    "segment_performance": [
+        {"segment": "iPhone", "revenue": 43800, "growth": 5.0},
+        {"segment": "Services", "revenue": 22200, "growth": 14.0},
+        {"segment": "Wearables", "revenue": 9000, "growth": -2.0},
+        {"segment": "Mac", "revenue": 7600, "growth": 3.0},
+        {"segment": "iPad", "revenue": 7000, "growth": 8.0}
+    ],
+    "ceo_quote": "We're thrilled to report another record-breaking quarter with strong performance across our product lineup and services.",
+    "outlook": "We expect continued growth driven by our services segment and upcoming product launches."
+}
+
+DEMO_ARTICLE_DATA = {
+    "headline": "Apple Q4 FY2024 Earnings Beat: Revenue Up 6% to $89.5B, EPS Surges 13%",
+    "subheadline": "Services segment hits all-time high as iPhone sales remain strong",
+    "lead": "Apple Inc. (NASDAQ: AAPL) reported stellar fourth-quarter results that exceeded Wall Street expectations, with revenue climbing 6% year-over-year to $89.5 billion and earnings per share jumping 13% to $1.46. The tech giant's performance was driven by robust iPhone sales and a record-breaking quarter for its high-margin Services business.",
+    "key_numbers": "Revenue of $89.5 billion topped analyst estimates of $87.2 billion, representing a $2.3 billion beat. Diluted EPS of $1.46 crushed the consensus estimate of $1.39 by 5%. Gross margin expanded to 45.2% from 44.5% in the year-ago quarter, reflecting improved operational efficiency and favorable product mix. The company generated operating income of $26.9 billion, up 8% year-over-year.",
+    "segment_details": "iPhone remained the largest revenue contributor at $43.8 billion, up 5% YoY despite a challenging smartphone market. The Services segment was the star performer, hitting an all-time high of $22.2 billion with 14% growth, driven by App Store, Apple Music, and iCloud subscriptions. Mac revenue came in at $7.6 billion (+3%), while iPad saw an 8% increase to $7.0 billion. Wearables, Home and Accessories declined 2% to $9.0 billion amid market saturation.",
+    "management_commentary": "CEO Tim Cook expressed optimism about the company's trajectory: 'We're thrilled to report another record-breaking quarter with strong performance across our product lineup and services. Our ecosystem continues to expand, and customer satisfaction remains at all-time highs.' CFO Luca Maestri highlighted the company's capital return program, noting that Apple returned $25 billion to shareholders this quarter through dividends and share repurchases.",
+    "outlook": "For Q1 FY2025, Apple guided revenue between $92 billion and $96 billion, representing 5-8% year-over-year growth. EPS is expected in the range of $1.50 to $1.58. Management expressed confidence in the upcoming holiday season, citing strong demand for the new iPhone lineup and continued momentum in Services. The company maintains a robust cash position of $162 billion, providing flexibility for future investments and shareholder returns.",
+    "conclusion": "Apple's Q4 results demonstrate the company's ability to deliver consistent growth despite macroeconomic headwinds. With a diversified revenue base, expanding services ecosystem, and loyal customer base, Apple remains well-positioned for continued success. The stock gained 2% in after-hours trading following the earnings release.",
+    "read_time": 4
+}
@@ -0,0 +1,341 @@
+"""
+Extraction Evals
+Runs the extraction pipeline over a golden set of transcripts under each
+configured variant (model, prompt, chunking, pre-extraction, parallel) and compares
+per-field accuracy against latency, tokens and cost. Model responses are
+recorded once with --record and replayed offline afterwards, so prompt and
+performance changes can be checked for quality regressions without API calls.
+--record --stand-in records against the local API stand-in answering each
+golden case with its expected data, which is how the committed recordings
+were made: they catch regressions in parsing, chunking and merging, not in
+the model
+
+Usage: python evals.py [--golden DIR] [--variants FILE] [--recordings DIR] [--record [--stand-in]] [--csv FILE]
+"""
+
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import pipeline
+from sections import flatten_fields
+
+
+EVALS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "evals")
+GOLDEN_DIR = os.path.join(EVALS_DIR, "golden")
+VARIANTS_FILE = os.path.join(EVALS_DIR, "variants.json")
+RECORDINGS_DIR = os.path.join(EVALS_DIR, "recordings")
+
+RELATIVE_TOLERANCE = 0.005
+# Stand-in pacing for --stand-in recordings: a fixed overhead plus output generated at this many tokens/s
+STAND_IN_LATENCY = 0.3
+STAND_IN_OUTPUT_RATE = 150
+COMPANY_SUFFIXES = re.compile(r"\b(inc|corp|corporation|co|company|ltd|plc|llc|group|holdings)\b")
+
+
+class MissingRecording(LookupError):
+    pass
+
+
+def request_key(kwargs):
+    """Stable hash of a messages.create request"""
+    return hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode("utf-8")).hexdigest()[:24]
+
+
+def _raw_response(record):
+    message = SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=record["text"])],
+        usage=SimpleNamespace(input_tokens=record["input_tokens"], output_tokens=record["output_tokens"]),
+    )
+    return SimpleNamespace(headers={}, parse=lambda: message)
+
+
+class ReplayClient:
+    """Stands in for the Anthropic client, answering from recorded responses"""
+
+    rate_limited = False
+
+    def __init__(self, recordings):
+        self.recordings = recordings
+        self.calls = []
+        self.messages = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        key = request_key(kwargs)
+        if key not in self.recordings:
+            raise MissingRecording(key)
+        self.calls.append(self.recordings[key])
+        return _raw_response(self.recordings[key])
+
+
+class RecordingClient:
+    """Wraps a live client and records every response with its latency and usage"""
+
+    def __init__(self, client, recordings):
+        self.client = client
+        self.recordings = recordings
+        self.calls = []
+        self.messages = SimpleNamespace(with_raw_response=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        start = time.perf_counter()
+        raw = self.client.messages.with_raw_response.create(**kwargs)
+        message = raw.parse()
+        record = {
+            "text": message.content[0].text,
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "latency": time.perf_counter() - start,
+        }
+        self.recordings[request_key(kwargs)] = record
+        self.calls.append(record)
+        return raw
+
+
+def load_golden(golden_dir):
+    """[(case name, transcript, expected financial_data)] for every NAME.txt with a NAME.json"""
+    cases = []
+    for path in sorted(glob.glob(os.path.join(golden_dir, "*.txt"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        with open(path, encoding="utf-8") as f:
+            transcript = f.read()
+        with open(os.path.join(golden_dir, name + ".json"), encoding="utf-8") as f:
+            cases.append((name, transcript, json.load(f)))
+    return cases
+
+
+def load_variants(path):
+    """Variant dicts; a "prompt" entry is a file path relative to the variants file"""
+    with open(path, encoding="utf-8") as f:
+        variants = json.load(f)
+    for variant in variants:
+        if variant.get("prompt"):
+            with open(os.path.join(os.path.dirname(path), variant["prompt"]), encoding="utf-8") as f:
+                variant["prompt_text"] = f.read()
+    return variants
+
+
+def _normalize_text(value):
+    text = COMPANY_SUFFIXES.sub("", str(value).lower())
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").replace("$", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def field_matches(expected, actual):
+    """Numbers within RELATIVE_TOLERANCE, text equal after normalization, null only matches empty"""
+    if expected is None:
+        return actual in (None, "", [], {})
+    expected_number, actual_number = _as_number(expected), _as_number(actual)
+    if expected_number is not None:
+        if actual_number is None:
+            return False
+        return abs(expected_number - actual_number) <= max(abs(expected_number) * RELATIVE_TOLERANCE, 0.005)
+    return _normalize_text(expected) == _normalize_text(actual)
+
+
+def _segment_fields(data):
+    """Segment fields keyed by segment name, so list order does not matter"""
+    fields = {}
+    for segment in (data or {}).get("segment_performance") or []:
+        if isinstance(segment, dict) and segment.get("segment"):
+            name = _normalize_text(segment["segment"])
+            for key in ("revenue", "growth"):
+                fields[f"segment_performance[{name}].{key}"] = segment.get(key)
+    return fields
+
+
+def score_case(expected, actual):
+    """{field: matched} for every field in the expected data"""
+    actual = actual or {}
+    expected_fields = flatten_fields({k: v for k, v in expected.items() if k != "segment_performance"})
+    actual_fields = flatten_fields({k: v for k, v in actual.items() if k != "segment_performance"})
+    scores = {path: field_matches(value, actual_fields.get(path)) for path, value in expected_fields.items()}
+
+    actual_segments = _segment_fields(actual)
+    for path, value in _segment_fields(expected).items():
+        scores[path] = field_matches(value, actual_segments.get(path))
+    return scores
+
+
+def _percentile(values, q):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+def _wall_latency(latencies, parallel):
+    """Latency of a case's calls: their sum, or for parallel extraction the slowest call per wave of workers"""
+    if not parallel or not latencies:
+        return sum(latencies)
+    waves = math.ceil(len(latencies) / pipeline.MAX_PARALLEL_REQUESTS)
+    return max(latencies) * waves
+
+
+def run_variant(variant, cases, record=False, live_client=None, recordings_dir=RECORDINGS_DIR):
+    """Extract every case under one variant; returns per-case results"""
+    results = []
+    for name, transcript, expected in cases:
+        path = os.path.join(recordings_dir, variant["name"], name + ".json")
+        if record:
+            client = RecordingClient(live_client, {})
+        else:
+            recordings = {}
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    recordings = json.load(f)
+            client = ReplayClient(recordings)
+
+        try:
+            actual = pipeline.extract_financial_data(
+                client, transcript,
+                model=variant.get("model", pipeline.MODEL),
+                prompt=variant.get("prompt_text", pipeline.EXTRACTION_PROMPT),
+                chunk_chars=variant.get("chunk_chars"),
+                pre_extract=variant.get("pre_extract", False),
+                parallel=variant.get("parallel", False),
+            )
+        except MissingRecording:
+            raise SystemExit(f"No recording for {name} under variant '{variant['name']}'; "
+                             f"run with --record and an API key first")
+
+        if record:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(client.recordings, f, indent=2)
+
+        results.append({
+            "case": name,
+            "scores": score_case(expected, actual),
+            "latency": _wall_latency([call["latency"] for call in client.calls], variant.get("parallel", False)),
+            "input_tokens": sum(call["input_tokens"] for call in client.calls),
+            "output_tokens": sum(call["output_tokens"] for call in client.calls),
+            "calls": len(client.calls),
+        })
+    return results
+
+
+def summarize(variant, results):
+    """One comparison-table row for a variant"""
+    scores = [matched for r in results for matched in r["scores"].values()]
+    latencies = sorted(r["latency"] for r in results)
+    input_tokens = sum(r["input_tokens"] for r in results)
+    output_tokens = sum(r["output_tokens"] for r in results)
+    input_price, output_price = pipeline.MODEL_PRICES.get(variant.get("model", pipeline.MODEL), (0.0, 0.0))
+    cost = (input_tokens * input_price + output_tokens * output_price) / 1e6
+    return {
+        "variant": variant["name"],
+        "accuracy": 100 * sum(scores) / len(scores) if scores else 0.0,
+        "p50_latency": _percentile(latencies, 50),
+        "p95_latency": _percentile(latencies, 95),
+        "input_tokens": input_tokens / len(results),
+        "output_tokens": output_tokens / len(results),
+        "calls": sum(r["calls"] for r in results) / len(results),
+        "cost": cost / len(results),
+    }
+
+
+def field_accuracy(results):
+    """{field: % of cases where it matched}"""
+    totals = {}
+    for r in results:
+        for field, matched in r["scores"].items():
+            hits, count = totals.get(field, (0, 0))
+            totals[field] = (hits + matched, count + 1)
+    return {field: 100 * hits / count for field, (hits, count) in totals.items()}
+
+
+def format_table(rows, columns):
+    """Plain-text table; columns are (key, header, format) triples"""
+    cells = [[header for _, header, _ in columns]]
+    cells += [[fmt.format(row[key]) if row.get(key) is not None else "-" for key, _, fmt in columns] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    lines = ["  ".join(cell.ljust(width) if i == 0 else cell.rjust(width)
+                       for i, (cell, width) in enumerate(zip(line, widths))) for line in cells]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+SUMMARY_COLUMNS = [
+    ("variant", "variant", "{}"),
+    ("accuracy", "accuracy %", "{:.1f}"),
+    ("p50_latency", "p50 s", "{:.2f}"),
+    ("p95_latency", "p95 s", "{:.2f}"),
+    ("input_tokens", "in tok", "{:,.0f}"),
+    ("output_tokens", "out tok", "{:,.0f}"),
+    ("calls", "calls", "{:.1f}"),
+    ("cost", "$/transcript", "{:.4f}"),
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate extraction variants against the golden set")
+    parser.add_argument("--golden", default=GOLDEN_DIR, help="directory of NAME.txt transcripts with NAME.json expectations")
+    parser.add_argument("--variants", default=VARIANTS_FILE, help="JSON list of variants")
+    parser.add_argument("--recordings", default=RECORDINGS_DIR, help="directory of recorded responses")
+    parser.add_argument("--only", action="append", help="run only these variants")
+    parser.add_argument("--record", action="store_true", help="call the API (ANTHROPIC_API_KEY) and re-record responses")
+    parser.add_argument("--stand-in", action="store_true",
+                        help="with --record, record against the local API stand-in answering from the golden set")
+    parser.add_argument("--csv", help="also write the per-variant summary as CSV")
+    args = parser.parse_args(argv)
+
+    cases = load_golden(args.golden)
+    if not cases:
+        raise SystemExit(f"No golden cases in {args.golden}")
+    variants = [v for v in load_variants(args.variants) if not args.only or v["name"] in args.only]
+
+    live_client = None
+    if args.record and args.stand_in:
+        import anthropic
+        import mock_api
+
+        server = mock_api.start_server(requests_per_minute=10000, tokens_per_minute=10**8, answers=args.golden,
+                                       latency=STAND_IN_LATENCY, output_rate=STAND_IN_OUTPUT_RATE)
+        live_client = anthropic.Anthropic(api_key="stand-in", base_url=server.base_url, max_retries=0)
+    elif args.record:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise SystemExit("--record needs ANTHROPIC_API_KEY")
+        live_client = pipeline.create_client(api_key)
+
+    summaries, fields = [], {}
+    for variant in variants:
+        results = run_variant(variant, cases, record=args.record, live_client=live_client,
+                              recordings_dir=args.recordings)
+        summaries.append(summarize(variant, results))
+        for field, accuracy in field_accuracy(results).items():
+            fields.setdefault(field, {"field": field})[variant["name"]] = accuracy
+
+    print(f"{len(cases)} golden transcript(s), {len(variants)} variant(s)\n")
+    print(format_table(summaries, SUMMARY_COLUMNS))
+    print()
+    print(format_table(list(fields.values()), [("field", "field", "{}")] + [(v["name"], v["name"], "{:.0f}") for v in variants]))
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=[key for key, _, _ in SUMMARY_COLUMNS])
+            writer.writeheader()
+            writer.writerows(summaries)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Hedged Requests
+Cuts the tail latency of API calls: when a call is still running after a
+percentile of the latency recently observed for calls like it, a duplicate is
+sent and whichever finishes first is used. A budget caps the duplicates at a
+fraction of all calls. Off unless NEWSMAKER_HEDGE=1
+"""
+
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+
+HEDGE_ENABLED = os.environ.get("NEWSMAKER_HEDGE", "") not in ("", "0")
+HEDGE_PERCENTILE = float(os.environ.get("NEWSMAKER_HEDGE_PERCENTILE", "95"))
+HEDGE_BUDGET = float(os.environ.get("NEWSMAKER_HEDGE_BUDGET", "0.05"))
+HEDGE_BURST = 3
+MIN_SAMPLES = 20
+WINDOW = 500
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty sequence"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+class Hedger:
+    """Hedging policy with per-kind latency windows and a duplicate-request budget
+
+    Every call earns `budget` hedge credits (up to `burst`) and a hedge spends
+    one, so duplicates stay within budget * calls + burst. The losing attempt
+    is cancelled through its event: attempts still queued for rate-limit
+    budget are withdrawn, while one already in flight is abandoned and its
+    reply discarded (the sync SDK cannot abort a request). Its completion
+    time is still recorded, so stats show what callers would have waited
+    without hedging.
+    """
+
+    def __init__(self, enabled=HEDGE_ENABLED, percentile=HEDGE_PERCENTILE, budget=HEDGE_BUDGET,
+                 burst=HEDGE_BURST, min_samples=MIN_SAMPLES):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        self.stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "over_budget": 0, "busy": 0}
+        self._credit = float(burst)
+        self._latencies = {}  # kind -> recent attempt latencies, for the hedge delay
+        self._observed = deque(maxlen=WINDOW)  # latency callers saw
+        self._unhedged = deque(maxlen=WINDOW)  # latency of first attempts, hedged or not
+        self._lock = threading.Lock()
+
+    def hedge_delay(self, kind):
+        """Seconds after which a call of this kind is hedged, or None while too few have been seen"""
+        with self._lock:
+            window = self._latencies.get(kind)
+            if not window or len(window) < self.min_samples:
+                return None
+            return percentile(window, self.percentile)
+
+    def _record(self, kind, elapsed, first):
+        with self._lock:
+            self._latencies.setdefault(kind, deque(maxlen=WINDOW)).append(elapsed)
+            if first:
+                self._unhedged.append(elapsed)
+
+    def _may_hedge(self, allow):
+        """Whether a hedge may be sent now, spending budget if so"""
+        with self._lock:
+            if allow is not None and not allow():
+                self.stats["busy"] += 1
+                return False
+            if self._credit < 1:
+                self.stats["over_budget"] += 1
+                return False
+            self._credit -= 1
+            self.stats["hedged"] += 1
+            return True
+
+    def _start(self, kind, attempt, cancelled, first):
+        future = Future()
+        context = contextvars.copy_context()
+
+        def run():
+            start = time.monotonic()
+            try:
+                result = context.run(attempt, cancelled, first)
+            except BaseException as exc:
+                future.set_exception(exc)
+                return
+            self._record(kind, time.monotonic() - start, first)
+            future.set_result(result)
+
+        threading.Thread(target=run, daemon=True, name=f"hedged-{'first' if first else 'hedge'}").start()
+        return future
+
+    def call(self, kind, attempt, allow=None, on_cancel=None):
+        """Result of attempt(cancelled, first), hedged with a second attempt when it runs long
+
+        `kind` groups calls with similar latency. attempt gets a
+        threading.Event that is set when its result is no longer wanted, and
+        whether it is the first attempt. allow() can veto a hedge (e.g. while
+        other calls are queued); on_cancel() is called after a loser's event
+        is set.
+        """
+        start = time.monotonic()
+        with self._lock:
+            self.stats["calls"] += 1
+            self._credit = min(self.burst, self._credit + self.budget)
+        delay = self.hedge_delay(kind) if self.enabled else None
+
+        if delay is None:
+            result = attempt(None, True)
+            elapsed = time.monotonic() - start
+            self._record(kind, elapsed, True)
+            with self._lock:
+                self._observed.append(elapsed)
+            return result
+
+        first_cancelled = threading.Event()
+        first = self._start(kind, attempt, first_cancelled, True)
+        done, _ = wait([first], timeout=delay)
+        if done or not self._may_hedge(allow):
+            result = first.result()
+        else:
+            hedge_cancelled = threading.Event()
+            hedge = self._start(kind, attempt, hedge_cancelled, False)
+            result = self._first_success({first: first_cancelled, hedge: hedge_cancelled}, on_cancel)
+            if not hedge_cancelled.is_set():
+                with self._lock:
+                    self.stats["hedge_wins"] += 1
+        with self._lock:
+            self._observed.append(time.monotonic() - start)
+        return result
+
+    @staticmethod
+    def _first_success(attempts, on_cancel):
+        """Result of whichever attempt succeeds first, cancelling the others; the first error if all fail"""
+        pending, errors = set(attempts), []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other, cancelled in attempts.items():
+                        if other is not future:
+                            cancelled.set()
+                    if pending and on_cancel:
+                        on_cancel()
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    def report(self):
+        """Hedge rate and latency percentiles as seen by callers vs first attempts alone"""
+        with self._lock:
+            observed, unhedged = list(self._observed), list(self._unhedged)
+            stats = dict(self.stats)
+        report = {
+            **stats,
+            "hedge_rate": stats["hedged"] / stats["calls"] if stats["calls"] else 0.0,
+        }
+        for name, values in (("observed", observed), ("unhedged", unhedged)):
+            for q in (50, 95, 99):
+                report[f"{name}_p{q}"] = percentile(values, q) if values else None
+        return report
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_hedger():
+    """The process-wide hedging policy"""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = Hedger()
+        return _hedger
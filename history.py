@@ -0,0 +1,75 @@
+"""
+Report History
+Bounded per-session LRU of recently viewed reports. Entries hold only the
+report data, JSON-encoded and compressed; charts, HTML and exports are rebuilt
+on demand, so a long editing shift costs a few KB per report
+"""
+
+import json
+import os
+import zlib
+from collections import OrderedDict
+
+
+HISTORY_MAX_ENTRIES = int(os.environ.get("NEWSMAKER_HISTORY_ENTRIES", "20"))
+HISTORY_MAX_BYTES = int(os.environ.get("NEWSMAKER_HISTORY_BYTES", str(1024 * 1024)))
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024 or unit == "MB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class ReportHistory:
+    """LRU of compact report entries, bounded by entry count and encoded size
+
+    The most recently added or opened entry is never evicted, even when it
+    alone exceeds max_bytes.
+    """
+
+    def __init__(self, max_entries=HISTORY_MAX_ENTRIES, max_bytes=HISTORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (label, compressed payload), least recent first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def keys(self):
+        """Entry keys, most recently used first"""
+        return list(reversed(self._entries))
+
+    def label(self, key):
+        return self._entries[key][0]
+
+    def add(self, key, label, financial_data, article_data, metric_flags=None, report_id=None):
+        """Insert or replace an entry and evict least recently used ones over the limits"""
+        payload = zlib.compress(json.dumps({
+            "financial_data": financial_data,
+            "article_data": article_data,
+            "metric_flags": metric_flags or [],
+            "report_id": report_id,
+        }, separators=(",", ":"), default=str).encode("utf-8"))
+
+        if key in self._entries:
+            self.nbytes -= len(self._entries.pop(key)[1])
+        self._entries[key] = (label, payload)
+        self.nbytes += len(payload)
+
+        evicted = []
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            old_key, (_, old_payload) = self._entries.popitem(last=False)
+            self.nbytes -= len(old_payload)
+            evicted.append(old_key)
+        return evicted
+
+    def get(self, key):
+        """Decoded entry (financial_data, article_data, metric_flags, report_id), marked most recently used"""
+        self._entries.move_to_end(key)
+        return json.loads(zlib.decompress(self._entries[key][1]))
@@ -0,0 +1,263 @@
+"""
+Live Earnings Calls
+Follows a transcript while the call is still in progress, from a file that is
+being appended to or a local socket. Newly arrived paragraphs are extracted on
+their own and merged into the running financial data; a flash headline is
+published as soon as revenue and EPS have been spoken, and the full article is
+written when the call ends
+
+Usage: python live.py (--file PATH | --port PORT) [--data-dir DIR] [--replay TRANSCRIPT]
+"""
+
+import argparse
+import codecs
+import os
+import socket
+import sys
+import threading
+import time
+
+import dedup
+from consensus import ConsensusStore, attach_consensus
+from pipeline import MODEL, create_client, extract_financial_data, generate_news_article, merge_extractions
+from store import ReportStore, DEFAULT_DATA_DIR
+
+
+END_MARKER = "[END OF CALL]"
+MIN_NEW_CHARS = 1200
+IDLE_SECONDS = 120
+POLL_SECONDS = 0.5
+
+
+def tail_file(path, poll=POLL_SECONDS, idle_timeout=IDLE_SECONDS, stop=None):
+    """Yield text as it is appended to path, until it stops growing for idle_timeout seconds
+
+    Waits for the file to appear. `stop` is an optional threading.Event.
+    """
+    last_data = time.monotonic()
+    while not os.path.exists(path):
+        if stop is not None and stop.is_set() or time.monotonic() - last_data > idle_timeout:
+            return
+        time.sleep(poll)
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        while stop is None or not stop.is_set():
+            data = f.read()
+            if data:
+                last_data = time.monotonic()
+                yield decoder.decode(data)
+            elif time.monotonic() - last_data > idle_timeout:
+                return
+            else:
+                time.sleep(poll)
+
+
+def socket_feed(port, host="127.0.0.1", timeout=IDLE_SECONDS):
+    """Start listening on host:port and return a generator over one connection's text
+
+    The generator ends when the sender closes the connection, or when nobody
+    connects or sends anything for `timeout` seconds.
+    """
+    server = socket.create_server((host, port))
+    server.settimeout(timeout)
+
+    def receive():
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with server:
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                return
+            with conn:
+                conn.settimeout(timeout)
+                while True:
+                    try:
+                        data = conn.recv(65536)
+                    except TimeoutError:
+                        return
+                    if not data:
+                        return
+                    yield decoder.decode(data)
+
+    return receive()
+
+
+def replay_transcript(transcript, path, pace=1.0):
+    """Append a finished transcript to path paragraph by paragraph, then the end marker (for trying live mode)"""
+    paragraphs = [p for p in transcript.split("\n\n") if p.strip()]
+    for paragraph in paragraphs + [END_MARKER]:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(paragraph + "\n\n")
+        time.sleep(pace)
+
+
+def _money(value):
+    return f"${value / 1000:,.1f}B" if abs(value) >= 1000 else f"${value:,.0f}M"
+
+
+class LiveCall:
+    """Running extraction over a transcript that arrives in pieces
+
+    Text is held back until at least min_chars of complete lines are pending,
+    then only that new text is sent for extraction and merged into
+    financial_data (values already known are kept).
+    """
+
+    def __init__(self, client, model=MODEL, min_chars=MIN_NEW_CHARS, consensus=None):
+        self.client = client
+        self.consensus = consensus
+        self.model = model
+        self.min_chars = min_chars
+        self.transcript = ""
+        self.financial_data = None
+        self.extractions = 0
+        self.ended = False
+        self._pending = ""
+
+    def feed(self, text):
+        """Add streamed text; returns True when financial_data changed"""
+        if self.ended:
+            return False
+        self.transcript += text
+        self._pending += text
+        # Searched in everything pending, so a marker split across two reads is still found
+        marker = self._pending.find(END_MARKER)
+        if marker >= 0:
+            self.transcript = self.transcript[:len(self.transcript) - (len(self._pending) - marker)]
+            self._pending = self._pending[:marker]
+            self.ended = True
+
+        cut = self._pending.rfind("\n")
+        if cut < self.min_chars:
+            return False
+        ready, self._pending = self._pending[:cut], self._pending[cut + 1:]
+        return self._extract(ready)
+
+    def _extract(self, text):
+        if not text.strip():
+            return False
+        data = extract_financial_data(self.client, text, model=self.model)
+        self.extractions += 1
+        if not data:
+            return False
+        merged = attach_consensus(merge_extractions([self.financial_data, data]), self.consensus)
+        changed = merged != self.financial_data
+        self.financial_data = merged
+        return changed
+
+    def _current(self, field):
+        value = ((self.financial_data or {}).get('current_quarter') or {}).get(field)
+        return value.get('value') if isinstance(value, dict) else value
+
+    @property
+    def flash_ready(self):
+        """Revenue and EPS have both been spoken"""
+        return self._current('revenue') is not None and self._current('eps') is not None
+
+    def flash_headline(self):
+        """One-line flash of the headline numbers, with consensus where it was mentioned"""
+        fd = self.financial_data
+        revenue, eps = self._current('revenue'), self._current('eps')
+        estimates = fd.get('estimates') or {}
+        revenue_text = _money(revenue)
+        if estimates.get('revenue_estimate') is not None:
+            revenue_text += f" (est. {_money(estimates['revenue_estimate'])})"
+        eps_text = f"${eps:.2f}"
+        if estimates.get('eps_estimate') is not None:
+            eps_text += f" (est. ${estimates['eps_estimate']:.2f})"
+        name = fd.get('company_name') or fd.get('ticker') or "Company"
+        ticker = f" ({fd['ticker']})" if fd.get('ticker') and fd.get('company_name') else ""
+        period = " ".join(str(fd[key]) for key in ('quarter', 'fiscal_year') if fd.get(key))
+        return f"FLASH: {name}{ticker} {period}: revenue {revenue_text}, EPS {eps_text}".replace("  ", " ")
+
+    def finish(self):
+        """Extract any text still pending and write the article
+
+        Returns (financial_data, metric_flags, article_data); financial_data is
+        None if nothing could be extracted.
+        """
+        from metrics import apply_derived_metrics
+
+        self.ended = True
+        pending, self._pending = self._pending, ""
+        self._extract(pending)
+        if not self.financial_data:
+            return None, [], None
+        financial_data, metric_flags = apply_derived_metrics(self.financial_data)
+        article_data = generate_news_article(self.client, financial_data, self.transcript)
+        return financial_data, metric_flags, article_data
+
+
+def run_live(call, feed, on_update=None, on_flash=None):
+    """Drive a LiveCall from a text feed until the call ends or the feed closes, then finish it"""
+    flashed = False
+    for text in feed:
+        if call.feed(text) and on_update:
+            on_update(call)
+        if not flashed and call.flash_ready:
+            flashed = True
+            if on_flash:
+                on_flash(call.flash_headline())
+        if call.ended:
+            break
+    result = call.finish()
+    if not flashed and call.flash_ready and on_flash:
+        on_flash(call.flash_headline())
+    return result
+
+
+def store_live_report(store, index, transcript, financial_data, article_data):
+    """Save a finished live call like any other report; returns its id"""
+    report_id = store.save(transcript, financial_data, article_data)
+    index.add(report_id, *dedup.fingerprint_transcript(transcript))
+    return report_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow a live earnings call and write the article when it ends")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="transcript file that is being appended to")
+    source.add_argument("--port", type=int, help="accept the transcript on this local TCP port")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--min-chars", type=int, default=MIN_NEW_CHARS, help="new text to collect before each extraction")
+    parser.add_argument("--replay", help="append this finished transcript to --file paragraph by paragraph")
+    parser.add_argument("--pace", type=float, default=1.0, help="seconds between replayed paragraphs")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise SystemExit("Set ANTHROPIC_API_KEY")
+    if args.replay:
+        if not args.file:
+            raise SystemExit("--replay needs --file")
+        with open(args.replay, encoding="utf-8") as f:
+            threading.Thread(target=replay_transcript, args=(f.read(), args.file, args.pace), daemon=True).start()
+
+    feed = tail_file(args.file) if args.file else socket_feed(args.port)
+    call = LiveCall(create_client(api_key), args.model, args.min_chars, ConsensusStore(args.data_dir))
+    start = time.perf_counter()
+
+    def stamp():
+        return f"{time.perf_counter() - start:6.1f}s"
+
+    def on_update(call):
+        fields = sum(1 for value in (call.financial_data or {}).values() if value not in (None, "", [], {}))
+        print(f"{stamp()}  {len(call.transcript):,} chars, {call.extractions} extraction(s), {fields} field(s)")
+
+    financial_data, _, article_data = run_live(
+        call, feed, on_update, on_flash=lambda headline: print(f"{stamp()}  {headline}")
+    )
+    if not financial_data or not article_data:
+        raise SystemExit("Could not extract a report from the call")
+
+    store = ReportStore(args.data_dir)
+    index = dedup.FingerprintIndex(os.path.join(args.data_dir, "fingerprints.jsonl"))
+    report_id = store_live_report(store, index, call.transcript, financial_data, article_data)
+    print(f"{stamp()}  {article_data.get('headline')}")
+    print(f"Stored report {report_id}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
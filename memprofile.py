@@ -0,0 +1,99 @@
+"""
+Memory Profiling
+Opt-in tracemalloc instrumentation: peak and retained memory per pipeline
+stage, accumulated per editing session. Off unless NEWSMAKER_MEMPROFILE=1, in
+which case tracing starts with the first profiled stage (and slows allocation
+down noticeably, so keep it to diagnosis)
+"""
+
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+
+MEMPROFILE_ENABLED = os.environ.get("NEWSMAKER_MEMPROFILE", "") not in ("", "0")
+MEMPROFILE_FRAMES = int(os.environ.get("NEWSMAKER_MEMPROFILE_FRAMES", "1"))
+
+_local = threading.local()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def traced_memory():
+    """(current, peak) bytes traced process-wide, or (0, 0) when tracing is off"""
+    return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+
+
+def top_allocations(limit=10):
+    """[(source line, bytes, blocks)] of the largest live allocations since tracing started"""
+    if not tracemalloc.is_tracing():
+        return []
+    stats = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ]).statistics("lineno")
+    return [(str(stat.traceback[0]), stat.size, stat.count) for stat in stats[:limit]]
+
+
+class MemoryProfile:
+    """Per-stage memory of one session
+
+    peak is the most a stage ever allocated above what was live when it
+    started; retained is what it left allocated when it finished, summed over
+    calls. Stages can nest. tracemalloc is process-wide, so stages running
+    concurrently in other sessions show up in each other's numbers.
+    """
+
+    def __init__(self, enabled=MEMPROFILE_ENABLED):
+        self.enabled = enabled
+        self.stages = {}  # name -> {"calls", "peak", "retained", "last_peak", "last_retained"}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMPROFILE_FRAMES)
+
+        stack = _stack()
+        start, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Resetting the peak below would hide the enclosing stage's peak so far
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": start, "peak": start}
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            end, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame["peak"])
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            self._record(name, peak - start, end - start)
+
+    def _record(self, name, peak, retained):
+        with self._lock:
+            stats = self.stages.setdefault(name, {"calls": 0, "peak": 0, "retained": 0})
+            stats["calls"] += 1
+            stats["peak"] = max(stats["peak"], peak)
+            stats["retained"] += retained
+            stats["last_peak"] = peak
+            stats["last_retained"] = retained
+
+    @property
+    def retained(self):
+        """Bytes left allocated by every profiled stage of this session"""
+        return sum(stats["retained"] for stats in self.stages.values())
+
+    def rows(self):
+        """[{stage, calls, peak, retained, last_peak, last_retained}] in first-seen order"""
+        return [{"stage": name, **stats} for name, stats in self.stages.items()]
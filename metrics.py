@@ -0,0 +1,213 @@
+"""
+Derived Metrics Engine
+Computes YoY/QoQ changes, beat/miss, surprise % and guidance midpoints from the
+raw numbers in financial_data, vectorized over whole batches of reports, and
+flags where the LLM's own answers disagree with the arithmetic
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+
+# Raw inputs: column -> path into financial_data
+RAW_FIELDS = {
+    "revenue": ("current_quarter", "revenue", "value"),
+    "net_income": ("current_quarter", "net_income", "value"),
+    "eps": ("current_quarter", "eps", "value"),
+    "prior_year_revenue": ("prior_year_quarter", "revenue"),
+    "prior_year_net_income": ("prior_year_quarter", "net_income"),
+    "prior_year_eps": ("prior_year_quarter", "eps"),
+    "prior_quarter_revenue": ("prior_quarter", "revenue"),
+    "prior_quarter_eps": ("prior_quarter", "eps"),
+    "revenue_estimate": ("estimates", "revenue_estimate"),
+    "eps_estimate": ("estimates", "eps_estimate"),
+    "next_quarter_revenue_low": ("guidance", "next_quarter_revenue", "low"),
+    "next_quarter_revenue_high": ("guidance", "next_quarter_revenue", "high"),
+    "full_year_revenue_low": ("guidance", "full_year_revenue", "low"),
+    "full_year_revenue_high": ("guidance", "full_year_revenue", "high"),
+    "next_quarter_eps_low": ("guidance", "next_quarter_eps", "low"),
+    "next_quarter_eps_high": ("guidance", "next_quarter_eps", "high"),
+}
+
+# Derived outputs: column -> path written back into financial_data
+DERIVED_FIELDS = {
+    "yoy_revenue_change": ("year_over_year", "revenue_change"),
+    "yoy_eps_change": ("year_over_year", "eps_change"),
+    "yoy_net_income_change": ("year_over_year", "net_income_change"),
+    "qoq_revenue_change": ("quarter_over_quarter", "revenue_change"),
+    "qoq_eps_change": ("quarter_over_quarter", "eps_change"),
+    "revenue_beat": ("estimates", "revenue_beat"),
+    "eps_beat": ("estimates", "eps_beat"),
+    "revenue_surprise_pct": ("estimates", "revenue_surprise_pct"),
+    "eps_surprise_pct": ("estimates", "eps_surprise_pct"),
+    "next_quarter_revenue_mid": ("guidance", "next_quarter_revenue", "mid"),
+    "full_year_revenue_mid": ("guidance", "full_year_revenue", "mid"),
+    "next_quarter_eps_mid": ("guidance", "next_quarter_eps", "mid"),
+}
+
+# Fields the LLM used to answer itself and that are now checked against the arithmetic
+CHECKED_FIELDS = [
+    "yoy_revenue_change", "yoy_eps_change", "yoy_net_income_change",
+    "qoq_revenue_change", "qoq_eps_change", "revenue_beat", "eps_beat",
+]
+BEAT_FIELDS = {"revenue_beat", "eps_beat"}
+
+# Percentage-point difference tolerated before a reported change is flagged
+DEFAULT_TOLERANCE = 0.5
+
+
+def _dig(data, path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _prior_from_history(financial_data):
+    """Previous quarter from historical_quarters when it is listed next to the current one"""
+    historical = financial_data.get('historical_quarters') or []
+    revenue = _dig(financial_data, RAW_FIELDS["revenue"])
+    if len(historical) < 2 or revenue is None:
+        return {}
+    if historical[-1].get('revenue') == revenue:
+        return historical[-2]
+    if historical[0].get('revenue') == revenue:
+        return historical[1]
+    return {}
+
+
+def raw_frame(reports):
+    """One row of raw numeric inputs per financial_data dict"""
+    columns = {name: [_dig(r, path) for r in reports] for name, path in RAW_FIELDS.items()}
+    frame = pd.DataFrame(columns).apply(pd.to_numeric, errors="coerce").astype("float64")
+
+    history = pd.DataFrame([_prior_from_history(r) for r in reports], columns=["revenue", "eps"])
+    history = history.apply(pd.to_numeric, errors="coerce")
+    frame["prior_quarter_revenue"] = frame["prior_quarter_revenue"].fillna(history["revenue"])
+    frame["prior_quarter_eps"] = frame["prior_quarter_eps"].fillna(history["eps"])
+    return frame
+
+
+def reported_frame(reports):
+    """The LLM's own answers for the checked fields, where it gave any"""
+    columns = {name: [_dig(r, DERIVED_FIELDS[name]) for r in reports] for name in CHECKED_FIELDS}
+    frame = pd.DataFrame(columns, dtype=object)
+    for name in CHECKED_FIELDS:
+        if name in BEAT_FIELDS:
+            frame[name] = frame[name].map(lambda v: v if isinstance(v, bool) else pd.NA).astype("boolean")
+        else:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("float64")
+    return frame
+
+
+def pct_change(current, base):
+    """Percentage change from base, NaN where base is missing or zero"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = (current - base) / base.abs() * 100
+    return change.where(base != 0).round(1)
+
+
+def beat(actual, estimate):
+    """True above estimate, False below, <NA> when in line or unknown"""
+    result = (actual > estimate).astype("boolean")
+    return result.mask(actual.isna() | estimate.isna() | (actual == estimate))
+
+
+def derive_metrics(raw):
+    """Vectorized derived metrics for a raw_frame"""
+    return pd.DataFrame({
+        "yoy_revenue_change": pct_change(raw["revenue"], raw["prior_year_revenue"]),
+        "yoy_eps_change": pct_change(raw["eps"], raw["prior_year_eps"]),
+        "yoy_net_income_change": pct_change(raw["net_income"], raw["prior_year_net_income"]),
+        "qoq_revenue_change": pct_change(raw["revenue"], raw["prior_quarter_revenue"]),
+        "qoq_eps_change": pct_change(raw["eps"], raw["prior_quarter_eps"]),
+        "revenue_beat": beat(raw["revenue"], raw["revenue_estimate"]),
+        "eps_beat": beat(raw["eps"], raw["eps_estimate"]),
+        "revenue_surprise_pct": pct_change(raw["revenue"], raw["revenue_estimate"]),
+        "eps_surprise_pct": pct_change(raw["eps"], raw["eps_estimate"]),
+        "next_quarter_revenue_mid": (raw["next_quarter_revenue_low"] + raw["next_quarter_revenue_high"]) / 2,
+        "full_year_revenue_mid": (raw["full_year_revenue_low"] + raw["full_year_revenue_high"]) / 2,
+        "next_quarter_eps_mid": ((raw["next_quarter_eps_low"] + raw["next_quarter_eps_high"]) / 2).round(3),
+    }, index=raw.index)
+
+
+def check_consistency(reported, derived, tolerance=DEFAULT_TOLERANCE):
+    """Long table of (report, field, reported, derived) where the two disagree"""
+    flags = []
+    for name in CHECKED_FIELDS:
+        both = reported[name].notna() & derived[name].notna()
+        if name in BEAT_FIELDS:
+            disagree = both & (reported[name] != derived[name]).fillna(False)
+        else:
+            disagree = both & ((reported[name] - derived[name]).abs() > tolerance)
+        rows = disagree[disagree].index
+        if len(rows):
+            flags.append(pd.DataFrame({
+                "report": rows,
+                "field": name,
+                "reported": reported.loc[rows, name].astype(object).to_numpy(),
+                "derived": derived.loc[rows, name].astype(object).to_numpy(),
+            }))
+    if not flags:
+        return pd.DataFrame(columns=["report", "field", "reported", "derived"])
+    return pd.concat(flags, ignore_index=True)
+
+
+def derive_batch(reports, tolerance=DEFAULT_TOLERANCE):
+    """Derived metrics and consistency flags for a list of financial_data dicts"""
+    derived = derive_metrics(raw_frame(reports))
+    flags = check_consistency(reported_frame(reports), derived, tolerance)
+    return derived, flags
+
+
+def _to_python(value):
+    if value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (np.bool_, bool)):
+        return bool(value)
+    return float(value)
+
+
+def apply_derived_metrics(financial_data, tolerance=DEFAULT_TOLERANCE):
+    """Return (financial_data with derived fields filled in, list of consistency flags)"""
+    derived, flags = derive_batch([financial_data], tolerance)
+    updated = {
+        key: dict(value) if isinstance(value, dict) else value
+        for key, value in financial_data.items()
+    }
+
+    for name, value in derived.iloc[0].items():
+        value = _to_python(value)
+        if value is None:
+            continue  # keep whatever was extracted when the inputs are missing
+        *parents, leaf = DERIVED_FIELDS[name]
+        node = updated
+        for key in parents:
+            child = node.get(key)
+            child = dict(child) if isinstance(child, dict) else {}
+            node[key] = child
+            node = child
+        node[leaf] = value
+
+    return updated, flags.drop(columns="report").to_dict("records")
+
+
+def strip_derived(financial_data):
+    """Copy of financial_data without the derived fields the arithmetic can recompute
+
+    Edited data still carries the values derived last time; re-deriving it as
+    is would check those as if the LLM had reported them. Derived fields whose
+    inputs are missing keep their extracted value.
+    """
+    stripped = copy.deepcopy(financial_data)
+    for name, value in derive_metrics(raw_frame([financial_data])).iloc[0].items():
+        if _to_python(value) is None:
+            continue
+        *parents, leaf = DERIVED_FIELDS[name]
+        node = _dig(stripped, parents)
+        if isinstance(node, dict):
+            node.pop(leaf, None)
+    return stripped
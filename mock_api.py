@@ -0,0 +1,292 @@
+"""
+Local API Stand-in
+Minimal HTTP server speaking enough of the Anthropic Messages API to exercise
+the app offline: it enforces requests and tokens per minute, sends the
+anthropic-ratelimit-* headers, answers 429 with retry-after when a limit is
+exceeded and can inject 529 overloaded errors and slow responses. Message
+batches are accepted and finish after a configurable delay. Extractions answer
+with the demo data, or with the expected data of a golden case (--answers)
+whose transcript the prompt quotes
+
+Usage: python mock_api.py [--port 8765] [--rpm 50] [--tpm 40000] [--overload 0.05] [--batch-delay 5] [--output-rate 80] [--answers evals/golden]
+Then run the app with ANTHROPIC_BASE_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from demo import DEMO_FINANCIAL_DATA, DEMO_ARTICLE_DATA
+from pipeline import EXTRACTION_PROMPT
+from ratelimit import TokenBucket
+
+
+# Transcript passages shorter than this are too generic to tell golden cases apart
+MIN_PASSAGE_CHARS = 40
+
+
+def load_answers(directory):
+    """[(transcript passages, expected financial_data)] for each NAME.txt with a NAME.json"""
+    answers = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.txt"))):
+        expected_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.exists(expected_path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            passages = {p.strip() for p in re.split(r"[\n.]", f.read()) if len(p.strip()) >= MIN_PASSAGE_CHARS}
+        with open(expected_path, encoding="utf-8") as f:
+            answers.append((passages, json.load(f)))
+    return answers
+
+
+def _answer_for(prompt, answers):
+    """Expected data of the golden case quoted most in the prompt (whole, chunked or pre-extracted), or None"""
+    best, best_hits = None, 0
+    for passages, expected in answers or []:
+        hits = sum(passage in prompt for passage in passages)
+        if hits > best_hits:
+            best, best_hits = expected, hits
+    return best
+
+
+def reply_text(prompt, answers=None):
+    """Canned completion matching what the pipeline asked for"""
+    if "extract the following information in JSON format" in prompt:
+        # Only the fields the prompt's schema asks for, as a model would; ready-made figures the
+        # demo data carries beyond the schema (YoY, estimates) come with the headline metrics
+        data = _answer_for(prompt, answers) or DEMO_FINANCIAL_DATA
+        headline = '"current_quarter"' in prompt
+        return json.dumps({
+            key: value for key, value in data.items()
+            if f'"{key}"' in prompt or headline and f'"{key}"' not in EXTRACTION_PROMPT
+        })
+    if "write a professional financial news article" in prompt:
+        return json.dumps(DEMO_ARTICLE_DATA)
+    return DEMO_ARTICLE_DATA["headline"]
+
+
+class ServerLimits:
+    """Continuously replenishing request and token budgets, as the real API enforces them"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.lock = threading.Lock()
+
+    def admit(self, tokens):
+        """(admitted, headers) for a request costing `tokens`"""
+        with self.lock:
+            now = time.monotonic()
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait <= 0:
+                self.requests.take(1, now)
+                self.tokens.take(tokens, now)
+            headers = {}
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                # Time until the bucket is full again
+                refill = (bucket.capacity - bucket.level) * 60 / bucket.capacity
+                headers.update({
+                    f"anthropic-ratelimit-{kind}-limit": bucket.capacity,
+                    f"anthropic-ratelimit-{kind}-remaining": max(int(bucket.level), 0),
+                    f"anthropic-ratelimit-{kind}-reset": (datetime.now(timezone.utc) + timedelta(seconds=refill)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                })
+        if wait > 0:
+            headers["retry-after"] = math.ceil(wait)
+        return wait <= 0, headers
+
+
+class MockAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, headers=None, content_type="application/json"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", content_type)
+        self.send_header("content-length", str(len(body)))
+        self.send_header("request-id", f"req_{uuid.uuid4().hex[:24]}")
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, error_type, message, headers=None):
+        self._send(status, {"type": "error", "error": {"type": error_type, "message": message}}, headers)
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return self._error(400, "invalid_request_error", "body is not valid JSON")
+        path = self.path.split("?")[0]
+        if path == "/v1/messages":
+            return self.server.handle_messages(self, request)
+        if path == "/v1/messages/batches":
+            return self._send(200, self.server.create_batch(request.get("requests", [])))
+        self._error(404, "not_found_error", f"no route for {self.path}")
+
+    def do_GET(self):
+        parts = self.path.split("?")[0].strip("/").split("/")
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+            return self._error(404, "not_found_error", f"no route for {self.path}")
+        batch = self.server.batches.get(parts[3])
+        if batch is None:
+            return self._error(404, "not_found_error", f"no batch {parts[3]}")
+        if len(parts) == 4:
+            return self._send(200, batch["batch"])
+        if parts[4] != "results" or batch["results"] is None:
+            return self._error(404, "not_found_error", "batch results are not available yet")
+        self._send(200, "".join(json.dumps(r) + "\n" for r in batch["results"]).encode("utf-8"),
+                   content_type="application/binary")
+
+
+class MockAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, requests_per_minute=50, tokens_per_minute=40000, overload=0.0, latency=0.0,
+                 batch_delay=1.0, output_rate=0.0, slow=0.0, slow_latency=5.0, answers=None):
+        super().__init__(address, MockAPIHandler)
+        self.answers = load_answers(answers) if isinstance(answers, str) else answers
+        self.limits = ServerLimits(requests_per_minute, tokens_per_minute)
+        self.overload = overload
+        self.latency = latency
+        self.output_rate = output_rate
+        self.slow = slow
+        self.slow_latency = slow_latency
+        self.batch_delay = batch_delay
+        self.batches = {}
+        self.counts = {"ok": 0, "rate_limited": 0, "overloaded": 0}
+        self._counts_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, outcome):
+        with self._counts_lock:
+            self.counts[outcome] += 1
+
+    def _message(self, request):
+        prompt = "".join(str(m.get("content", "")) for m in request.get("messages", []))
+        input_tokens = len(prompt) // 4
+        text = reply_text(prompt, self.answers)
+        output_tokens = min(len(text) // 4, request.get("max_tokens", 1024))
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": request.get("model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+        }
+
+    def handle_messages(self, handler, request):
+        message = self._message(request)
+        usage = message["usage"]
+
+        allowed, headers = self.limits.admit(usage["input_tokens"] + usage["output_tokens"])
+        if not allowed:
+            self._count("rate_limited")
+            return handler._error(429, "rate_limit_error", "Number of request tokens has exceeded your per-minute rate limit", headers)
+        if random.random() < self.overload:
+            self._count("overloaded")
+            return handler._error(529, "overloaded_error", "Overloaded")
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.output_rate:
+            # Replies take as long as generating their output tokens would
+            time.sleep(usage["output_tokens"] / self.output_rate)
+        if random.random() < self.slow:
+            # An occasional straggler, for tail-latency work
+            time.sleep(self.slow_latency)
+        self._count("ok")
+        handler._send(200, message, headers)
+
+    def create_batch(self, requests):
+        """Accept a message batch; it ends with every request answered after batch_delay seconds"""
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        now = datetime.now(timezone.utc)
+        batch = {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "in_progress",
+            "request_counts": {"processing": len(requests), "succeeded": 0, "errored": 0, "canceled": 0, "expired": 0},
+            "created_at": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "expires_at": (now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "ended_at": None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": None,
+        }
+        self.batches[batch_id] = {"batch": batch, "results": None}
+
+        def finish():
+            results = [{"custom_id": r["custom_id"], "result": {"type": "succeeded", "message": self._message(r["params"])}}
+                       for r in requests]
+            batch.update({
+                "processing_status": "ended",
+                "request_counts": {"processing": 0, "succeeded": len(results), "errored": 0, "canceled": 0, "expired": 0},
+                "ended_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results",
+            })
+            self.batches[batch_id]["results"] = results
+
+        timer = threading.Timer(self.batch_delay, finish)
+        timer.daemon = True
+        timer.start()
+        return batch
+
+
+def start_server(port=0, **options):
+    """Serve on 127.0.0.1 in a background thread; returns the server (see .base_url, .shutdown())"""
+    server = MockAPIServer(("127.0.0.1", port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rpm", type=int, default=50, help="requests per minute")
+    parser.add_argument("--tpm", type=int, default=40000, help="tokens per minute")
+    parser.add_argument("--overload", type=float, default=0.0, help="fraction of requests answered with 529")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per successful response")
+    parser.add_argument("--batch-delay", type=float, default=5.0, help="seconds until a message batch ends")
+    parser.add_argument("--output-rate", type=float, default=0.0,
+                        help="output tokens generated per second (0: replies are instant)")
+    parser.add_argument("--slow", type=float, default=0.0, help="fraction of responses delayed by --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="extra seconds for slow responses")
+    parser.add_argument("--answers", help="directory of NAME.txt/NAME.json cases to answer extractions from")
+    args = parser.parse_args(argv)
+
+    server = MockAPIServer(("127.0.0.1", args.port), requests_per_minute=args.rpm, tokens_per_minute=args.tpm,
+                           overload=args.overload, latency=args.latency, batch_delay=args.batch_delay,
+                           output_rate=args.output_rate, slow=args.slow, slow_latency=args.slow_latency,
+                           answers=args.answers)
+    print(f"Serving the Messages API stand-in on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,478 @@
+"""
+Template Article Writer
+Writes the news article straight from financial_data with phrasing templates,
+without an LLM call. Wording follows the numbers: how far results beat or
+missed consensus and how strongly each figure moved. Output is deterministic
+for a given report, and a Claude pass can optionally polish the prose
+"""
+
+import json
+import math
+import re
+import zlib
+
+from pipeline import MODEL, parse_json_response
+from ratelimit import create_message
+
+
+# (lowest change in %, phrasings) for a figure that moved by that much, highest band first
+MOVES = [
+    (15.0, ["surging {pct}", "soaring {pct}"]),
+    (7.0, ["jumping {pct}", "rising a strong {pct}"]),
+    (2.0, ["climbing {pct}", "rising {pct}"]),
+    (0.5, ["edging up {pct}", "inching up {pct}"]),
+    (-0.5, ["holding roughly flat", "essentially unchanged"]),
+    (-2.0, ["slipping {pct}", "easing {pct}"]),
+    (-7.0, ["falling {pct}", "declining {pct}"]),
+    (-math.inf, ["sliding {pct}", "dropping a steep {pct}"]),
+]
+
+# (lowest surprise in %, phrasings) for an actual against its consensus estimate
+SURPRISES = [
+    (5.0, ["crushed", "handily beat"]),
+    (1.0, ["topped", "beat"]),
+    (0.0001, ["edged past", "narrowly beat"]),
+    (-0.0001, ["matched", "came in line with"]),
+    (-1.0, ["slightly missed", "narrowly missed"]),
+    (-5.0, ["missed", "fell short of"]),
+    (-math.inf, ["fell well short of", "badly missed"]),
+]
+
+HEADLINE_RESULTS = {
+    "beat": ["Top Estimates", "Beat Expectations"],
+    "miss": ["Miss Estimates", "Fall Short of Expectations"],
+    "mixed": ["Mixed Against Estimates", "Draw Mixed Results"],
+}
+LEAD_TONES = {"beat": "better-than-expected ", "miss": "weaker-than-expected ", "mixed": "mixed "}
+COMMENTARY_TONES = {"beat": "upbeat", "miss": "measured", "mixed": "balanced", None: "steady"}
+
+ORDINALS = {"Q1": "first-quarter", "Q2": "second-quarter", "Q3": "third-quarter", "Q4": "fourth-quarter"}
+NEXT_QUARTER = {"Q1": "Q2", "Q2": "Q3", "Q3": "Q4", "Q4": "Q1"}
+COMPANY_SUFFIX = re.compile(r",?\s+(Inc\.?|Corp\.?|Corporation|Co\.?|Company|Ltd\.?|plc|LLC|Holdings|Group)$", re.IGNORECASE)
+WORDS_PER_MINUTE = 200
+
+
+def _dig(data, *path):
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    if isinstance(data, dict) and "value" in data:
+        data = data["value"]
+    return data if isinstance(data, (int, float)) and not isinstance(data, bool) else None
+
+
+def _pick(options, seed):
+    """Stable choice among phrasings, so one report always reads the same way"""
+    return options[zlib.crc32(seed.encode("utf-8")) % len(options)]
+
+
+def _band(bands, value, seed):
+    for lowest, options in bands:
+        if value >= lowest:
+            return _pick(options, seed)
+
+
+def _trim(number, places):
+    text = f"{number:,.{places}f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def money(millions, short=False):
+    """$89.5 billion / $950 million (or $89.5B / $950M)"""
+    if abs(millions) >= 1000:
+        return f"${_trim(millions / 1000, 2 if abs(millions) < 10000 else 1)}{'B' if short else ' billion'}"
+    return f"${_trim(millions, 0 if abs(millions) >= 10 else 1)}{'M' if short else ' million'}"
+
+
+def pct(change):
+    return f"{_trim(abs(change), 0 if abs(change) >= 10 else 1)}%"
+
+
+def per_share(value):
+    """$1.46, or -$0.12 for a loss"""
+    return f"{'-' if value < 0 else ''}${abs(value):.2f}"
+
+
+def move(change, seed):
+    """Phrase for a change in %, e.g. 'climbing 6%' or 'holding roughly flat'"""
+    return _band(MOVES, change, seed).format(pct=pct(change))
+
+
+def direction(change):
+    """Plain 'up 6%', 'down 2%' or 'flat'"""
+    if abs(change) < 0.5:
+        return "flat"
+    return f"{'up' if change > 0 else 'down'} {pct(change)}"
+
+
+def surprise(actual, estimate, seed):
+    """Verb for an actual against consensus, scaled by the size of the surprise"""
+    return _band(SURPRISES, (actual - estimate) / abs(estimate) * 100 if estimate else 0.0, seed)
+
+
+def _change(fd, metric, period="year_over_year", prior_key="prior_year_quarter"):
+    """% change, or None when there is none or it would mislead: a loss now, or a base at or below zero"""
+    current, prior = _dig(fd, "current_quarter", metric), _dig(fd, prior_key, metric)
+    if (current is not None and current < 0) or (prior is not None and prior <= 0):
+        return None
+    change = _dig(fd, period, f"{metric}_change")
+    if change is not None:
+        return change
+    if current is not None and prior:
+        return round((current - prior) / prior * 100, 1)
+    return None
+
+
+def per_share_result(eps):
+    """'a loss of $0.12 per share', 'a profit of $1.46 per share' or 'breakeven earnings per share'"""
+    if eps == 0:
+        return "breakeven earnings per share"
+    return f"a {'loss' if eps < 0 else 'profit'} of {per_share(abs(eps))} per share"
+
+
+def eps_comparison(eps, prior):
+    """How EPS compares with a year earlier when a % change would mislead (a loss on either side, or a zero base)
+
+    None when there is no prior figure, or when both quarters were profitable.
+    """
+    if prior is None or (eps >= 0 and prior > 0):
+        return None
+    if prior == 0:
+        return "compared with breakeven a year earlier"
+    if prior > 0:
+        return f"swinging from a profit of {per_share(prior)} a year earlier"
+    if eps == prior:
+        return "the same loss as a year earlier"
+    verb = "swinging" if eps > 0 else "up" if eps == 0 else "narrowing" if eps > prior else "widening"
+    return f"{verb} from a loss of {per_share(-prior)} a year earlier"
+
+
+def _eps_headline(eps, prior):
+    """Headline EPS figure for losses and swings, or None when the usual 'Up 13% to $1.46' form applies"""
+    if eps >= 0 and (prior is None or prior > 0):
+        return None
+    if prior is not None and prior > 0:
+        return f"EPS Swings to Loss of {per_share(-eps)}"
+    if prior is not None and prior < 0 < eps:
+        return f"EPS Swings to Profit of {per_share(eps)}"
+    if prior is not None and prior < 0 and eps < 0 and eps != prior:
+        return f"Loss {'Narrows' if eps > prior else 'Widens'} to {per_share(-eps)} per Share"
+    return f"Loss of {per_share(-eps)} per Share" if eps < 0 else f"EPS {per_share(eps)}"
+
+
+def verdict(fd):
+    """'beat', 'miss', 'mixed', or None when there are no estimates to compare against"""
+    outcomes = []
+    for metric in ("revenue", "eps"):
+        actual, estimate = _dig(fd, "current_quarter", metric), _dig(fd, "estimates", f"{metric}_estimate")
+        if actual is not None and estimate is not None and actual != estimate:
+            outcomes.append(actual > estimate)
+    if not outcomes:
+        return None
+    if all(outcomes):
+        return "beat"
+    return "miss" if not any(outcomes) else "mixed"
+
+
+def _names(fd):
+    company = fd.get('company_name') or fd.get('ticker')
+    if not company:
+        return "The company", "The company", None
+    short = COMPANY_SUFFIX.sub("", company).strip() or company
+    return company, short, fd.get('ticker')
+
+
+def write_headline(fd):
+    _, short, ticker = _names(fd)
+    period = " ".join(str(fd[key]) for key in ("quarter", "fiscal_year") if fd.get(key))
+    result = verdict(fd)
+    title = f"{short} {period} Earnings".replace("  ", " ")
+    if result:
+        title += " " + _pick(HEADLINE_RESULTS[result], f"{ticker}headline")
+    figures = []
+    for label, metric, fmt in (("Revenue", "revenue", lambda v: money(v, short=True)), ("EPS", "eps", per_share)):
+        value = _dig(fd, "current_quarter", metric)
+        if value is None:
+            continue
+        change = _change(fd, metric)
+        swing = _eps_headline(value, _dig(fd, "prior_year_quarter", "eps")) if metric == "eps" else None
+        if swing:
+            figures.append(swing)
+        elif change is None:
+            figures.append(f"{label} {fmt(value)}")
+        elif abs(change) < 0.5:
+            figures.append(f"{label} Flat at {fmt(value)}")
+        else:
+            figures.append(f"{label} {'Up' if change > 0 else 'Down'} {pct(change)} to {fmt(value)}")
+    return f"{title}: {', '.join(figures)}" if figures else title
+
+
+def write_subheadline(fd):
+    highlights = [h for h in fd.get('key_highlights') or [] if h]
+    if highlights:
+        return highlights[0]
+    segments = _segments(fd)
+    grown = [s for s in segments if s['growth'] is not None]
+    if grown:
+        best = max(grown, key=lambda s: s['growth'])
+        return f"{best['name']} revenue {direction(best['growth'])} year-over-year"
+    return ""
+
+
+def write_lead(fd):
+    company, _, ticker = _names(fd)
+    result = verdict(fd)
+    quarter = ORDINALS.get(str(fd.get('quarter', '')).upper(), "quarterly")
+    fiscal = f" {fd['fiscal_year']}" if fd.get('fiscal_year') else ""
+    subject = f"{company} ({ticker})" if ticker and ticker != company else company
+    lead = f"{subject} reported {LEAD_TONES.get(result, '')}{quarter}{fiscal} results"
+
+    clauses = []
+    for label, metric, fmt in (("revenue", "revenue", money), ("earnings per share", "eps", per_share)):
+        value = _dig(fd, "current_quarter", metric)
+        if value is None:
+            continue
+        change = _change(fd, metric)
+        comparison = eps_comparison(value, _dig(fd, "prior_year_quarter", "eps")) if metric == "eps" else None
+        if comparison or (metric == "eps" and value < 0):
+            clauses.append(per_share_result(value) + (f", {comparison}" if comparison else ""))
+        elif change is None:
+            clauses.append(f"{label} of {fmt(value)}")
+        else:
+            since = "" if clauses else " year-over-year"
+            clauses.append(f"{label} {move(change, f'{ticker}lead{metric}')}{since} to {fmt(value)}")
+    if clauses:
+        lead += ", with " + " and ".join(clauses)
+    lead += "."
+
+    highlights = [h for h in fd.get('key_highlights') or [] if h]
+    if len(highlights) > 1:
+        lead += f" Among the highlights: {highlights[1].rstrip('.')}."
+    return lead
+
+
+def write_key_numbers(fd):
+    _, _, ticker = _names(fd)
+    sentences = []
+
+    revenue, revenue_estimate = _dig(fd, "current_quarter", "revenue"), _dig(fd, "estimates", "revenue_estimate")
+    prior_revenue, revenue_change = _dig(fd, "prior_year_quarter", "revenue"), _change(fd, "revenue")
+    if revenue is not None:
+        if revenue_estimate is not None:
+            gap = revenue - revenue_estimate
+            sentence = (f"Revenue of {money(revenue)} {surprise(revenue, revenue_estimate, f'{ticker}rev')} "
+                        f"analyst estimates of {money(revenue_estimate)}")
+            if abs(gap) >= 0.5:
+                sentence += f" by {money(abs(gap))}"
+            joiner = " and was"
+        else:
+            sentence = f"Revenue came in at {money(revenue)}"
+            joiner = ","
+        if revenue_change is not None:
+            sentence += f"{joiner} {direction(revenue_change)} from"
+            sentence += f" {money(prior_revenue)} a year earlier" if prior_revenue else " the year-ago quarter"
+        sentences.append(sentence + ".")
+
+    eps, eps_estimate = _dig(fd, "current_quarter", "eps"), _dig(fd, "estimates", "eps_estimate")
+    prior_eps, eps_change = _dig(fd, "prior_year_quarter", "eps"), _change(fd, "eps")
+    if eps is not None:
+        label = "Diluted EPS" if (fd.get('current_quarter') or {}).get('eps', {}).get('diluted') else "Earnings per share"
+        if eps_estimate is not None:
+            sentence = (f"{label} of {per_share(eps)} {surprise(eps, eps_estimate, f'{ticker}eps')} "
+                        f"the consensus estimate of {per_share(eps_estimate)}")
+            joiner = " and was"
+        else:
+            sentence = f"{label} came in at {per_share(eps)}"
+            joiner = ","
+        comparison = eps_comparison(eps, prior_eps)
+        if comparison:
+            sentence += f", {comparison}"
+        elif eps_change is not None:
+            sentence += f"{joiner} {direction(eps_change)} from " + (f"{per_share(prior_eps)} a year ago" if prior_eps else "the prior year")
+        sentences.append(sentence + ".")
+
+    margin = _dig(fd, "current_quarter", "gross_margin")
+    if margin is not None:
+        sentences.append(f"Gross margin was {_trim(margin, 1)}%.")
+
+    net_income, net_income_change = _dig(fd, "current_quarter", "net_income"), _change(fd, "net_income")
+    if net_income is not None:
+        if net_income_change is not None:
+            sentences.append(f"Net income was {direction(net_income_change)} at {money(net_income)}.")
+        else:
+            sentences.append(f"Net income was {money(net_income)}.")
+
+    operating_income = _dig(fd, "current_quarter", "operating_income")
+    if operating_income is not None:
+        sentences.append(f"Operating income totaled {money(operating_income)}.")
+
+    qoq = _change(fd, "revenue", "quarter_over_quarter", "prior_quarter")
+    if qoq is not None:
+        sentences.append(f"Sequentially, revenue was {direction(qoq)} from the prior quarter.")
+    return " ".join(sentences)
+
+
+def _segments(fd):
+    segments = []
+    for segment in fd.get('segment_performance') or []:
+        if isinstance(segment, dict) and segment.get('segment'):
+            segments.append({"name": segment['segment'], "revenue": _dig(segment, "revenue"), "growth": _dig(segment, "growth")})
+    return segments
+
+
+def write_segment_details(fd):
+    _, _, ticker = _names(fd)
+    segments = sorted(_segments(fd), key=lambda s: s['revenue'] or 0, reverse=True)
+    if not segments:
+        return "The company did not break out segment results for the quarter."
+
+    largest, rest = segments[0], segments[1:]
+    sentence = f"{largest['name']} remained the largest segment"
+    if largest['revenue'] is not None:
+        sentence += f" at {money(largest['revenue'])}"
+    if largest['growth'] is not None:
+        sentence += f", {direction(largest['growth'])} year-over-year"
+    sentences = [sentence + "."]
+
+    grown = [s for s in rest if s['growth'] is not None and s['growth'] > 0]
+    fastest = max(grown, key=lambda s: s['growth']) if grown else None
+    if fastest and (largest['growth'] is None or fastest['growth'] > largest['growth']):
+        rest.remove(fastest)
+        sentence = f"{fastest['name']} was the fastest-growing business, {move(fastest['growth'], f'{ticker}seg')}"
+        if fastest['revenue'] is not None:
+            sentence += f" to {money(fastest['revenue'])}"
+        sentences.append(sentence + ".")
+
+    if rest:
+        parts = []
+        for segment in rest:
+            part = segment['name']
+            if segment['revenue'] is not None:
+                part += f" came in at {money(segment['revenue'])}"
+            if segment['growth'] is not None:
+                part += f" ({'+' if segment['growth'] >= 0 else '-'}{pct(segment['growth'])})"
+            parts.append(part)
+        sentences.append("Elsewhere, " + ", while ".join([", ".join(parts[:-1]), parts[-1]] if len(parts) > 1 else parts) + ".")
+    return " ".join(sentences)
+
+
+def _range(low, high, fmt):
+    if low is None or high is None:
+        return fmt(low if high is None else high)
+    return fmt(low) if low == high else f"{fmt(low)} to {fmt(high)}"
+
+
+def write_outlook(fd):
+    _, short, _ = _names(fd)
+    guidance = fd.get('guidance') or {}
+    sentences = []
+
+    next_revenue = guidance.get('next_quarter_revenue') or {}
+    low, high = _dig(next_revenue, "low"), _dig(next_revenue, "high")
+    if low is not None or high is not None:
+        next_quarter = NEXT_QUARTER.get(str(fd.get('quarter', '')).upper())
+        period = f"{next_quarter}" if next_quarter else "the coming quarter"
+        sentence = f"For {period}, {short} guided revenue to {'a range of ' if low != high else ''}{_range(low, high, money)}"
+        current, mid = _dig(fd, "current_quarter", "revenue"), _dig(next_revenue, "mid")
+        if mid is None and low is not None and high is not None:
+            mid = (low + high) / 2
+        if current and mid is not None:
+            sentence += f", a midpoint {direction((mid - current) / current * 100)} from this quarter"
+        sentences.append(sentence + ".")
+
+    next_eps = guidance.get('next_quarter_eps') or {}
+    low, high = _dig(next_eps, "low"), _dig(next_eps, "high")
+    if low is not None or high is not None:
+        sentences.append(f"EPS is expected at {_range(low, high, per_share)}.")
+
+    full_year = guidance.get('full_year_revenue') or {}
+    low, high = _dig(full_year, "low"), _dig(full_year, "high")
+    if low is not None or high is not None:
+        sentences.append(f"For the full year, the company expects revenue of {_range(low, high, money)}.")
+
+    if not sentences:
+        sentences.append(f"{short} did not provide quantitative guidance.")
+    if fd.get('outlook'):
+        sentences.append(str(fd['outlook']).strip())
+    return " ".join(sentences)
+
+
+def write_management_commentary(fd):
+    _, short, _ = _names(fd)
+    tone = COMMENTARY_TONES[verdict(fd)]
+    sentences = [f"Management struck {'an' if tone[0] in 'aeiou' else 'a'} {tone} tone on the call."]
+    quote = str(fd.get('ceo_quote') or "").strip().strip('"').rstrip(".")
+    if quote:
+        sentences.append(f'"{quote}," said {short}\'s chief executive.')
+    highlights = [h.rstrip(".") for h in (fd.get('key_highlights') or [])[2:] if h]
+    if highlights:
+        sentences.append("Executives also pointed to the following: " + "; ".join(highlights) + ".")
+    return " ".join(sentences)
+
+
+def write_conclusion(fd):
+    _, short, _ = _names(fd)
+    result, change = verdict(fd), _change(fd, "revenue")
+    period = " ".join(str(fd[key]) for key in ("quarter", "fiscal_year") if fd.get(key)) or "the quarter"
+    growth = "" if change is None else f"revenue {direction(change)} and "
+    summary = {
+        "beat": "results ahead of Wall Street expectations",
+        "miss": "results below Wall Street expectations",
+        "mixed": "a mixed quarter against Wall Street expectations",
+        None: "its latest quarterly results",
+    }[result]
+    closing = f"{short} closed {period} with {growth}{summary}."
+    if (fd.get('guidance') or {}).get('next_quarter_revenue'):
+        closing += " Investors will be watching whether the company delivers on its guidance next quarter."
+    return closing
+
+
+SECTION_WRITERS = {
+    "headline": write_headline,
+    "subheadline": write_subheadline,
+    "lead": write_lead,
+    "key_numbers": write_key_numbers,
+    "segment_details": write_segment_details,
+    "management_commentary": write_management_commentary,
+    "outlook": write_outlook,
+    "conclusion": write_conclusion,
+}
+
+
+def write_article(financial_data):
+    """Article dict in the same shape generate_news_article returns, written from templates"""
+    article = {section: writer(financial_data) for section, writer in SECTION_WRITERS.items()}
+    words = sum(len(text.split()) for text in article.values())
+    article["read_time"] = max(1, math.ceil(words / WORDS_PER_MINUTE))
+    return article
+
+
+def rewrite_sections(financial_data, article_data, sections):
+    """Rewrite only the given sections from templates, keeping the rest of the article"""
+    updated = dict(article_data)
+    for section in sections:
+        if section in SECTION_WRITERS:
+            updated[section] = SECTION_WRITERS[section](financial_data)
+    return updated
+
+
+def polish_article(client, financial_data, article_data, model=MODEL):
+    """Have Claude smooth the templated prose without changing any figure; the draft is kept if the reply is unusable"""
+    prompt = f"""Below is a draft earnings news article generated from templates, with the data it was written from. Polish the prose into professional financial journalism: vary sentence structure and improve flow. Keep every number, comparison and beat/miss judgement exactly as stated and do not add facts that are not in the data.
+
+FINANCIAL DATA:
+{json.dumps(financial_data, separators=(',', ':'))}
+
+DRAFT ARTICLE:
+{json.dumps(article_data, indent=2)}
+
+Respond with the polished article as JSON with exactly the same keys."""
+
+    response = create_message(
+        client, model=model, max_tokens=3000, messages=[{"role": "user", "content": prompt}]
+    )
+    polished = parse_json_response(response.content[0].text)
+    if not polished or not all(polished.get(section) for section in SECTION_WRITERS if article_data.get(section)):
+        return article_data
+    return {**article_data, **polished}
@@ -0,0 +1,309 @@
+"""
+Parquet Archive
+Columnar archive of every extraction for analytics: one flattened row per
+report (current quarter, YoY/QoQ, estimates, guidance) plus a child table of
+segments, partitioned by fiscal quarter. Reports are appended incrementally
+from the report store as small files that compaction later merges, and reads
+return pandas DataFrames with only the requested columns
+
+Usage: python parquet_archive.py sync [--data-dir DIR] [--compact]
+       python parquet_archive.py compact [--data-dir DIR]
+       python parquet_archive.py query [--period FY2024Q4 ...] [--ticker T ...] [--columns C ...] [--segments]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from consensus import period_key
+from store import ReportStore, DEFAULT_DATA_DIR, write_json_atomic
+
+
+ARCHIVE_DIR = "archive"
+SYNC_STATE = "_sync_state.json"
+UNKNOWN_PERIOD = "unknown"
+
+META_COLUMNS = ["id", "ticker", "company", "sector", "quarter", "fiscal_year", "created_at", "archived_at"]
+EXTRA_FIELDS = {
+    "gross_margin": ("current_quarter", "gross_margin", "value"),
+    "operating_income": ("current_quarter", "operating_income", "value"),
+}
+
+
+def _schemas():
+    import pyarrow as pa
+    from metrics import RAW_FIELDS, DERIVED_FIELDS, BEAT_FIELDS
+
+    timestamp = pa.timestamp("us")
+    meta = [pa.field(name, timestamp if name.endswith("_at") else pa.string()) for name in META_COLUMNS]
+    numeric = [pa.field(name, pa.float64()) for name in [*RAW_FIELDS, *EXTRA_FIELDS]]
+    derived = [pa.field(name, pa.bool_() if name in BEAT_FIELDS else pa.float64()) for name in DERIVED_FIELDS]
+    segments = [pa.field("id", pa.string()), pa.field("ticker", pa.string()), pa.field("segment", pa.string()),
+                pa.field("revenue", pa.float64()), pa.field("growth", pa.float64()), pa.field("archived_at", timestamp)]
+    return {"reports": pa.schema(meta + numeric + derived), "segments": pa.schema(segments)}
+
+
+def _period(financial_data):
+    """Partition key of an extraction, e.g. FY2024Q4"""
+    return period_key(financial_data.get('quarter'), financial_data.get('fiscal_year')) or UNKNOWN_PERIOD
+
+
+def _ticker(financial_data):
+    ticker = financial_data.get('ticker')
+    return None if ticker is None else str(ticker).strip().upper()
+
+
+def flatten_records(records, archived_at=None):
+    """(reports frame, segments frame) with a "period" partition column, for stored records"""
+    import pandas as pd
+    from metrics import raw_frame, derive_metrics, _dig
+
+    archived_at = pd.Timestamp(archived_at or datetime.now())
+    reports = [r['financial_data'] for r in records]
+    meta = pd.DataFrame({
+        "id": [r['id'] for r in records],
+        "ticker": [_ticker(fd) for fd in reports],
+        "company": [fd.get('company_name') for fd in reports],
+        "sector": [fd.get('sector') for fd in reports],
+        "quarter": [fd.get('quarter') for fd in reports],
+        "fiscal_year": [fd.get('fiscal_year') for fd in reports],
+        "created_at": pd.to_datetime([r.get('created_at') for r in records], errors="coerce"),
+        "archived_at": archived_at,
+    })
+    for column in ("ticker", "company", "sector", "quarter", "fiscal_year"):
+        meta[column] = meta[column].map(lambda v: None if v is None else str(v))
+    raw = raw_frame(reports)
+    extra = pd.DataFrame(
+        {name: [_dig(fd, path) for fd in reports] for name, path in EXTRA_FIELDS.items()}
+    ).apply(pd.to_numeric, errors="coerce").astype("float64")
+    frame = pd.concat([meta, raw, extra, derive_metrics(raw)], axis=1)
+    frame["period"] = [_period(fd) for fd in reports]
+
+    segments = pd.DataFrame([
+        {
+            "id": record['id'],
+            "ticker": _ticker(fd),
+            "segment": str(seg.get('segment')),
+            "revenue": seg.get('revenue'),
+            "growth": seg.get('growth'),
+            "period": period,
+        }
+        for record, fd, period in zip(records, reports, frame["period"])
+        for seg in fd.get('segment_performance') or []
+        if isinstance(seg, dict) and seg.get('segment')
+    ], columns=["id", "ticker", "segment", "revenue", "growth", "period"])
+    segments[["revenue", "growth"]] = segments[["revenue", "growth"]].apply(pd.to_numeric, errors="coerce")
+    segments["archived_at"] = archived_at
+    return frame, segments
+
+
+def _latest(frame):
+    """Keep only each report's most recently archived rows"""
+    if frame.empty:
+        return frame
+    newest = frame.groupby("id")["archived_at"].transform("max")
+    return frame[frame["archived_at"] == newest].reset_index(drop=True)
+
+
+class ParquetArchive:
+    """reports/ and segments/ Parquet datasets under DATA_DIR/archive, hive-partitioned by period=FY2024Q4
+
+    A report that is archived again (after corrections, say) gets new rows;
+    reads and compaction keep only its latest version. Syncing removes the
+    rows of reports deleted from the store, or moved to another fiscal period,
+    from the partition they were archived in.
+    """
+
+    TABLES = ("reports", "segments")
+
+    def __init__(self, root=os.path.join(DEFAULT_DATA_DIR, ARCHIVE_DIR)):
+        self.root = root
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    def _partition_dir(self, table, period):
+        return os.path.join(self.root, table, f"period={period}")
+
+    def _write(self, table, period, frame, name=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = self._partition_dir(table, period)
+        os.makedirs(directory, exist_ok=True)
+        schema = _schemas()[table]
+        arrow = pa.Table.from_pandas(frame[schema.names], schema=schema, preserve_index=False)
+        path = os.path.join(directory, name or f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        tmp_path = f"{path}.tmp"
+        pq.write_table(arrow, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def append(self, records):
+        """Archive stored records (dicts with id, created_at and financial_data); returns the row count"""
+        if not records:
+            return 0
+        tables = dict(zip(self.TABLES, flatten_records(records)))
+        with self._lock:
+            for table, frame in tables.items():
+                for period, rows in frame.groupby("period"):
+                    self._write(table, period, rows)
+        return len(records)
+
+    def remove(self, period, report_ids):
+        """Rewrite a partition without the rows of the given reports; returns how many rows were dropped"""
+        import pyarrow.parquet as pq
+
+        dropped = 0
+        with self._lock:
+            for table in self.TABLES:
+                files = self._files(table, period)
+                if not files:
+                    continue
+                frame = pq.read_table(files, schema=_schemas()[table]).to_pandas()
+                kept = frame[~frame["id"].isin(list(report_ids))]
+                if len(kept) == len(frame):
+                    continue
+                if not kept.empty:
+                    self._write(table, period, kept, name=f"compacted-{time.time_ns()}.parquet")
+                for path in files:
+                    os.remove(path)
+                dropped += len(frame) - len(kept)
+        return dropped
+
+    def sync(self, store):
+        """Append the reports added or changed in the store since the last sync; returns how many
+
+        The sync state records each report's modification time and the period
+        it was archived under, so that rows left behind by a deleted report or
+        by a corrected fiscal period can be removed.
+        """
+        with self._sync_lock:
+            state_path = os.path.join(self.root, SYNC_STATE)
+            synced = {}
+            if os.path.exists(state_path):
+                with open(state_path, encoding="utf-8") as f:
+                    synced = json.load(f)
+            current = store.modified_times()
+            changed = [report_id for report_id, mtime in current.items()
+                       if synced.get(report_id, {}).get("mtime") != mtime]
+            records = [r for r in map(store.load, changed) if r]
+
+            stale = {}
+            for report_id in set(synced) - set(current):
+                stale.setdefault(synced.pop(report_id)["period"], set()).add(report_id)
+            for record in records:
+                previous = synced.get(record['id'], {}).get("period")
+                if previous and previous != _period(record['financial_data']):
+                    stale.setdefault(previous, set()).add(record['id'])
+            for period, report_ids in stale.items():
+                self.remove(period, report_ids)
+
+            self.append(records)
+            synced.update({
+                record['id']: {"mtime": current[record['id']], "period": _period(record['financial_data'])}
+                for record in records
+            })
+            os.makedirs(self.root, exist_ok=True)
+            write_json_atomic(state_path, synced)
+            return len(records)
+
+    def _files(self, table, period="*"):
+        return sorted(glob.glob(os.path.join(self._partition_dir(table, period), "*.parquet")))
+
+    def periods(self):
+        """Fiscal periods present in the archive"""
+        return sorted(name.split("=", 1)[1] for name in os.listdir(os.path.join(self.root, "reports"))
+                      if name.startswith("period=")) if os.path.isdir(os.path.join(self.root, "reports")) else []
+
+    def compact(self, min_files=2):
+        """Merge each partition holding at least min_files files into one, dropping superseded rows
+
+        Returns {table: number of partitions compacted}.
+        """
+        import pyarrow.parquet as pq
+
+        compacted = {}
+        with self._lock:
+            for table in self.TABLES:
+                compacted[table] = 0
+                for period in self.periods():
+                    files = self._files(table, period)
+                    if len(files) < min_files:
+                        continue
+                    frame = _latest(pq.read_table(files, schema=_schemas()[table]).to_pandas())
+                    self._write(table, period, frame, name=f"compacted-{time.time_ns()}.parquet")
+                    for path in files:
+                        os.remove(path)
+                    compacted[table] += 1
+        return compacted
+
+    def read(self, table="reports", columns=None, periods=None, tickers=None):
+        """DataFrame of the latest archived rows, reading only the requested columns and partitions
+
+        `period` is available as a column; periods take canonical keys such as
+        "FY2024Q4" (see consensus.period_key).
+        """
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        schema = _schemas()[table]
+        directory = os.path.join(self.root, table)
+        wanted = list(columns) if columns else [*schema.names, "period"]
+        if not os.path.isdir(directory) or not self._files(table):
+            return pd.DataFrame(columns=wanted)
+
+        dataset = ds.dataset(directory, format="parquet", partitioning="hive", schema=schema.append(pa.field("period", pa.string())))
+        expression = None
+        if periods:
+            expression = ds.field("period").isin(list(periods))
+        if tickers:
+            ticker_filter = ds.field("ticker").isin([str(t).upper() for t in tickers])
+            expression = ticker_filter if expression is None else expression & ticker_filter
+        read_columns = list(dict.fromkeys([*wanted, "id", "archived_at"]))
+        frame = _latest(dataset.to_table(columns=read_columns, filter=expression).to_pandas())
+        return frame[wanted]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar Parquet archive of all extractions")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync_parser = commands.add_parser("sync", help="append reports stored since the last sync")
+    sync_parser.add_argument("--compact", action="store_true", help="compact partitions afterwards")
+    commands.add_parser("compact", help="merge small files in each partition")
+    query_parser = commands.add_parser("query", help="print archived rows")
+    query_parser.add_argument("--period", action="append", help="e.g. FY2024Q4")
+    query_parser.add_argument("--ticker", action="append")
+    query_parser.add_argument("--columns", nargs="+")
+    query_parser.add_argument("--segments", action="store_true", help="query the segments table")
+    args = parser.parse_args(argv)
+
+    archive = ParquetArchive(os.path.join(args.data_dir, ARCHIVE_DIR))
+    start = time.perf_counter()
+    if args.command == "sync":
+        print(f"Archived {archive.sync(ReportStore(args.data_dir))} report(s) in {time.perf_counter() - start:.2f}s")
+    if args.command == "compact" or getattr(args, "compact", False):
+        start = time.perf_counter()
+        compacted = archive.compact()
+        print(f"Compacted {compacted['reports']} partition(s) in {time.perf_counter() - start:.2f}s")
+    if args.command == "query":
+        import pandas as pd
+        import pyarrow.dataset  # noqa: F401  (import time is not query time)
+        periods = [period_key(p) or p for p in args.period] if args.period else None
+        start = time.perf_counter()
+        frame = archive.read("segments" if args.segments else "reports", args.columns, periods, args.ticker)
+        elapsed = time.perf_counter() - start
+        with pd.option_context("display.max_rows", 50, "display.width", 200):
+            print(frame)
+        print(f"{len(frame):,} row(s) in {elapsed * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
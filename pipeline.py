@@ -0,0 +1,375 @@
+"""
+Generation Pipeline
+LLM calls that turn an earnings transcript into structured financial data and a
+news article. Free of Streamlit and plotly so batch runs and workers import it
+cheaply; the anthropic SDK itself is only imported when a client is created
+"""
+
+import contextvars
+import importlib.util
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ratelimit import create_message
+
+
+MODEL = "claude-sonnet-4-20250514"
+
+# USD per million input/output tokens; the Message Batches API bills half
+MODEL_PRICES = {
+    "claude-sonnet-4-20250514": (3.00, 15.00),
+    "claude-opus-4-20250514": (15.00, 75.00),
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+}
+BATCH_DISCOUNT = 0.5
+
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
+
+
+def create_client(api_key):
+    """Anthropic client, importing the SDK on first use
+
+    SDK retries are disabled: ratelimit.create_message owns retries and backoff
+    """
+    import anthropic
+    return anthropic.Anthropic(api_key=api_key, max_retries=0)
+
+
+EXTRACTION_PROMPT = """Analyze this earnings call transcript and extract the following information in JSON format:
+
+{
+    "company_name": "Full company name",
+    "ticker": "Stock ticker symbol (e.g., AAPL)",
+    "sector": "GICS sector (e.g., Technology, Financials, Health Care)",
+    "quarter": "Q1/Q2/Q3/Q4",
+    "fiscal_year": "FY2024/FY2025 etc",
+    "report_date": "Date mentioned or today",
+
+    "current_quarter": {
+        "revenue": {"value": number in millions, "currency": "USD"},
+        "net_income": {"value": number in millions, "currency": "USD"},
+        "eps": {"value": number, "diluted": true/false},
+        "gross_margin": {"value": percentage number},
+        "operating_income": {"value": number in millions, "currency": "USD"}
+    },
+
+    "prior_year_quarter": {
+        "revenue": number in millions or null,
+        "net_income": number in millions or null,
+        "eps": number or null
+    },
+
+    "prior_quarter": {
+        "revenue": number in millions or null,
+        "eps": number or null
+    },
+
+    "guidance": {
+        "next_quarter_revenue": {"low": number, "high": number} or null,
+        "full_year_revenue": {"low": number, "high": number} or null,
+        "next_quarter_eps": {"low": number, "high": number} or null
+    },
+
+    "historical_quarters": [
+        {"quarter": "Q4 2024", "revenue": number, "eps": number},
+        {"quarter": "Q3 2024", "revenue": number, "eps": number},
+        {"quarter": "Q2 2024", "revenue": number, "eps": number},
+        {"quarter": "Q1 2024", "revenue": number, "eps": number}
+    ],
+
+    "key_highlights": [
+        "Important bullet point 1",
+        "Important bullet point 2",
+        "Important bullet point 3"
+    ],
+
+    "segment_performance": [
+        {"segment": "Segment Name", "revenue": number, "growth": percentage}
+    ],
+
+    "ceo_quote": "Notable quote from CEO if available",
+    "outlook": "Brief outlook/guidance summary"
+}
+
+If any data is not available in the transcript, use null. Extract numbers without currency symbols.
+Do not report analyst estimates or consensus figures; those come from a separate feed.
+For prior periods, report the raw figures only (for example derive last year's revenue from a stated growth rate); do not compute percentage changes or beat/miss.
+For historical quarters, estimate or use any mentioned comparative figures.
+
+TRANSCRIPT:
+"""
+
+# The extraction schema split into independent groups for parallel extraction:
+# each is requested on its own over the same transcript and the replies merged
+EXTRACTION_GROUPS = {
+    "core": {
+        "max_tokens": 1200,
+        "schema": """    "company_name": "Full company name",
+    "ticker": "Stock ticker symbol (e.g., AAPL)",
+    "sector": "GICS sector (e.g., Technology, Financials, Health Care)",
+    "quarter": "Q1/Q2/Q3/Q4",
+    "fiscal_year": "FY2024/FY2025 etc",
+    "report_date": "Date mentioned or today",
+
+    "current_quarter": {
+        "revenue": {"value": number in millions, "currency": "USD"},
+        "net_income": {"value": number in millions, "currency": "USD"},
+        "eps": {"value": number, "diluted": true/false},
+        "gross_margin": {"value": percentage number},
+        "operating_income": {"value": number in millions, "currency": "USD"}
+    },
+
+    "prior_year_quarter": {
+        "revenue": number in millions or null,
+        "net_income": number in millions or null,
+        "eps": number or null
+    },
+
+    "prior_quarter": {
+        "revenue": number in millions or null,
+        "eps": number or null
+    }""",
+        "notes": """Do not report analyst estimates or consensus figures; those come from a separate feed.
+For prior periods, report the raw figures only (for example derive last year's revenue from a stated growth rate); do not compute percentage changes or beat/miss.""",
+    },
+    "guidance": {
+        "max_tokens": 600,
+        "schema": '''    "guidance": {
+        "next_quarter_revenue": {"low": number, "high": number} or null,
+        "full_year_revenue": {"low": number, "high": number} or null,
+        "next_quarter_eps": {"low": number, "high": number} or null
+    },
+
+    "outlook": "Brief outlook/guidance summary"''',
+        "notes": "",
+    },
+    "segments": {
+        "max_tokens": 1200,
+        "schema": """    "historical_quarters": [
+        {"quarter": "Q4 2024", "revenue": number, "eps": number},
+        {"quarter": "Q3 2024", "revenue": number, "eps": number},
+        {"quarter": "Q2 2024", "revenue": number, "eps": number},
+        {"quarter": "Q1 2024", "revenue": number, "eps": number}
+    ],
+
+    "segment_performance": [
+        {"segment": "Segment Name", "revenue": number, "growth": percentage}
+    ]""",
+        "notes": "For historical quarters, estimate or use any mentioned comparative figures.",
+    },
+    "highlights": {
+        "max_tokens": 800,
+        "schema": '''    "key_highlights": [
+        "Important bullet point 1",
+        "Important bullet point 2",
+        "Important bullet point 3"
+    ],
+
+    "ceo_quote": "Notable quote from CEO if available"''',
+        "notes": "",
+    },
+}
+MAX_PARALLEL_REQUESTS = 8
+
+
+def group_prompt(name):
+    """Extraction prompt for one schema group"""
+    group = EXTRACTION_GROUPS[name]
+    notes = f"\n{group['notes']}" if group['notes'] else ""
+    return f"""Analyze this earnings call transcript and extract the following information in JSON format:
+
+{{
+{group['schema']}
+}}
+
+If any data is not available in the transcript, use null. Extract numbers without currency symbols.{notes}
+
+TRANSCRIPT:
+"""
+
+
+# Lines worth sending to the model when pre-extraction is on
+FIGURE = re.compile(r"\$\s?\d|\d\s*(%|percent|million|billion|cents)", re.IGNORECASE)
+FINANCIAL_TERMS = re.compile(
+    r"revenue|sales|earnings|\beps\b|per share|net income|margin|guidance|outlook|expect|"
+    r"segment|quarter|fiscal|consensus|estimate|chief executive|\bceo\b", re.IGNORECASE
+)
+LEADING_LINES = 5
+
+
+def pre_extract_passages(transcript):
+    """Drop lines that carry no figures or financial terms (the opening lines are always kept)"""
+    lines = [line for line in transcript.splitlines() if line.strip()]
+    return "\n".join(
+        line for i, line in enumerate(lines)
+        if i < LEADING_LINES or FIGURE.search(line) or FINANCIAL_TERMS.search(line)
+    )
+
+
+def split_transcript(transcript, chunk_chars):
+    """Split on line boundaries into chunks of at most chunk_chars (longer lines stand alone)"""
+    chunks, current, size = [], [], 0
+    for line in transcript.splitlines():
+        if current and size + len(line) > chunk_chars:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _is_empty(value):
+    return value is None or value == [] or value == {} or value == ""
+
+
+# List fields combined across chunks: field -> how to tell two entries apart (None: the whole value)
+LIST_KEYS = {
+    "segment_performance": "segment",
+    "historical_quarters": "quarter",
+    "key_highlights": None,
+}
+
+
+def _list_key(entry, key):
+    value = entry.get(key) if key and isinstance(entry, dict) else entry
+    return value.strip().lower() if isinstance(value, str) else json.dumps(value, sort_keys=True)
+
+
+def _merge_lists(lists, key):
+    """Entries from every list in order, merging entries with the same key (first non-empty value wins)"""
+    merged = {}
+    for entries in lists:
+        for entry in entries or []:
+            identity = _list_key(entry, key)
+            merged[identity] = merge_extractions([merged[identity], entry]) if identity in merged else entry
+    return list(merged.values())
+
+
+def merge_extractions(results, field=None):
+    """Combine per-chunk extractions
+
+    Scalars take the first non-empty value and dicts merge field by field.
+    The LIST_KEYS lists are combined across chunks, deduplicated by segment
+    name, quarter or highlight text.
+    """
+    if field in LIST_KEYS:
+        lists = [result for result in results if isinstance(result, list)]
+        if lists:
+            return _merge_lists(lists, LIST_KEYS[field])
+    merged = None
+    for result in results:
+        if _is_empty(merged):
+            merged = result
+        elif isinstance(merged, dict) and isinstance(result, dict):
+            merged = {key: merge_extractions([merged.get(key), result.get(key)], key) for key in {**merged, **result}}
+    return merged
+
+
+def parse_json_response(response_text):
+    """First-to-last-brace JSON object in a model reply, or None"""
+    json_match = re.search(r'\{[\s\S]*\}', response_text)
+    if json_match:
+        try:
+            return json.loads(json_match.group())
+        except json.JSONDecodeError:
+            return None
+    return None
+
+
+def extraction_request(text, model=MODEL, prompt=EXTRACTION_PROMPT, max_tokens=4000):
+    """messages.create parameters for extracting financial data from (part of) a transcript"""
+    return {
+        "model": model,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt + text}],
+    }
+
+
+def _extract_chunk(client, text, model, prompt, max_tokens=4000):
+    response = create_message(client, **extraction_request(text, model, prompt, max_tokens))
+    return parse_json_response(response.content[0].text)
+
+
+def _extract_parallel(client, chunks, model):
+    """Every (chunk, schema group) request at once; results in chunk order, then group order"""
+    jobs = [(chunk, name) for chunk in chunks for name in EXTRACTION_GROUPS]
+    with ThreadPoolExecutor(max_workers=min(len(jobs), MAX_PARALLEL_REQUESTS)) as executor:
+        # Each request runs in a copy of the caller's context so it keeps the caller's rate-limit session
+        futures = [
+            executor.submit(contextvars.copy_context().run, _extract_chunk, client, chunk, model,
+                            group_prompt(name), EXTRACTION_GROUPS[name]["max_tokens"])
+            for chunk, name in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def extract_financial_data(client, transcript, model=MODEL, prompt=EXTRACTION_PROMPT,
+                           chunk_chars=None, pre_extract=False, parallel=False):
+    """Use Claude to extract structured financial data from transcript
+
+    pre_extract sends only the lines carrying figures or financial terms;
+    chunk_chars extracts from chunks of that size and merges the results.
+    parallel requests the EXTRACTION_GROUPS concurrently instead of the whole
+    schema at once (prompt is then not used): latency approaches that of the
+    slowest group, at the cost of sending the transcript once per group.
+    """
+    if pre_extract:
+        transcript = pre_extract_passages(transcript)
+    chunks = split_transcript(transcript, chunk_chars) if chunk_chars else [transcript]
+    if parallel:
+        results = _extract_parallel(client, chunks, model)
+    else:
+        results = [_extract_chunk(client, chunk, model, prompt) for chunk in chunks]
+    results = [r for r in results if r]
+    return merge_extractions(results) if results else None
+
+
+def article_request(financial_data, transcript, model=MODEL):
+    """messages.create parameters for writing the news article"""
+
+    article_prompt = f"""Based on this earnings data and transcript, write a professional financial news article in AlphaStreet style.
+
+FINANCIAL DATA:
+{json.dumps(financial_data, indent=2)}
+
+ORIGINAL TRANSCRIPT (for context):
+{transcript[:3000]}...
+
+Write the article with these sections:
+1. HEADLINE: Catchy, informative headline mentioning company, quarter, and key result (beat/miss)
+2. LEAD: 2-3 sentence summary of the key results
+3. KEY NUMBERS: Paragraph detailing revenue, EPS, and comparisons
+4. SEGMENT DETAILS: Performance by business segment if available
+5. MANAGEMENT COMMENTARY: Include CEO/CFO quotes or paraphrased insights
+6. OUTLOOK: Forward-looking guidance and expectations
+7. CONCLUSION: Brief wrap-up with stock context
+
+Format the response as JSON:
+{{
+    "headline": "The headline text",
+    "subheadline": "Optional subheadline",
+    "lead": "Opening paragraph",
+    "key_numbers": "Detailed numbers paragraph",
+    "segment_details": "Segment performance paragraph",
+    "management_commentary": "Quotes and insights paragraph",
+    "outlook": "Guidance and outlook paragraph",
+    "conclusion": "Closing paragraph",
+    "read_time": estimated minutes to read (number)
+}}
+
+Write in professional financial journalism style - factual, clear, and engaging."""
+
+    return {
+        "model": model,
+        "max_tokens": 3000,
+        "messages": [{"role": "user", "content": article_prompt}],
+    }
+
+
+def generate_news_article(client, financial_data, transcript):
+    """Generate professional news article from extracted data"""
+    response = create_message(client, **article_request(financial_data, transcript))
+    return parse_json_response(response.content[0].text)
@@ -0,0 +1,280 @@
+"""
+Rate Limiting
+Process-wide scheduler that every Anthropic API call goes through: token
+buckets for requests and tokens per minute kept in sync with the API's
+rate-limit headers, round-robin queueing across sessions, and jittered
+retries on 429/529 responses
+"""
+
+import contextlib
+import contextvars
+import itertools
+import math
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+
+from hedging import get_hedger
+
+
+REQUESTS_PER_MINUTE = int(os.environ.get("NEWSMAKER_REQUESTS_PER_MINUTE", "50"))
+TOKENS_PER_MINUTE = int(os.environ.get("NEWSMAKER_TOKENS_PER_MINUTE", "40000"))
+MAX_RETRIES = 6
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+RETRY_STATUSES = (429, 529)
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding up to one minute of budget"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` can be taken (amounts over capacity wait for a full bucket)"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return max(missing, 0) * 60 / self.capacity
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, limit, remaining, now):
+        """Adopt the server's limit and never assume more headroom than it reports"""
+        self._refill(now)
+        if limit:
+            self.capacity = limit
+        if remaining is not None:
+            self.level = min(self.level, remaining)
+
+
+class CallCancelled(Exception):
+    """A call was withdrawn (its cancelled event set) before it was sent"""
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, headers=None):
+    """Server-requested retry-after plus jitter, else full-jitter exponential backoff"""
+    retry_after = None
+    if headers:
+        try:
+            retry_after = float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    if retry_after is not None:
+        return min(retry_after, MAX_BACKOFF) + random.uniform(0, BASE_BACKOFF)
+    return random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2 ** attempt))
+
+
+class RateLimiter:
+    """Token-bucket scheduler shared by every session in the process
+
+    Waiting callers are served round-robin across sessions, so one editor's
+    batch of section regenerations can't starve everyone else. Callers may pass
+    an on_wait(position, delay) callback to show their place in the queue:
+    `position` is the number of calls ahead of them and `delay` the seconds the
+    head of the queue still has to wait for budget; (0, 0) means "go".
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_retries=MAX_RETRIES):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.blocked_until = 0.0
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "overloaded": 0}
+        self._queues = OrderedDict()  # session -> deque of waiting calls, in service order
+        self._cond = threading.Condition()
+
+    def _service_order(self):
+        rounds = itertools.zip_longest(*self._queues.values())
+        return [waiter for turn in rounds for waiter in turn if waiter is not None]
+
+    def queue_length(self):
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _dequeue(self, session, waiter):
+        queue = self._queues[session]
+        queue.remove(waiter)
+        if queue:
+            self._queues.move_to_end(session)
+        else:
+            del self._queues[session]
+        self._cond.notify_all()
+
+    def wake(self):
+        """Have waiting callers re-check their state (e.g. after cancelling one)"""
+        with self._cond:
+            self._cond.notify_all()
+
+    def acquire(self, tokens, session=None, on_wait=None, cancelled=None):
+        """Block until this call is at the head of the queue and both buckets have budget
+
+        Raises CallCancelled if the `cancelled` event is set while waiting.
+        """
+        waiter = object()
+        with self._cond:
+            self._queues.setdefault(session, deque()).append(waiter)
+        granted, reported = False, None
+        try:
+            while True:
+                with self._cond:
+                    if cancelled is not None and cancelled.is_set():
+                        raise CallCancelled()
+                    position = self._service_order().index(waiter)
+                    delay = 0.0
+                    if position == 0:
+                        now = time.monotonic()
+                        delay = max(self.blocked_until - now,
+                                    self.requests.wait_time(1, now),
+                                    self.tokens.wait_time(tokens, now))
+                        if delay <= 0:
+                            self.requests.take(1, now)
+                            self.tokens.take(tokens, now)
+                            self._dequeue(session, waiter)
+                            granted = True
+                    state = (position, math.ceil(delay))
+                    if not granted and state == reported:
+                        self._cond.wait(delay if position == 0 else 1.0)
+                        continue
+
+                # Callbacks run outside the lock; only changes are reported
+                if granted:
+                    if on_wait and reported is not None:
+                        on_wait(0, 0)
+                    return
+                if on_wait:
+                    on_wait(*state)
+                reported = state
+        except BaseException:
+            if not granted:
+                with self._cond:
+                    self._dequeue(session, waiter)
+            raise
+
+    def update(self, headers):
+        """Sync both buckets from anthropic-ratelimit-* response headers"""
+        if not headers:
+            return
+        with self._cond:
+            now = time.monotonic()
+            for kind, bucket in (("requests", self.requests), ("tokens", self.tokens)):
+                bucket.sync(_header_int(headers, f"anthropic-ratelimit-{kind}-limit"),
+                            _header_int(headers, f"anthropic-ratelimit-{kind}-remaining"), now)
+            self._cond.notify_all()
+
+    def call(self, request, tokens, session=None, on_wait=None, cancelled=None):
+        """Run request() under the limits and return its raw response
+
+        request() must return an object with a `headers` mapping (the SDK's
+        with_raw_response). 429 and 529 errors are retried with jittered
+        backoff; a 429 pauses the whole queue until its retry-after passes.
+        A set `cancelled` event stops the call before it is (re)sent.
+        """
+        for attempt in itertools.count():
+            self.acquire(tokens, session, on_wait, cancelled)
+            try:
+                response = request()
+            except Exception as exc:
+                status = getattr(exc, "status_code", None)
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise
+                headers = getattr(getattr(exc, "response", None), "headers", None)
+                self.update(headers)
+                delay = retry_delay(attempt, headers)
+                with self._cond:
+                    self.stats["retries"] += 1
+                    if status == 429:
+                        self.stats["rate_limited"] += 1
+                        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+                    else:
+                        self.stats["overloaded"] += 1
+                if status != 429:
+                    if cancelled is not None:
+                        cancelled.wait(delay)
+                    else:
+                        time.sleep(delay)
+                continue
+
+            self.update(response.headers)
+            with self._cond:
+                self.stats["calls"] += 1
+            return response
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """The process-wide limiter"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+_session = contextvars.ContextVar("ratelimit_session", default=(None, None))
+
+
+@contextlib.contextmanager
+def session_scope(session_id, on_wait=None):
+    """Attribute API calls made in this context to a session for fair queueing"""
+    token = _session.set((session_id, on_wait))
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+def estimate_tokens(kwargs):
+    """Rough token cost of a messages.create call: prompt characters / 4 plus max_tokens"""
+    chars = len(str(kwargs.get("system", "")))
+    for message in kwargs.get("messages", []):
+        chars += len(str(message.get("content", "")))
+    return chars // CHARS_PER_TOKEN + kwargs.get("max_tokens", 0)
+
+
+def create_message(client, **kwargs):
+    """client.messages.create(**kwargs) routed through the process-wide limiter
+
+    Clients that never reach the API (such as recorded-response replays) set
+    rate_limited = False and bypass the limiter.
+    """
+    if not getattr(client, "rate_limited", True):
+        return client.messages.with_raw_response.create(**kwargs).parse()
+    session, on_wait = _session.get()
+    limiter = get_limiter()
+    tokens = estimate_tokens(kwargs)
+
+    def attempt(cancelled, first):
+        # Only the first attempt reports queue position; a hedge waits quietly
+        return limiter.call(lambda: client.messages.with_raw_response.create(**kwargs),
+                            tokens, session, on_wait if first else None, cancelled)
+
+    # Calls of one model and output size have comparable latency; hedges are
+    # held back while other calls are queued so they never delay anyone
+    response = get_hedger().call(
+        (kwargs.get("model"), kwargs.get("max_tokens")), attempt,
+        allow=lambda: limiter.queue_length() == 0, on_cancel=limiter.wake
+    )
+    return response.parse()
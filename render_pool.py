@@ -0,0 +1,44 @@
+"""
+Rendering Stage
+Fans CPU-bound report, chart and export rendering out to worker processes.
+Workers receive only the compact financial_data/article payloads and send back
+finished artifacts, so rendering throughput scales with cores instead of
+queueing behind the GIL
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def default_workers():
+    """One worker per available core"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def render_stage(render, payloads, workers=None, window=None):
+    """Yield render(payload) for each payload, in input order
+
+    With more than one worker, payloads are rendered in a process pool. At most
+    `window` payloads are in flight at once (four per worker by default), so a
+    long lazy iterable of stored reports is never materialized in memory.
+    `render` must be a module-level function so it can be pickled.
+    """
+    workers = workers or default_workers()
+    if workers <= 1:
+        for payload in payloads:
+            yield render(payload)
+        return
+
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for payload in payloads:
+            pending.append(executor.submit(render, payload))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
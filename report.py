@@ -0,0 +1,498 @@
+"""
+Report Rendering
+Builds the exported artifacts for a report - full HTML report, email HTML,
+JSON, article text and metrics CSV - without any Streamlit dependency
+"""
+
+import json
+from datetime import datetime
+
+import charts
+import svg_charts
+
+
+REPORT_CSS = """
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    line-height: 1.6;
+    color: #333;
+    max-width: 1200px;
+    margin: 0 auto;
+    padding: 20px;
+    background: #f5f5f5;
+}
+.header {
+    background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+    color: white;
+    padding: 30px;
+    border-radius: 12px;
+    margin-bottom: 25px;
+}
+.headline {
+    font-size: 28px;
+    font-weight: 700;
+    margin-bottom: 10px;
+}
+.meta {
+    display: flex;
+    gap: 20px;
+    flex-wrap: wrap;
+    font-size: 14px;
+    opacity: 0.9;
+}
+.ticker {
+    background: #0066cc;
+    padding: 4px 12px;
+    border-radius: 4px;
+    font-weight: 600;
+}
+.section {
+    background: white;
+    border-radius: 12px;
+    padding: 25px;
+    margin-bottom: 20px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.08);
+}
+.section-title {
+    font-size: 20px;
+    font-weight: 600;
+    color: #1a1a2e;
+    margin-bottom: 15px;
+    padding-bottom: 10px;
+    border-bottom: 2px solid #0066cc;
+}
+.metrics-grid {
+    display: grid;
+    grid-template-columns: repeat(4, 1fr);
+    gap: 15px;
+    margin-bottom: 25px;
+}
+.metric-card {
+    border-radius: 12px;
+    padding: 20px;
+    color: white;
+    text-align: center;
+}
+.metric-card.blue { background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%); }
+.metric-card.green { background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%); }
+.metric-card.orange { background: linear-gradient(135deg, #fa709a 0%, #fee140 100%); }
+.metric-card.purple { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); }
+.metric-label { font-size: 14px; opacity: 0.9; }
+.metric-value { font-size: 28px; font-weight: 700; margin: 10px 0; }
+.metric-change { font-size: 13px; }
+.change-positive { color: #00ff88; }
+.change-negative { color: #ff6b6b; }
+.charts-grid {
+    display: grid;
+    grid-template-columns: repeat(2, 1fr);
+    gap: 20px;
+}
+.chart-container {
+    background: white;
+    border-radius: 12px;
+    padding: 15px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.08);
+}
+table {
+    width: 100%;
+    border-collapse: collapse;
+    margin: 15px 0;
+}
+th, td {
+    padding: 12px;
+    text-align: left;
+    border-bottom: 1px solid #eee;
+}
+th {
+    background: #f8f9fa;
+    font-weight: 600;
+}
+.highlight-box {
+    background: #f0f7fb;
+    border-left: 4px solid #0066cc;
+    padding: 15px 20px;
+    margin: 15px 0;
+    border-radius: 0 8px 8px 0;
+}
+.article-body {
+    font-size: 16px;
+    line-height: 1.8;
+}
+.article-body p {
+    margin-bottom: 15px;
+}
+ul {
+    margin-left: 20px;
+}
+li {
+    margin-bottom: 8px;
+}
+.footer {
+    text-align: center;
+    padding: 20px;
+    color: #666;
+    font-size: 12px;
+}
+@media print {
+    body { background: white; }
+    .section { box-shadow: none; border: 1px solid #eee; }
+    .chart-container { page-break-inside: avoid; }
+}
+@media (max-width: 768px) {
+    .metrics-grid { grid-template-columns: repeat(2, 1fr); }
+    .charts-grid { grid-template-columns: 1fr; }
+}
+"""
+
+
+def format_number(value, template):
+    """Number formatted with template, or N/A when it is missing"""
+    return template.format(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 'N/A'
+
+
+def report_head_assets(asset_prefix=None):
+    """Inline CSS and plotly.js for a standalone report, or links to shared site assets"""
+    if asset_prefix is None:
+        return f"""<script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
+    <style>{REPORT_CSS}    </style>"""
+    return f"""<script src="{charts.PLOTLY_CDN}"></script>
+    <link rel="stylesheet" href="{asset_prefix}report.css">
+    <script src="{asset_prefix}charts.js" defer></script>"""
+
+
+# Function to generate complete HTML report with all charts and data
+def generate_full_html_report(financial_data, article_data, asset_prefix=None):
+    """Generate a complete HTML report with embedded charts
+
+    With an asset_prefix the page links the shared report.css/charts.js site
+    assets instead of inlining them.
+    """
+
+    ticker = financial_data.get('ticker', 'N/A')
+    company = financial_data.get('company_name', 'Company')
+    quarter = financial_data.get('quarter', 'Q4')
+    fy = financial_data.get('fiscal_year', 'FY2024')
+    read_time = article_data.get('read_time', 3)
+
+    current = financial_data.get('current_quarter') or {}
+    yoy = financial_data.get('year_over_year') or {}
+    estimates = financial_data.get('estimates') or {}
+
+    # Get metric values
+    revenue = current.get('revenue', {}).get('value', 0)
+    eps = current.get('eps', {}).get('value', 0)
+    margin = current.get('gross_margin', {}).get('value', 0)
+    net_income = current.get('net_income', {}).get('value', 0)
+
+    rev_change = yoy.get('revenue_change', 0) or 0
+    eps_change = yoy.get('eps_change', 0) or 0
+    ni_change = yoy.get('net_income_change', 0) or 0
+
+    revenue_est = estimates.get('revenue_estimate')
+    eps_est = estimates.get('eps_estimate')
+    revenue_beat = estimates.get('revenue_beat')
+    eps_beat = estimates.get('eps_beat')
+
+    # Generate charts as HTML straight from the figure specs
+    head_assets = report_head_assets(asset_prefix)
+    if asset_prefix is None:
+        revenue_chart_html = charts.chart_html('revenue', financial_data, full_html=False, include_plotlyjs='cdn')
+        eps_chart_html = charts.chart_html('eps', financial_data, full_html=False, include_plotlyjs=False)
+        comparison_chart_html = charts.chart_html('comparison', financial_data, full_html=False, include_plotlyjs=False)
+        segment_chart_html = charts.chart_html('segment', financial_data, full_html=False, include_plotlyjs=False) or "<p>Segment data not available</p>"
+    else:
+        revenue_chart_html = charts.chart_div('revenue', financial_data)
+        eps_chart_html = charts.chart_div('eps', financial_data)
+        comparison_chart_html = charts.chart_div('comparison', financial_data)
+        segment_chart_html = charts.chart_div('segment', financial_data) or "<p>Segment data not available</p>"
+
+    # Static SVG fallbacks for print, email previews and readers without JavaScript
+    def noscript_svg(name):
+        svg = svg_charts.chart_svg(name, financial_data)
+        return f"<noscript>{svg}</noscript>" if svg else ""
+
+    # Beat/Miss status
+    def get_status(beat):
+        if beat is True:
+            return '<span style="color: #28a745; font-weight: bold;">BEAT ✓</span>'
+        elif beat is False:
+            return '<span style="color: #dc3545; font-weight: bold;">MISS ✗</span>'
+        return 'N/A'
+
+    # Key highlights
+    highlights_html = ""
+    for h in financial_data.get('key_highlights', []):
+        highlights_html += f"<li>{h}</li>"
+
+    # Segment table
+    segment_table = ""
+    for seg in financial_data.get('segment_performance') or []:
+        growth_color = "#28a745" if seg.get('growth', 0) >= 0 else "#dc3545"
+        segment_table += f"""
+        <tr>
+            <td>{seg.get('segment', 'N/A')}</td>
+            <td>${seg.get('revenue', 0):,.0f}M</td>
+            <td style="color: {growth_color}">{seg.get('growth', 0):+.1f}%</td>
+        </tr>
+        """
+
+    html_report = f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{ticker} {quarter} {fy} Earnings Report</title>
+    {head_assets}
+</head>
+<body>
+    <div class="header">
+        <div class="headline">{article_data.get('headline', 'Earnings Report')}</div>
+        <div class="meta">
+            <span class="ticker">{ticker}</span>
+            <span>{company}</span>
+            <span>{quarter} {fy}</span>
+            <span>📅 {datetime.now().strftime('%B %d, %Y')}</span>
+            <span>⏱️ {read_time} min read</span>
+        </div>
+    </div>
+
+    <!-- Key Metrics -->
+    <div class="section">
+        <div class="section-title">📊 Key Metrics</div>
+        <div class="metrics-grid">
+            <div class="metric-card blue">
+                <div class="metric-label">Revenue</div>
+                <div class="metric-value">${revenue:,.0f}M</div>
+                <div class="metric-change {'change-positive' if rev_change >= 0 else 'change-negative'}">
+                    {'▲' if rev_change >= 0 else '▼'} {abs(rev_change):.1f}% YoY
+                </div>
+            </div>
+            <div class="metric-card green">
+                <div class="metric-label">EPS</div>
+                <div class="metric-value">${eps:.2f}</div>
+                <div class="metric-change {'change-positive' if eps_change >= 0 else 'change-negative'}">
+                    {'▲' if eps_change >= 0 else '▼'} {abs(eps_change):.1f}% YoY
+                </div>
+            </div>
+            <div class="metric-card orange">
+                <div class="metric-label">Gross Margin</div>
+                <div class="metric-value">{margin:.1f}%</div>
+            </div>
+            <div class="metric-card purple">
+                <div class="metric-label">Net Income</div>
+                <div class="metric-value">${net_income:,.0f}M</div>
+                <div class="metric-change {'change-positive' if ni_change >= 0 else 'change-negative'}">
+                    {'▲' if ni_change >= 0 else '▼'} {abs(ni_change):.1f}% YoY
+                </div>
+            </div>
+        </div>
+    </div>
+
+    <!-- Estimates vs Actual -->
+    <div class="section">
+        <div class="section-title">📋 Estimates vs Actual</div>
+        <table>
+            <tr>
+                <th>Metric</th>
+                <th>Actual</th>
+                <th>Estimate</th>
+                <th>YoY Change</th>
+                <th>Status</th>
+            </tr>
+            <tr>
+                <td><strong>Revenue</strong></td>
+                <td>${revenue:,.0f}M</td>
+                <td>{format_number(revenue_est, '${:,.0f}M')}</td>
+                <td>{rev_change:+.1f}%</td>
+                <td>{get_status(revenue_beat)}</td>
+            </tr>
+            <tr>
+                <td><strong>EPS</strong></td>
+                <td>${eps:.2f}</td>
+                <td>{format_number(eps_est, '${:.2f}')}</td>
+                <td>{eps_change:+.1f}%</td>
+                <td>{get_status(eps_beat)}</td>
+            </tr>
+        </table>
+    </div>
+
+    <!-- Performance Charts -->
+    <div class="section">
+        <div class="section-title">📈 Performance Charts</div>
+        <div class="charts-grid">
+            <div class="chart-container">
+                {revenue_chart_html}
+                {noscript_svg('revenue')}
+            </div>
+            <div class="chart-container">
+                {eps_chart_html}
+                {noscript_svg('eps')}
+            </div>
+            <div class="chart-container">
+                {comparison_chart_html}
+                {noscript_svg('comparison')}
+            </div>
+            <div class="chart-container">
+                {segment_chart_html}
+                {noscript_svg('segment')}
+            </div>
+        </div>
+    </div>
+
+    <!-- Segment Performance Table -->
+    <div class="section">
+        <div class="section-title">📊 Segment Performance</div>
+        <table>
+            <tr>
+                <th>Segment</th>
+                <th>Revenue</th>
+                <th>YoY Growth</th>
+            </tr>
+            {segment_table}
+        </table>
+    </div>
+
+    <!-- Article Content -->
+    <div class="section">
+        <div class="section-title">📰 Full Article</div>
+        <div class="article-body">
+            <p><strong>{article_data.get('lead', '')}</strong></p>
+            <p>{article_data.get('key_numbers', '')}</p>
+
+            <h3 style="margin-top: 20px; color: #1a1a2e;">Segment Performance</h3>
+            <p>{article_data.get('segment_details', '')}</p>
+
+            <h3 style="margin-top: 20px; color: #1a1a2e;">Management Commentary</h3>
+            <div class="highlight-box">
+                {article_data.get('management_commentary', '')}
+            </div>
+
+            <h3 style="margin-top: 20px; color: #1a1a2e;">Outlook & Guidance</h3>
+            <p>{article_data.get('outlook', '')}</p>
+
+            <h3 style="margin-top: 20px; color: #1a1a2e;">Conclusion</h3>
+            <p>{article_data.get('conclusion', '')}</p>
+        </div>
+    </div>
+
+    <!-- Key Highlights -->
+    <div class="section">
+        <div class="section-title">🎯 Key Highlights</div>
+        <ul>
+            {highlights_html}
+        </ul>
+    </div>
+
+    <div class="footer">
+        Generated by Earnings News Generator | {datetime.now().strftime('%B %d, %Y at %H:%M')}
+    </div>
+</body>
+</html>
+    """
+    return html_report
+
+
+def generate_email_html(financial_data, article_data):
+    """Generate a self-contained article with inline SVG charts for email and wire feeds"""
+
+    ticker = financial_data.get('ticker', 'N/A')
+    company = financial_data.get('company_name', 'Company')
+    quarter = financial_data.get('quarter', 'Q4')
+    fy = financial_data.get('fiscal_year', 'FY2024')
+
+    charts_html = "".join(
+        f'<div style="margin: 16px 0;">{svg}</div>'
+        for svg in (svg_charts.chart_svg(name, financial_data) for name in svg_charts.SVG_CHARTS)
+        if svg
+    )
+    highlights_html = "".join(f"<li>{h}</li>" for h in financial_data.get('key_highlights', []))
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="UTF-8"><title>{ticker} {quarter} {fy} Earnings</title></head>
+<body style="margin: 0; padding: 20px; font-family: 'Segoe UI', Helvetica, Arial, sans-serif; color: #333; line-height: 1.6;">
+<div style="max-width: 640px; margin: 0 auto;">
+    <h1 style="font-size: 24px; color: #1a1a2e;">{article_data.get('headline', 'Earnings Report')}</h1>
+    <p style="color: #666; font-size: 13px;">{ticker} | {company} | {quarter} {fy} | {datetime.now().strftime('%B %d, %Y')}</p>
+    <p><strong>{article_data.get('lead', '')}</strong></p>
+    <p>{article_data.get('key_numbers', '')}</p>
+    {charts_html}
+    <h3 style="color: #1a1a2e;">Segment Performance</h3>
+    <p>{article_data.get('segment_details', '')}</p>
+    <h3 style="color: #1a1a2e;">Management Commentary</h3>
+    <p style="border-left: 4px solid #0066cc; padding-left: 12px;">{article_data.get('management_commentary', '')}</p>
+    <h3 style="color: #1a1a2e;">Outlook & Guidance</h3>
+    <p>{article_data.get('outlook', '')}</p>
+    <h3 style="color: #1a1a2e;">Conclusion</h3>
+    <p>{article_data.get('conclusion', '')}</p>
+    <h3 style="color: #1a1a2e;">Key Highlights</h3>
+    <ul>{highlights_html}</ul>
+</div>
+</body>
+</html>
+"""
+
+
+def generate_json_export(financial_data, article_data):
+    """JSON export of the extracted data and article"""
+    export_data = {
+        "financial_data": financial_data,
+        "article": article_data,
+        "generated_at": datetime.now().isoformat()
+    }
+    return json.dumps(export_data, indent=2, default=str)
+
+
+def generate_article_text(financial_data, article_data):
+    """Plain-text article export"""
+    return f"""
+{article_data.get('headline', '')}
+{'=' * 60}
+
+{article_data.get('lead', '')}
+
+KEY NUMBERS
+{'-' * 40}
+{article_data.get('key_numbers', '')}
+
+SEGMENT PERFORMANCE
+{'-' * 40}
+{article_data.get('segment_details', '')}
+
+MANAGEMENT COMMENTARY
+{'-' * 40}
+{article_data.get('management_commentary', '')}
+
+OUTLOOK & GUIDANCE
+{'-' * 40}
+{article_data.get('outlook', '')}
+
+CONCLUSION
+{'-' * 40}
+{article_data.get('conclusion', '')}
+
+KEY HIGHLIGHTS
+{'-' * 40}
+""" + "\n".join([f"• {h}" for h in financial_data.get('key_highlights', [])])
+
+
+def generate_metrics_csv(financial_data):
+    """Metrics and segment CSV export"""
+    current = financial_data.get('current_quarter') or {}
+    yoy = financial_data.get('year_over_year') or {}
+    estimates = financial_data.get('estimates') or {}
+
+    return f"""Metric,Actual,Estimate,YoY Change,Status
+Revenue (M),{current.get('revenue', {}).get('value', 'N/A')},{format_number(estimates.get('revenue_estimate'), '{}')},{yoy.get('revenue_change', 'N/A')}%,{'BEAT' if estimates.get('revenue_beat') else 'MISS' if estimates.get('revenue_beat') is False else 'N/A'}
+EPS,{current.get('eps', {}).get('value', 'N/A')},{format_number(estimates.get('eps_estimate'), '{}')},{yoy.get('eps_change', 'N/A')}%,{'BEAT' if estimates.get('eps_beat') else 'MISS' if estimates.get('eps_beat') is False else 'N/A'}
+Gross Margin %,{current.get('gross_margin', {}).get('value', 'N/A')},,
+Net Income (M),{current.get('net_income', {}).get('value', 'N/A')},,{yoy.get('net_income_change', 'N/A')}%,
+
+Segment,Revenue (M),Growth %
+""" + "\n".join([f"{s.get('segment', 'N/A')},{s.get('revenue', 'N/A')},{s.get('growth', 'N/A')}%" for s in financial_data.get('segment_performance') or []])
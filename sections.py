@@ -0,0 +1,143 @@
+"""
+Section-Level Article Regeneration
+Maps financial_data fields to the article sections that are written from them,
+so an edited number only regenerates the sections that mention it
+"""
+
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline import MODEL
+from ratelimit import create_message
+
+
+# Article section -> financial_data field prefixes it is written from
+SECTION_DEPENDENCIES = {
+    "headline": ["company_name", "ticker", "quarter", "fiscal_year", "current_quarter.revenue",
+                 "current_quarter.eps", "year_over_year", "estimates"],
+    "subheadline": ["key_highlights", "segment_performance"],
+    "lead": ["company_name", "ticker", "quarter", "fiscal_year", "current_quarter.revenue",
+             "current_quarter.eps", "year_over_year", "estimates"],
+    "key_numbers": ["current_quarter", "prior_year_quarter", "prior_quarter", "year_over_year",
+                    "quarter_over_quarter", "estimates"],
+    "segment_details": ["segment_performance"],
+    "management_commentary": ["ceo_quote", "key_highlights"],
+    "outlook": ["guidance", "outlook"],
+    "conclusion": ["year_over_year", "estimates", "guidance"],
+}
+
+SECTION_INSTRUCTIONS = {
+    "headline": "Catchy, informative headline mentioning company, quarter, and key result (beat/miss). One line.",
+    "subheadline": "One-line subheadline.",
+    "lead": "2-3 sentence summary of the key results.",
+    "key_numbers": "Paragraph detailing revenue, EPS, and comparisons.",
+    "segment_details": "Performance by business segment.",
+    "management_commentary": "CEO/CFO quotes or paraphrased insights.",
+    "outlook": "Forward-looking guidance and expectations.",
+    "conclusion": "Brief wrap-up with stock context.",
+}
+
+
+def flatten_fields(data, prefix=""):
+    """Flatten nested financial_data into {"a.b.0.c": scalar} pairs"""
+    fields = {}
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        path = f"{prefix}{key}"
+        if isinstance(value, (dict, list)) and value:
+            fields.update(flatten_fields(value, path + "."))
+        else:
+            fields[path] = value
+    return fields
+
+
+def unflatten_fields(fields):
+    """Inverse of flatten_fields"""
+    root = {}
+    for path, value in fields.items():
+        parts = path.split(".")
+        node = root
+        for part, next_part in zip(parts, parts[1:]):
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return _restore_lists(root)
+
+
+def _restore_lists(node):
+    if not isinstance(node, dict) or not node:
+        return node
+    restored = {key: _restore_lists(value) for key, value in node.items()}
+    if all(key.isdigit() for key in restored):
+        return [restored[key] for key in sorted(restored, key=int)]
+    return restored
+
+
+def changed_fields(old_data, new_data):
+    """Dotted paths whose values differ between two financial_data dicts"""
+    old_fields, new_fields = flatten_fields(old_data), flatten_fields(new_data)
+    return sorted(
+        path for path in old_fields.keys() | new_fields.keys()
+        if old_fields.get(path) != new_fields.get(path)
+    )
+
+
+def affected_sections(changed_paths):
+    """Article sections that depend on any of the changed paths"""
+    return [
+        section for section, prefixes in SECTION_DEPENDENCIES.items()
+        if any(path == prefix or path.startswith(prefix + ".") for path in changed_paths for prefix in prefixes)
+    ]
+
+
+def regenerate_section(client, financial_data, article_data, section):
+    """Rewrite a single article section from corrected financial data"""
+
+    other_sections = {
+        key: value for key, value in article_data.items()
+        if key in SECTION_INSTRUCTIONS and key != section
+    }
+
+    section_prompt = f"""An editor corrected the extracted earnings data below. Rewrite only the "{section}" section of the news article so it matches the corrected numbers, in the same professional financial journalism style as the rest of the article.
+
+CORRECTED FINANCIAL DATA:
+{json.dumps(financial_data, separators=(',', ':'))}
+
+REST OF THE ARTICLE (for tone and consistency, do not repeat it):
+{json.dumps(other_sections, separators=(',', ':'))}
+
+PREVIOUS "{section}" TEXT:
+{article_data.get(section, '')}
+
+SECTION: {SECTION_INSTRUCTIONS[section]}
+
+Respond with the new section text only, without quotes or labels."""
+
+    response = create_message(
+        client,
+        model=MODEL,
+        max_tokens=150 if section in ("headline", "subheadline") else 700,
+        messages=[{"role": "user", "content": section_prompt}]
+    )
+
+    return response.content[0].text.strip().strip('"')
+
+
+def regenerate_sections(client, financial_data, article_data, sections):
+    """Regenerate the given sections in parallel and merge them into a new article"""
+    sections = [s for s in sections if s in SECTION_INSTRUCTIONS]
+    updated = dict(article_data)
+    if not sections:
+        return updated
+
+    with ThreadPoolExecutor(max_workers=len(sections)) as executor:
+        futures = {
+            # Each worker runs in a copy of the caller's context so calls keep its rate-limit session
+            section: executor.submit(contextvars.copy_context().run, regenerate_section,
+                                     client, financial_data, article_data, section)
+            for section in sections
+        }
+        for section, future in futures.items():
+            updated[section] = future.result()
+
+    return updated
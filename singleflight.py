@@ -0,0 +1,76 @@
+"""
+Single-Flight Coalescing
+Concurrent calls with the same key share one execution: the first caller
+runs the work and everyone who arrives while it is in flight waits for and
+receives the same result
+"""
+
+import threading
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "cancelled")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.cancelled = False
+
+
+class SingleFlight:
+    """In-process single-flight groups keyed by any hashable value
+
+    If the leader raises an Exception, every follower re-raises that same
+    exception. If the leader is cancelled instead (a BaseException such as a
+    Streamlit script stop or KeyboardInterrupt), followers are not failed on
+    its behalf: one of them takes over as the new leader and runs the work.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key, fn, on_join=None):
+        """Return (fn() result, shared) where shared is True if another caller ran fn
+
+        on_join() is called when this caller attaches to a flight already in
+        progress, before it starts waiting.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                return self._lead(key, flight, fn), False
+
+            if on_join:
+                on_join()
+            flight.done.wait()
+            if flight.cancelled:
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+    def _lead(self, key, flight, fn):
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as exc:
+            flight.error = exc
+            raise
+        except BaseException:
+            flight.cancelled = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
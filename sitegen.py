@@ -0,0 +1,255 @@
+"""
+Static News Site Generator
+Renders every stored report plus ticker and quarter index pages into a static
+site with shared CSS/JS assets. Rebuilds are incremental: a report page is only
+re-rendered when its data or the page templates change, tracked by content
+hashes in a manifest
+
+Usage: python sitegen.py OUTPUT_DIR [--data-dir DIR] [--full] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from html import escape
+
+import charts
+import report
+import svg_charts
+from render_pool import default_workers, render_stage
+from store import write_json_atomic
+
+
+SITE_MANIFEST = "site-manifest.json"
+INDEX_LIMIT = 200
+
+# Modules whose source determines how pages look
+TEMPLATE_MODULES = [report, charts, svg_charts]
+
+
+def template_hash():
+    """Hash of the page-rendering source code, so template edits trigger re-renders"""
+    digest = hashlib.sha256()
+    for module in TEMPLATE_MODULES + [sys.modules[__name__]]:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def content_hash(*parts):
+    """Stable hash of JSON-serializable content"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def slug(text):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(text or "unknown")).strip("_") or "unknown"
+
+
+def _write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _page(title, body, prefix):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{escape(title)}</title>
+    <link rel="stylesheet" href="{prefix}assets/report.css">
+</head>
+<body>
+    <div class="header"><div class="headline">{escape(title)}</div>
+        <div class="meta"><a href="{prefix}index.html" style="color: white;">All reports</a></div>
+    </div>
+{body}
+    <div class="footer">Generated by Earnings News Generator | {time.strftime('%B %d, %Y at %H:%M')}</div>
+</body>
+</html>
+"""
+
+
+def _report_table(entries, page_prefix):
+    rows = "".join(
+        f"""
+            <tr>
+                <td><span class="ticker" style="color: white;">{escape(str(e['ticker'] or ''))}</span></td>
+                <td><a href="{page_prefix}reports/{e['id']}.html">{escape(str(e['headline'] or 'Earnings Report'))}</a></td>
+                <td>{escape(str(e['quarter'] or ''))} {escape(str(e['fiscal_year'] or ''))}</td>
+                <td>{escape(str(e['created_at'] or '')[:10])}</td>
+            </tr>"""
+        for e in entries
+    )
+    return f"""
+    <div class="section">
+        <table>
+            <tr><th>Ticker</th><th>Headline</th><th>Period</th><th>Published</th></tr>{rows}
+        </table>
+    </div>"""
+
+
+def _link_list(title, links):
+    items = "".join(f'<li><a href="{href}">{escape(label)}</a> ({count})</li>' for label, href, count in links)
+    return f"""
+    <div class="section">
+        <div class="section-title">{escape(title)}</div>
+        <ul>{items}</ul>
+    </div>"""
+
+
+def index_pages(entries):
+    """{relative path: html} for the home, ticker and quarter index pages"""
+    newest = sorted(entries, key=lambda e: e['created_at'] or "", reverse=True)
+    by_ticker, by_quarter = {}, {}
+    for entry in newest:
+        by_ticker.setdefault(slug(entry['ticker']), []).append(entry)
+        by_quarter.setdefault(slug(f"{entry['fiscal_year']}-{entry['quarter']}"), []).append(entry)
+
+    ticker_links = [(group[0]['ticker'] or key, f"tickers/{key}.html", len(group)) for key, group in sorted(by_ticker.items())]
+    quarter_links = [(f"{group[0]['quarter']} {group[0]['fiscal_year']}", f"quarters/{key}.html", len(group))
+                     for key, group in sorted(by_quarter.items(), reverse=True)]
+
+    pages = {
+        "index.html": _page(
+            "Earnings News",
+            _report_table(newest[:INDEX_LIMIT], "") + _link_list("Companies", ticker_links) + _link_list("Quarters", quarter_links),
+            ""
+        )
+    }
+    for key, group in by_ticker.items():
+        title = f"{group[0]['ticker'] or key} - {group[0]['company'] or ''} Earnings"
+        pages[f"tickers/{key}.html"] = _page(title, _report_table(group, "../"), "../")
+    for key, group in by_quarter.items():
+        title = f"{group[0]['quarter']} {group[0]['fiscal_year']} Earnings"
+        pages[f"quarters/{key}.html"] = _page(title, _report_table(group, "../"), "../")
+    return pages
+
+
+def asset_files():
+    """Shared assets written once per site"""
+    return {
+        "assets/report.css": report.REPORT_CSS + "a { color: #0066cc; }\n",
+        "assets/charts.js": charts.charts_js(),
+    }
+
+
+def _load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, SITE_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"template": None, "reports": {}, "pages": {}}
+
+
+def render_report_page(record):
+    """HTML for one report page in the site layout"""
+    return report.generate_full_html_report(record['financial_data'], record['article_data'], asset_prefix="../assets/")
+
+
+def render_page(payload):
+    """(report id, html) for one (id, financial_data, article_data) payload; runs in a worker process"""
+    report_id, financial_data, article_data = payload
+    return report_id, render_report_page({"financial_data": financial_data, "article_data": article_data})
+
+
+def _entry(record, mtime, data_hash):
+    fd, article = record['financial_data'], record['article_data']
+    return {
+        "id": record['id'], "mtime": mtime, "hash": data_hash,
+        "ticker": fd.get('ticker'), "company": fd.get('company_name'),
+        "quarter": fd.get('quarter'), "fiscal_year": fd.get('fiscal_year'),
+        "headline": article.get('headline'), "created_at": record.get('created_at'),
+    }
+
+
+def build_site(store, output_dir, full=False, workers=1):
+    """Incrementally build the static site; returns counts of what was done
+
+    Changed report pages are rendered by `workers` processes.
+    """
+    manifest = _load_manifest(output_dir)
+    template = template_hash()
+    rebuild_all = full or manifest.get("template") != template
+    old_reports = manifest.get("reports", {})
+    old_pages = manifest.get("pages", {})
+
+    stats = {"rendered": 0, "unchanged": 0, "removed": 0, "pages": 0}
+    reports = {}
+
+    def changed_reports():
+        for report_id, mtime in store.modified_times().items():
+            entry = old_reports.get(report_id)
+            if entry and not rebuild_all and entry["mtime"] == mtime:
+                reports[report_id] = entry
+                stats["unchanged"] += 1
+                continue
+
+            record = store.load(report_id)
+            if not record:
+                continue
+            data_hash = content_hash(record['financial_data'], record['article_data'])
+            reports[report_id] = _entry(record, mtime, data_hash)
+            if entry and not rebuild_all and entry["hash"] == data_hash:
+                stats["unchanged"] += 1
+            else:
+                yield report_id, record['financial_data'], record['article_data']
+
+    for report_id, html in render_stage(render_page, changed_reports(), workers):
+        _write_text(os.path.join(output_dir, "reports", f"{report_id}.html"), html)
+        stats["rendered"] += 1
+
+    for report_id in old_reports.keys() - reports.keys():
+        path = os.path.join(output_dir, "reports", f"{report_id}.html")
+        if os.path.exists(path):
+            os.remove(path)
+        stats["removed"] += 1
+
+    pages = {}
+    generated = {**asset_files(), **index_pages(list(reports.values()))}
+    for rel_path, html in generated.items():
+        # Index pages carry a build timestamp, so compare content without it
+        page_hash = content_hash(re.sub(r'<div class="footer">.*?</div>', "", html))
+        pages[rel_path] = page_hash
+        if rebuild_all or old_pages.get(rel_path) != page_hash or not os.path.exists(os.path.join(output_dir, rel_path)):
+            _write_text(os.path.join(output_dir, rel_path), html)
+            stats["pages"] += 1
+    for rel_path in old_pages.keys() - pages.keys():
+        path = os.path.join(output_dir, rel_path)
+        if os.path.exists(path):
+            os.remove(path)
+
+    os.makedirs(output_dir, exist_ok=True)
+    write_json_atomic(os.path.join(output_dir, SITE_MANIFEST),
+                      {"template": template, "reports": reports, "pages": pages})
+    return stats
+
+
+def main(argv=None):
+    from store import ReportStore, DEFAULT_DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Build the static earnings news site from stored reports")
+    parser.add_argument("output", help="site output directory")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--full", action="store_true", help="re-render every page")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="rendering processes (default: one per core)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    stats = build_site(ReportStore(args.data_dir), args.output, full=args.full, workers=args.workers)
+    print(
+        f"Rendered {stats['rendered']} report(s), {stats['unchanged']} unchanged, "
+        f"{stats['removed']} removed, {stats['pages']} index/asset page(s) written "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Report Store
+Persists processed transcripts together with their extracted financial data
+and generated article so earlier results can be served again
+"""
+
+import json
+import os
+import hashlib
+import threading
+from datetime import datetime
+
+
+DEFAULT_DATA_DIR = os.environ.get("NEWSMAKER_DATA_DIR", "data")
+
+
+def transcript_hash(transcript):
+    """Stable content hash of a raw transcript"""
+    return hashlib.sha256(transcript.encode("utf-8")).hexdigest()
+
+
+def write_json_atomic(path, payload):
+    """Write JSON to a temp file and rename it so readers never see partial files
+
+    The temp name is per thread, so concurrent writers of the same path
+    (e.g. two workers checkpointing identical inputs) don't collide.
+    """
+    tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp_path, path)
+
+
+class ReportStore:
+    """Directory of one JSON record per processed transcript"""
+
+    def __init__(self, root=DEFAULT_DATA_DIR):
+        self.root = root
+        self.reports_dir = os.path.join(root, "reports")
+        os.makedirs(self.reports_dir, exist_ok=True)
+
+    def _path(self, report_id):
+        return os.path.join(self.reports_dir, f"{report_id}.json")
+
+    def __contains__(self, report_id):
+        return os.path.exists(self._path(report_id))
+
+    def save(self, transcript, financial_data, article_data, report_id=None):
+        """Store a finished report and return its id"""
+        report_id = report_id or transcript_hash(transcript)[:16]
+        record = {
+            "id": report_id,
+            "ticker": financial_data.get('ticker'),
+            "company_name": financial_data.get('company_name'),
+            "quarter": financial_data.get('quarter'),
+            "fiscal_year": financial_data.get('fiscal_year'),
+            "created_at": datetime.now().isoformat(),
+            "transcript": transcript,
+            "financial_data": financial_data,
+            "article_data": article_data,
+        }
+        write_json_atomic(self._path(report_id), record)
+        return report_id
+
+    def load(self, report_id):
+        """Load a stored record, or None if it does not exist"""
+        try:
+            with open(self._path(report_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def ids(self):
+        """Ids of all stored reports"""
+        return sorted(
+            name[:-5] for name in os.listdir(self.reports_dir)
+            if name.endswith(".json")
+        )
+
+    def modified_times(self):
+        """Map of report id to last-modified time, for incremental consumers"""
+        times = {}
+        with os.scandir(self.reports_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    times[entry.name[:-5]] = entry.stat().st_mtime
+        return times
+
+    def iter_reports(self):
+        """Yield every stored record"""
+        for report_id in self.ids():
+            record = self.load(report_id)
+            if record:
+                yield record
@@ -0,0 +1,138 @@
+"""
+App Styles
+Custom CSS for the AlphaStreet-style news UI, collapsed once at import so each
+Streamlit rerun only re-sends a prebuilt string
+"""
+
+import re
+
+
+PAGE_CONFIG = {
+    "page_title": "Earnings News Generator",
+    "page_icon": "📊",
+    "layout": "wide",
+    "initial_sidebar_state": "expanded",
+}
+
+# Custom CSS for AlphaStreet-style news
+_APP_CSS_SOURCE = """
+<style>
+    .news-container {
+        background: #ffffff;
+        border-radius: 12px;
+        padding: 30px;
+        box-shadow: 0 2px 12px rgba(0,0,0,0.08);
+        margin-bottom: 20px;
+    }
+    .news-headline {
+        font-size: 32px;
+        font-weight: 700;
+        color: #1a1a2e;
+        line-height: 1.3;
+        margin-bottom: 15px;
+    }
+    .news-meta {
+        display: flex;
+        gap: 20px;
+        color: #666;
+        font-size: 14px;
+        margin-bottom: 20px;
+        padding-bottom: 15px;
+        border-bottom: 1px solid #eee;
+    }
+    .company-ticker {
+        background: #0066cc;
+        color: white;
+        padding: 4px 12px;
+        border-radius: 4px;
+        font-weight: 600;
+        font-size: 14px;
+    }
+    .news-body {
+        font-size: 17px;
+        line-height: 1.8;
+        color: #333;
+    }
+    .news-body p {
+        margin-bottom: 16px;
+    }
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 12px;
+        padding: 20px;
+        color: white;
+        text-align: center;
+        height: 100%;
+    }
+    .metric-card.green {
+        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
+    }
+    .metric-card.blue {
+        background: linear-gradient(135deg, #4facfe 0%, #00f2fe 100%);
+    }
+    .metric-card.orange {
+        background: linear-gradient(135deg, #fa709a 0%, #fee140 100%);
+    }
+    .metric-card.red {
+        background: linear-gradient(135deg, #ff416c 0%, #ff4b2b 100%);
+    }
+    .metric-value {
+        font-size: 28px;
+        font-weight: 700;
+        margin: 10px 0;
+    }
+    .metric-label {
+        font-size: 14px;
+        opacity: 0.9;
+    }
+    .metric-change {
+        font-size: 14px;
+        margin-top: 8px;
+    }
+    .change-positive {
+        color: #00ff88;
+    }
+    .change-negative {
+        color: #ff6b6b;
+    }
+    .highlight-box {
+        background: #f8f9fa;
+        border-left: 4px solid #0066cc;
+        padding: 15px 20px;
+        margin: 20px 0;
+        border-radius: 0 8px 8px 0;
+    }
+    .section-title {
+        font-size: 20px;
+        font-weight: 600;
+        color: #1a1a2e;
+        margin: 25px 0 15px 0;
+    }
+    .comparison-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 15px 0;
+    }
+    .comparison-table th {
+        background: #f8f9fa;
+        padding: 12px;
+        text-align: left;
+        font-weight: 600;
+        border-bottom: 2px solid #dee2e6;
+    }
+    .comparison-table td {
+        padding: 12px;
+        border-bottom: 1px solid #eee;
+    }
+    .beat {
+        color: #28a745;
+        font-weight: 600;
+    }
+    .miss {
+        color: #dc3545;
+        font-weight: 600;
+    }
+</style>
+"""
+
+APP_CSS = re.sub(r"\s*([{};:,])\s*", r"\1", re.sub(r"\s+", " ", _APP_CSS_SOURCE)).strip()
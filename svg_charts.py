@@ -0,0 +1,213 @@
+"""
+SVG Charts
+Dependency-free static SVG versions of the four report charts, for emails,
+wire feeds and anywhere plotly's JavaScript can't run
+"""
+
+import math
+from html import escape
+
+from charts import SET2, revenue_history, eps_history, yoy_changes
+
+
+WIDTH, HEIGHT = 600, 400
+MARGIN_LEFT, MARGIN_RIGHT, MARGIN_TOP, MARGIN_BOTTOM = 70, 20, 50, 55
+PLOT_WIDTH = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+PLOT_HEIGHT = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+FONT = "font-family:Segoe UI,Helvetica,Arial,sans-serif"
+TEXT_COLOR = "#2a3f5f"
+GRID_COLOR = "#EBF0F8"
+
+
+def _num(value):
+    """Compact coordinate formatting"""
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _nice_ticks(low, high, count=5):
+    """Round tick values spanning [low, high]"""
+    if high == low:
+        high = low + 1
+    raw_step = (high - low) / count
+    magnitude = 10 ** math.floor(math.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw_step)
+    start = math.floor(low / step) * step
+    ticks = []
+    value = start
+    while value <= high + step * 0.5:
+        ticks.append(round(value, 10))
+        value += step
+    return ticks
+
+
+def _tick_label(value):
+    if abs(value) >= 1000:
+        return f"{value / 1000:g}k"
+    return f"{value:g}"
+
+
+def _frame(title, body, x_title=None, y_title=None):
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {WIDTH} {HEIGHT}" width="{WIDTH}" height="{HEIGHT}" style="{FONT}">',
+        f'<rect width="{WIDTH}" height="{HEIGHT}" fill="#fff"/>',
+        f'<text x="{MARGIN_LEFT // 2}" y="30" font-size="20" fill="{TEXT_COLOR}">{escape(title)}</text>',
+        body,
+    ]
+    if x_title:
+        parts.append(f'<text x="{MARGIN_LEFT + PLOT_WIDTH / 2:.0f}" y="{HEIGHT - 12}" font-size="14" fill="{TEXT_COLOR}" text-anchor="middle">{escape(x_title)}</text>')
+    if y_title:
+        y_mid = MARGIN_TOP + PLOT_HEIGHT / 2
+        parts.append(f'<text x="16" y="{y_mid:.0f}" font-size="14" fill="{TEXT_COLOR}" text-anchor="middle" transform="rotate(-90 16 {y_mid:.0f})">{escape(y_title)}</text>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+
+class _Axes:
+    """Category x axis and linear y axis over the plot area"""
+
+    def __init__(self, categories, values, include_zero=True):
+        low, high = min(values), max(values)
+        if include_zero:
+            low, high = min(low, 0), max(high, 0)
+        pad = (high - low) * 0.12 or 1
+        self.ticks = _nice_ticks(low - (pad if low < 0 else 0), high + pad)
+        self.low, self.high = self.ticks[0], self.ticks[-1]
+        self.categories = categories
+        self.slot = PLOT_WIDTH / max(len(categories), 1)
+
+    def x(self, index):
+        return MARGIN_LEFT + self.slot * (index + 0.5)
+
+    def y(self, value):
+        return MARGIN_TOP + PLOT_HEIGHT * (self.high - value) / (self.high - self.low)
+
+    def grid(self):
+        parts = []
+        for tick in self.ticks:
+            y = _num(self.y(tick))
+            parts.append(f'<line x1="{MARGIN_LEFT}" x2="{MARGIN_LEFT + PLOT_WIDTH}" y1="{y}" y2="{y}" stroke="{GRID_COLOR}"/>')
+            parts.append(f'<text x="{MARGIN_LEFT - 6}" y="{y}" dy="4" font-size="12" fill="{TEXT_COLOR}" text-anchor="end">{_tick_label(tick)}</text>')
+        for i, category in enumerate(self.categories):
+            parts.append(f'<text x="{_num(self.x(i))}" y="{MARGIN_TOP + PLOT_HEIGHT + 18}" font-size="12" fill="{TEXT_COLOR}" text-anchor="middle">{escape(str(category))}</text>')
+        return "".join(parts)
+
+
+def _bars(axes, values, colors, labels):
+    parts = []
+    width = axes.slot * 0.8
+    zero = axes.y(0) if axes.low <= 0 <= axes.high else axes.y(axes.low)
+    for i, (value, label) in enumerate(zip(values, labels)):
+        top = axes.y(value)
+        y, height = min(top, zero), abs(zero - top)
+        x = axes.x(i) - width / 2
+        parts.append(f'<rect x="{_num(x)}" y="{_num(y)}" width="{_num(width)}" height="{_num(height)}" fill="{colors[i % len(colors)]}"/>')
+        if label:
+            label_y = top - 6 if value >= 0 else top + 16
+            parts.append(f'<text x="{_num(axes.x(i))}" y="{_num(label_y)}" font-size="12" fill="{TEXT_COLOR}" text-anchor="middle">{escape(label)}</text>')
+    return "".join(parts)
+
+
+def revenue_chart_svg(financial_data):
+    """Quarterly revenue bars with trend line"""
+    historical = revenue_history(financial_data)
+    quarters = [h['quarter'] for h in historical]
+    revenues = [h.get('revenue', 0) or 0 for h in historical]
+    axes = _Axes(quarters, revenues)
+
+    colors = ['#4facfe', '#4facfe', '#4facfe', '#00f2fe']
+    body = axes.grid() + _bars(axes, revenues, colors, [f"${r:,.0f}M" if r else "" for r in revenues])
+    points = " ".join(f"{_num(axes.x(i))},{_num(axes.y(r))}" for i, r in enumerate(revenues))
+    body += f'<polyline points="{points}" fill="none" stroke="#ff6b6b" stroke-width="3"/>'
+    body += "".join(f'<circle cx="{_num(axes.x(i))}" cy="{_num(axes.y(r))}" r="5" fill="#ff6b6b"/>' for i, r in enumerate(revenues))
+    return _frame('Quarterly Revenue Trend', body, 'Quarter', 'Revenue ($ Millions)')
+
+
+def eps_chart_svg(financial_data):
+    """EPS area chart"""
+    historical = eps_history(financial_data)
+    quarters = [h['quarter'] for h in historical]
+    eps_values = [h.get('eps', 0) or 0 for h in historical]
+    axes = _Axes(quarters, eps_values)
+
+    coords = [(axes.x(i), axes.y(e)) for i, e in enumerate(eps_values)]
+    line = " ".join(f"{_num(x)},{_num(y)}" for x, y in coords)
+    base = _num(axes.y(0))
+    area = f"{_num(coords[0][0])},{base} {line} {_num(coords[-1][0])},{base}"
+
+    body = axes.grid()
+    body += f'<polygon points="{area}" fill="rgba(102,126,234,0.2)"/>'
+    body += f'<polyline points="{line}" fill="none" stroke="#667eea" stroke-width="3"/>'
+    for (x, y), e in zip(coords, eps_values):
+        body += f'<circle cx="{_num(x)}" cy="{_num(y)}" r="6" fill="#667eea"/>'
+        if e:
+            body += f'<text x="{_num(x)}" y="{_num(y - 12)}" font-size="12" fill="{TEXT_COLOR}" text-anchor="middle">{"-" if e < 0 else ""}${abs(e):.2f}</text>'
+    return _frame('Earnings Per Share Trend', body, 'Quarter', 'EPS ($)')
+
+
+def comparison_chart_svg(financial_data):
+    """YoY change bars with dashed zero line"""
+    metrics, changes = zip(*yoy_changes(financial_data))
+    axes = _Axes(metrics, changes)
+
+    colors = ['#38ef7d' if c >= 0 else '#ff4b2b' for c in changes]
+    body = axes.grid() + _bars(axes, changes, colors, [f"{c:+.1f}%" for c in changes])
+    zero = _num(axes.y(0))
+    body += f'<line x1="{MARGIN_LEFT}" x2="{MARGIN_LEFT + PLOT_WIDTH}" y1="{zero}" y2="{zero}" stroke="gray" stroke-dasharray="6,4"/>'
+    return _frame('Year-over-Year Change', body, 'Metric', 'Change (%)')
+
+
+def segment_chart_svg(financial_data):
+    """Revenue by segment donut, or None without segment data"""
+    segments = financial_data.get('segment_performance') or []
+    values = [max(s.get('revenue', 0) or 0, 0) for s in segments]
+    total = sum(values)
+    if not segments or not total:
+        return None
+
+    cx, cy, outer = MARGIN_LEFT + 150, MARGIN_TOP + PLOT_HEIGHT / 2, PLOT_HEIGHT / 2
+    inner = outer * 0.4
+    body = []
+    angle = -math.pi / 2
+    for i, (segment, value) in enumerate(zip(segments, values)):
+        color = SET2[i % len(SET2)]
+        sweep = 2 * math.pi * value / total
+        if sweep >= 2 * math.pi - 1e-9:
+            body.append(f'<circle cx="{_num(cx)}" cy="{_num(cy)}" r="{_num((outer + inner) / 2)}" fill="none" stroke="{color}" stroke-width="{_num(outer - inner)}"/>')
+        elif sweep > 0:
+            end = angle + sweep
+            large = 1 if sweep > math.pi else 0
+            x1, y1 = cx + outer * math.cos(angle), cy + outer * math.sin(angle)
+            x2, y2 = cx + outer * math.cos(end), cy + outer * math.sin(end)
+            x3, y3 = cx + inner * math.cos(end), cy + inner * math.sin(end)
+            x4, y4 = cx + inner * math.cos(angle), cy + inner * math.sin(angle)
+            body.append(
+                f'<path d="M{_num(x1)},{_num(y1)}A{_num(outer)},{_num(outer)} 0 {large} 1 {_num(x2)},{_num(y2)}'
+                f'L{_num(x3)},{_num(y3)}A{_num(inner)},{_num(inner)} 0 {large} 0 {_num(x4)},{_num(y4)}Z" fill="{color}" stroke="#fff"/>'
+            )
+            if sweep > 0.25:
+                mid = angle + sweep / 2
+                radius = (outer + inner) / 2
+                body.append(
+                    f'<text x="{_num(cx + radius * math.cos(mid))}" y="{_num(cy + radius * math.sin(mid))}" dy="4" '
+                    f'font-size="12" fill="#fff" text-anchor="middle">{value / total:.1%}</text>'
+                )
+            angle = end
+
+        legend_y = MARGIN_TOP + 20 + i * 22
+        body.append(f'<rect x="{WIDTH - 200}" y="{legend_y - 10}" width="12" height="12" fill="{color}"/>')
+        body.append(f'<text x="{WIDTH - 182}" y="{legend_y}" font-size="12" fill="{TEXT_COLOR}">{escape(str(segment.get("segment", "")))}</text>')
+
+    return _frame('Revenue by Segment', "".join(body))
+
+
+SVG_CHARTS = {
+    "revenue": revenue_chart_svg,
+    "eps": eps_chart_svg,
+    "comparison": comparison_chart_svg,
+    "segment": segment_chart_svg,
+}
+
+
+def chart_svg(name, financial_data):
+    """SVG markup for one named chart, or None when the chart has no data"""
+    return SVG_CHARTS[name](financial_data)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def api_server():
+    """start(**options) -> (server, client): a mock_api stand-in on a free port and an SDK client for it"""
+    import anthropic
+    import mock_api
+
+    servers = []
+
+    def start(**options):
+        server = mock_api.start_server(port=0, **options)
+        servers.append(server)
+        return server, anthropic.Anthropic(api_key="test", base_url=server.base_url, max_retries=0)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
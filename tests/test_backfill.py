@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+import backfill
+import dedup
+from store import ReportStore
+
+
+TRANSCRIPTS = {
+    "first": "Operator: Welcome to the fourth quarter earnings call. Revenue grew twelve percent.",
+    "second": "Operator: Welcome to the third quarter earnings call. Margins expanded again.",
+}
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.fixture
+def backfill_env(tmp_path, api_server):
+    server, client = api_server(batch_delay=0.2)
+    store = ReportStore(str(tmp_path / "data"))
+    index = dedup.FingerprintIndex(str(tmp_path / "data" / "fingerprints.jsonl"))
+    state_path = str(tmp_path / backfill.STATE_FILE)
+
+    def run(transcripts, **options):
+        return backfill.run_backfill(client, transcripts, store, index, state_path, poll=0.05, **options)
+
+    return server, client, store, state_path, run
+
+
+def test_backfill_extracts_writes_and_stores(backfill_env):
+    server, _, store, state_path, run = backfill_env
+    result = run(TRANSCRIPTS)
+
+    assert set(result["written"]) == set(TRANSCRIPTS) and not result["failures"]
+    assert all(store.load(report_id)['article_data']['headline'] for report_id in TRANSCRIPTS)
+    assert result["input_tokens"] > 0 and result["output_tokens"] > 0
+    assert len(server.batches) == 2  # one extraction batch, one article batch
+    assert not os.path.exists(state_path)
+
+
+def test_template_writer_needs_only_the_extraction_batch(backfill_env):
+    server, _, store, _, run = backfill_env
+    result = run(TRANSCRIPTS, writer="template")
+    assert set(result["written"]) == set(TRANSCRIPTS)
+    assert len(server.batches) == 1
+
+
+def test_interrupted_backfill_resumes_its_batches(backfill_env):
+    server, _, store, state_path, run = backfill_env
+
+    def interrupt(batches):
+        raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        run(TRANSCRIPTS, on_progress=interrupt)
+    with open(state_path, encoding="utf-8") as f:
+        state = json.load(f)
+    assert sorted(state["extraction"]["custom_ids"]) == sorted(TRANSCRIPTS)
+    assert len(server.batches) == 1
+
+    # A transcript added since the first submit goes out in a follow-up batch
+    transcripts = {**TRANSCRIPTS, "third": "Operator: Welcome to the second quarter call. Guidance was raised."}
+    result = run(transcripts)
+    assert set(result["written"]) == set(transcripts) and not result["failures"]
+    sizes = sorted(len(batch["results"]) for batch in server.batches.values())
+    assert sizes == [1, 2, 3]  # the resumed batch, the follow-up and the article batch
+    assert not os.path.exists(state_path)
+
+
+def test_submit_batches_splits_by_request_count(api_server, monkeypatch):
+    server, client = api_server(batch_delay=0.1)
+    monkeypatch.setattr(backfill, "MAX_BATCH_REQUESTS", 2)
+    requests = {f"r{i}": {"model": "claude-test", "max_tokens": 8, "messages": [{"role": "user", "content": "hi"}]}
+                for i in range(5)}
+    batch_ids = backfill.submit_batches(client, requests)
+    assert len(batch_ids) == 3
+    batches = backfill.wait_for_batches(client, batch_ids, poll=0.05)
+    assert [batch.request_counts.succeeded for batch in batches] == [2, 2, 1]
+
+
+def test_split_batches_respects_the_size_limit(monkeypatch):
+    items = [{"custom_id": f"r{i}", "params": {"transcript": "x" * size}} for i, size in enumerate([400, 400, 900, 100])]
+    assert [len(batch) for batch in backfill.split_batches(items)] == [4]
+    monkeypatch.setattr(backfill, "MAX_BATCH_BYTES", 800)
+    # An oversized request still goes out, alone, for the API to report
+    assert [[item["custom_id"] for item in batch] for batch in backfill.split_batches(items)] == \
+        [["r0"], ["r1"], ["r2"], ["r3"]]
+    monkeypatch.setattr(backfill, "MAX_BATCH_BYTES", 1500)
+    assert [len(batch) for batch in backfill.split_batches(items)] == [2, 2]
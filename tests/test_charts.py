@@ -0,0 +1,75 @@
+import copy
+
+import pytest
+
+import charts
+import svg_charts
+from demo import DEMO_ARTICLE_DATA, DEMO_FINANCIAL_DATA
+from report import generate_email_html, generate_full_html_report
+
+
+def _with(**changes):
+    data = copy.deepcopy(DEMO_FINANCIAL_DATA)
+    for key, value in changes.items():
+        if value is None:
+            data.pop(key, None)
+        else:
+            data[key] = value
+    return data
+
+
+EDGE_CASES = {
+    "demo": DEMO_FINANCIAL_DATA,
+    "no segments": _with(segment_performance=[]),
+    "segments missing": _with(segment_performance=None),
+    "null segments": {**DEMO_FINANCIAL_DATA, "segment_performance": None},
+    "null history": {**DEMO_FINANCIAL_DATA, "historical_quarters": None},
+    "history with gaps": _with(historical_quarters=[
+        {"quarter": "Q3", "revenue": None, "eps": None},
+        {"quarter": "Q4", "revenue": 89500, "eps": 1.46},
+    ]),
+    "negative eps": _with(
+        current_quarter={**DEMO_FINANCIAL_DATA["current_quarter"], "eps": {"value": -0.12, "diluted": True}},
+        historical_quarters=[{"quarter": "Q3", "revenue": 80000, "eps": 0.05},
+                             {"quarter": "Q4", "revenue": 89500, "eps": -0.12}],
+        year_over_year={"revenue_change": 6.0, "eps_change": None, "net_income_change": -120.0},
+    ),
+    "null current quarter": {"company_name": "Contoso", "current_quarter": {"revenue": None, "eps": None},
+                             "historical_quarters": None, "year_over_year": None},
+    "empty": {},
+}
+
+
+@pytest.mark.parametrize("financial_data", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_specs_are_valid_plotly_figures(financial_data):
+    charts.validate_specs(financial_data)
+
+
+@pytest.mark.parametrize("financial_data", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_chart_html_renders(financial_data):
+    for name in charts.CHART_SPECS:
+        html = charts.chart_html(name, financial_data, full_html=False)
+        assert html is None or "Plotly.newPlot" in html
+
+
+def test_segment_chart_is_skipped_without_segments():
+    assert charts.segment_chart_spec(EDGE_CASES["no segments"]) is None
+    assert charts.chart_div("segment", EDGE_CASES["segments missing"]) is None
+
+
+def test_negative_eps_labels():
+    spec = charts.eps_chart_spec(EDGE_CASES["negative eps"])
+    assert spec["data"][0]["text"] == ["$0.05", "-$0.12"]
+
+
+@pytest.mark.parametrize("financial_data", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_svg_fallbacks_render(financial_data):
+    for name in svg_charts.SVG_CHARTS:
+        svg = svg_charts.chart_svg(name, financial_data)
+        assert svg is None or svg.startswith("<svg")
+
+
+def test_reports_render_with_null_segments():
+    financial_data = EDGE_CASES["null segments"]
+    assert "<svg" in generate_full_html_report(financial_data, DEMO_ARTICLE_DATA)
+    assert generate_email_html(financial_data, DEMO_ARTICLE_DATA)
@@ -0,0 +1,53 @@
+import os
+import time
+
+from checkpoints import CheckpointStore, STAGES, article_inputs, extract_inputs
+
+
+def test_run_computes_once_and_resumes(tmp_path):
+    checkpoints = CheckpointStore(str(tmp_path))
+    inputs = extract_inputs("transcript", "model")
+    calls = []
+
+    def extract():
+        calls.append(1)
+        return {"ticker": "AAPL"}
+
+    assert checkpoints.run("extract", inputs, extract) == ({"ticker": "AAPL"}, False)
+    assert checkpoints.run("extract", inputs, extract) == ({"ticker": "AAPL"}, True)
+    assert len(calls) == 1
+    # Changed inputs (here the prompt) don't reuse the output
+    assert checkpoints.get("extract", extract_inputs("transcript", "model", parallel=True)) is None
+
+
+def test_failed_stages_are_not_checkpointed(tmp_path):
+    checkpoints = CheckpointStore(str(tmp_path))
+    assert checkpoints.run("article", ("inputs",), lambda: None) == (None, False)
+    assert checkpoints.counts() == {stage: 0 for stage in STAGES}
+
+
+def test_complete_discards_every_checkpoint_of_the_run(tmp_path):
+    checkpoints = CheckpointStore(str(tmp_path))
+    run_inputs = {
+        "extract": extract_inputs("transcript", "model"),
+        "derive": ({"ticker": "AAPL"},),
+        "article": article_inputs({"ticker": "AAPL"}, "transcript", "claude", "model"),
+    }
+    for stage, inputs in run_inputs.items():
+        checkpoints.put(stage, inputs, {"stage": stage})
+    checkpoints.put("extract", extract_inputs("another transcript", "model"), {})
+
+    checkpoints.complete(run_inputs)
+    assert checkpoints.counts() == {"extract": 1, "derive": 0, "article": 0}
+
+
+def test_prune_removes_old_checkpoints(tmp_path):
+    checkpoints = CheckpointStore(str(tmp_path))
+    checkpoints.put("extract", ("old",), {})
+    checkpoints.put("extract", ("new",), {})
+    old_path = checkpoints._path("extract", ("old",))
+    month_ago = time.time() - 31 * 86400
+    os.utime(old_path, (month_ago, month_ago))
+
+    assert checkpoints.prune(max_age_days=30) == 1
+    assert not os.path.exists(old_path) and checkpoints.get("extract", ("new",)) == {}
@@ -0,0 +1,34 @@
+from dashboard import guidance_changes, report_frames
+
+
+def _record(report_id, quarter, fiscal_year, full_year_mid, created_at, ticker="AAPL"):
+    return {
+        "id": report_id,
+        "created_at": created_at,
+        "financial_data": {
+            "ticker": ticker, "quarter": quarter, "fiscal_year": fiscal_year,
+            "guidance": {"full_year_revenue": {"low": full_year_mid, "high": full_year_mid}},
+        },
+    }
+
+
+def test_guidance_changes_follow_fiscal_periods_not_save_times():
+    reports, _ = report_frames([
+        # Q2 was re-saved after Q3, so created_at order would compare Q2 against Q3
+        _record("q3", "Q3", "2024", 110, "2024-10-02"),
+        _record("q2", "Q2", "FY2024", 100, "2024-10-03"),
+        _record("q2-old", "Q2 FY24", "", 95, "2024-07-01"),
+        # A new fiscal year starts from fresh full-year guidance
+        _record("q1", "Q1", "2025", 90, "2025-01-30"),
+        _record("msft", "Q2", "2024", 200, "2024-10-01", ticker="MSFT"),
+        _record("undated", None, None, 50, "2024-10-04"),
+    ])
+    changes = guidance_changes(reports)
+    assert changes[["id", "period", "previous_mid", "current_mid", "change_pct", "action"]].to_dict("records") == [
+        {"id": "q3", "period": "FY2024Q3", "previous_mid": 100.0, "current_mid": 110.0,
+         "change_pct": 10.0, "action": "Raised"},
+    ]
+
+
+def test_guidance_changes_of_no_reports():
+    assert guidance_changes(report_frames([])[0]).empty
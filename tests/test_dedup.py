@@ -0,0 +1,57 @@
+import random
+
+from dedup import FingerprintIndex, diff_passages, fingerprint_transcript, normalize_transcript, similarity
+
+
+def _transcript(seed=0, lines=60):
+    words = ["revenue", "margin", "guidance", "growth", "services", "quarter", "demand", "record", "cloud", "supply"]
+    rng = random.Random(seed)
+    return "\n".join(f"Speaker {i % 3}: " + " ".join(rng.choice(words) for _ in range(15)) + f" {i}." for i in range(lines))
+
+
+def test_normalize_drops_labels_disclaimers_and_punctuation():
+    transcript = (
+        "[Sample - Replace with actual transcript]\n"
+        "Tim Cook, CEO: Revenue was $94.9 billion, up 6%!\n"
+        "This call contains forward-looking statements.\n"
+    )
+    assert normalize_transcript(transcript) == "revenue was 94.9 billion up 6"
+
+
+def test_reformatted_transcript_is_an_exact_duplicate():
+    transcript = _transcript()
+    reformatted = transcript.replace("Speaker", "Analyst").upper().replace("\n", "\n\n")
+    index = FingerprintIndex()
+    index.add("stored", *fingerprint_transcript(transcript))
+    match = index.query(*fingerprint_transcript(reformatted))
+    assert match.report_id == "stored" and match.similarity == 1.0
+
+
+def test_small_edits_match_and_unrelated_transcripts_do_not():
+    transcript = _transcript()
+    edited = transcript.replace("cloud", "cloudy", 1)
+    fingerprint, _ = fingerprint_transcript(transcript)
+    index = FingerprintIndex()
+    index.add("stored", fingerprint)
+
+    match = index.query(fingerprint_transcript(edited)[0])
+    assert match is not None and match.report_id == "stored" and match.similarity >= 0.9
+    assert index.query(fingerprint_transcript(_transcript(seed=1))[0]) is None
+    assert similarity(fingerprint, fingerprint) == 1.0
+
+
+def test_index_persists_and_skips_torn_lines(tmp_path):
+    path = str(tmp_path / "fingerprints.jsonl")
+    fingerprint, digest = fingerprint_transcript(_transcript())
+    FingerprintIndex(path).add("stored", fingerprint, digest)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "torn", "simh')
+
+    reloaded = FingerprintIndex(path)
+    assert len(reloaded) == 1
+    assert reloaded.query(fingerprint, digest).report_id == "stored"
+
+
+def test_diff_passages_lists_changed_lines():
+    changes = diff_passages("Revenue rose.\nMargins held.\n", "Revenue rose.\nMargins  fell.\n")
+    assert changes == [{"change": "replace", "previous": "Margins held.", "submitted": "Margins fell."}]
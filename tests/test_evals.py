@@ -0,0 +1,13 @@
+import pytest
+
+import evals
+
+
+@pytest.mark.parametrize("variant", evals.load_variants(evals.VARIANTS_FILE), ids=lambda v: v["name"])
+def test_recordings_replay_to_golden_answers(variant):
+    # The committed recordings answer each golden case with its expected data, so anything
+    # short of full accuracy is a regression in parsing, chunking, merging or scoring
+    results = evals.run_variant(variant, evals.load_golden(evals.GOLDEN_DIR))
+    summary = evals.summarize(variant, results)
+    assert summary["accuracy"] == 100.0, evals.field_accuracy(results)
+    assert summary["p50_latency"] > 0
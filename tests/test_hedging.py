@@ -0,0 +1,68 @@
+import time
+
+from hedging import Hedger, percentile
+
+
+def _primed(**options):
+    """Hedger that has seen enough quick calls to start hedging"""
+    hedger = Hedger(enabled=True, percentile=50, min_samples=3, **options)
+    for _ in range(3):
+        hedger.call("kind", lambda cancelled, first: "quick")
+    return hedger
+
+
+def _slow_first(cancelled_events):
+    def attempt(cancelled, first):
+        cancelled_events[first] = cancelled
+        if first:
+            cancelled.wait(5)
+            return "first"
+        return "hedge"
+    return attempt
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([1, 2, 3, 4], 95) == 4
+    assert percentile([7], 99) == 7
+
+
+def test_no_hedging_until_enough_calls_were_seen():
+    hedger = Hedger(enabled=True, min_samples=3)
+    assert hedger.call("kind", lambda cancelled, first: first) is True
+    assert hedger.hedge_delay("kind") is None
+    assert Hedger(enabled=False).hedge_delay("kind") is None
+
+
+def test_a_slow_call_is_hedged_and_the_loser_cancelled():
+    hedger = _primed(budget=1.0, burst=1)
+    cancelled = {}
+    start = time.monotonic()
+    assert hedger.call("kind", _slow_first(cancelled)) == "hedge"
+    assert time.monotonic() - start < 1
+    assert cancelled[True].is_set() and not cancelled[False].is_set()
+    report = hedger.report()
+    assert report["hedged"] == report["hedge_wins"] == 1
+    assert report["hedge_rate"] == 1 / 4
+
+
+def test_hedges_stay_within_budget_and_respect_allow():
+    hedger = _primed(budget=0.0, burst=0)
+    assert hedger.call("kind", lambda cancelled, first: time.sleep(0.05) or "first") == "first"
+    assert hedger.stats["over_budget"] == 1 and hedger.stats["hedged"] == 0
+
+    hedger = _primed(budget=1.0, burst=1)
+    assert hedger.call("kind", lambda cancelled, first: time.sleep(0.05) or "first", allow=lambda: False) == "first"
+    assert hedger.stats["busy"] == 1 and hedger.stats["hedged"] == 0
+
+
+def test_errors_fall_back_to_the_other_attempt():
+    hedger = _primed(budget=1.0, burst=1)
+
+    def attempt(cancelled, first):
+        if first:
+            time.sleep(0.05)
+            raise RuntimeError("connection reset")
+        return "hedge"
+
+    assert hedger.call("kind", attempt) == "hedge"
@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from benchmarks import COLD_START_SCRIPTS, HEADLESS_MODULES, IMPORT_BUDGETS, cold_start_time, heavy_imports
+
+
+@pytest.mark.parametrize("module", HEADLESS_MODULES)
+def test_headless_module_imports_no_heavy_dependencies(module):
+    assert heavy_imports(module) == []
+
+
+@pytest.mark.skipif(not os.environ.get("NEWSMAKER_IMPORT_BUDGETS"),
+                    reason="wall-clock budget; set NEWSMAKER_IMPORT_BUDGETS=1 or run python benchmarks.py imports")
+@pytest.mark.parametrize("name", list(COLD_START_SCRIPTS))
+def test_cold_start_within_budget(name):
+    elapsed = cold_start_time(name)
+    assert elapsed <= IMPORT_BUDGETS[name], (
+        f"{name} took {elapsed * 1000:.0f} ms, over its {IMPORT_BUDGETS[name] * 1000:.0f} ms budget"
+    )
@@ -0,0 +1,62 @@
+import copy
+
+from metrics import apply_derived_metrics, derive_batch, strip_derived
+
+
+def _report(revenue=110.0, prior_year=100.0, eps=1.5, eps_estimate=1.4, **extra):
+    return {
+        "current_quarter": {"revenue": {"value": revenue}, "eps": {"value": eps}},
+        "prior_year_quarter": {"revenue": prior_year},
+        "estimates": {"revenue_estimate": 112.0, "eps_estimate": eps_estimate},
+        "guidance": {"next_quarter_revenue": {"low": 100, "high": 120}},
+        **extra,
+    }
+
+
+def test_derived_metrics_are_computed_from_raw_numbers():
+    financial_data, flags = apply_derived_metrics(_report())
+    assert financial_data["year_over_year"]["revenue_change"] == 10.0
+    assert financial_data["estimates"]["revenue_beat"] is False
+    assert financial_data["estimates"]["eps_beat"] is True
+    assert financial_data["estimates"]["revenue_surprise_pct"] == -1.8
+    assert financial_data["guidance"]["next_quarter_revenue"]["mid"] == 110.0
+    assert flags == []
+
+
+def test_missing_or_zero_inputs_keep_the_extracted_values():
+    report = _report(prior_year=0.0, eps_estimate=None, year_over_year={"revenue_change": 7.0})
+    financial_data, _ = apply_derived_metrics(report)
+    assert financial_data["year_over_year"]["revenue_change"] == 7.0
+    assert "eps_beat" not in financial_data["estimates"]
+    # In line with the estimate is neither a beat nor a miss
+    in_line, _ = apply_derived_metrics(_report(eps=1.4))
+    assert "eps_beat" not in in_line["estimates"]
+
+
+def test_disagreements_with_the_llm_are_flagged():
+    report = _report(year_over_year={"revenue_change": 25.0, "eps_change": None})
+    report["estimates"]["revenue_beat"] = True
+    _, flags = apply_derived_metrics(report)
+    assert {(f["field"], f["reported"], f["derived"]) for f in flags} == {
+        ("yoy_revenue_change", 25.0, 10.0),
+        ("revenue_beat", True, False),
+    }
+    # Within tolerance is not a disagreement
+    _, flags = apply_derived_metrics(_report(year_over_year={"revenue_change": 10.3}))
+    assert flags == []
+
+
+def test_batches_and_previous_quarter_from_history():
+    reports = [_report(), _report(historical_quarters=[{"quarter": "Q3", "revenue": 100.0}, {"quarter": "Q4", "revenue": 110.0}])]
+    derived, flags = derive_batch(reports)
+    assert derived["qoq_revenue_change"].isna().tolist() == [True, False]
+    assert derived.loc[1, "qoq_revenue_change"] == 10.0
+    assert flags.empty
+
+
+def test_strip_derived_drops_only_recomputable_fields():
+    financial_data, _ = apply_derived_metrics(_report(year_over_year={"eps_change": 3.0}))
+    stripped = strip_derived(financial_data)
+    assert "revenue_change" not in stripped["year_over_year"]
+    assert stripped["year_over_year"]["eps_change"] == 3.0
+    assert financial_data == apply_derived_metrics(copy.deepcopy(stripped))[0]
@@ -0,0 +1,56 @@
+import copy
+import os
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from demo import DEMO_ARTICLE_DATA, DEMO_FINANCIAL_DATA
+from parquet_archive import ParquetArchive
+from store import ReportStore
+
+
+def _save(store, report_id, **fields):
+    financial_data = {**copy.deepcopy(DEMO_FINANCIAL_DATA), **fields}
+    return store.save(report_id, financial_data, DEMO_ARTICLE_DATA, report_id=report_id)
+
+
+@pytest.fixture
+def archive_and_store(tmp_path):
+    return ParquetArchive(str(tmp_path / "archive")), ReportStore(str(tmp_path / "data"))
+
+
+def test_sync_is_incremental_and_normalizes_tickers(archive_and_store):
+    archive, store = archive_and_store
+    _save(store, "a", ticker="aapl", quarter="Q4", fiscal_year="2024")
+    assert archive.sync(store) == 1
+    assert archive.sync(store) == 0
+
+    frame = archive.read(columns=["id", "ticker"], tickers=["aapl"])
+    assert frame.to_dict("records") == [{"id": "a", "ticker": "AAPL"}]
+    assert set(archive.read("segments", columns=["ticker"])["ticker"]) == {"AAPL"}
+
+
+def test_corrected_period_leaves_no_stale_rows(archive_and_store):
+    archive, store = archive_and_store
+    _save(store, "a", quarter="Q4", fiscal_year="2024")
+    archive.sync(store)
+    _save(store, "a", quarter="Q3", fiscal_year="2024")
+    assert archive.sync(store) == 1
+
+    assert archive.read(columns=["id"], periods=["FY2024Q4"]).empty
+    assert archive.read("segments", columns=["id"], periods=["FY2024Q4"]).empty
+    assert list(archive.read(columns=["period"])["period"]) == ["FY2024Q3"]
+    archive.compact(min_files=1)
+    assert list(archive.read(columns=["period"])["period"]) == ["FY2024Q3"]
+
+
+def test_deleted_reports_are_removed(archive_and_store):
+    archive, store = archive_and_store
+    _save(store, "a", quarter="Q4", fiscal_year="2024")
+    _save(store, "b", quarter="Q4", fiscal_year="2024")
+    archive.sync(store)
+    os.remove(os.path.join(store.reports_dir, "a.json"))
+    archive.sync(store)
+
+    assert list(archive.read(columns=["id"])["id"]) == ["b"]
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pytest
+
+import ratelimit
+from demo import DEMO_ARTICLE_DATA
+from ratelimit import RateLimiter, TokenBucket, create_message, retry_delay
+
+
+REQUEST = {"model": "claude-test", "max_tokens": 64, "messages": [{"role": "user", "content": "Write a headline"}]}
+
+
+def _send(client):
+    return lambda: client.messages.with_raw_response.create(**REQUEST)
+
+
+def test_token_bucket_refills_continuously():
+    bucket = TokenBucket(60)
+    bucket.updated = 100.0
+    bucket.take(60, now=100.0)
+    assert bucket.wait_time(1, now=100.0) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now=100.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now=101.0) == 0
+    # Amounts over capacity wait for a full bucket rather than forever
+    assert bucket.wait_time(600, now=101.0) == pytest.approx(59.0)
+
+
+def test_retry_delay_honours_retry_after(monkeypatch):
+    monkeypatch.setattr(ratelimit, "BASE_BACKOFF", 0.0)
+    assert retry_delay(0, {"retry-after": "3"}) == 3.0
+    assert retry_delay(0, {"retry-after": "3600"}) == ratelimit.MAX_BACKOFF
+
+
+def test_calls_are_paced_to_the_request_budget(api_server):
+    server, client = api_server(requests_per_minute=600)
+    limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10 ** 6)
+    limiter.requests.level = 0  # 10 requests a second from here on
+
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.call(_send(client), tokens=100)
+    assert time.monotonic() - start >= 0.45
+    assert server.counts["ok"] == 5 and server.counts["rate_limited"] == 0
+
+
+def test_rate_limit_headers_sync_the_buckets(api_server):
+    server, client = api_server(requests_per_minute=30, tokens_per_minute=5000)
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=10 ** 6)
+    limiter.call(_send(client), tokens=100)
+    assert limiter.requests.capacity == 30 and limiter.tokens.capacity == 5000
+    assert limiter.requests.level <= 29
+
+
+def test_429_waits_for_retry_after_then_succeeds(api_server, monkeypatch):
+    monkeypatch.setattr(ratelimit, "BASE_BACKOFF", 0.0)
+    server, client = api_server(requests_per_minute=600)
+    server.limits.requests.level = -5  # overspent for the next 0.6 s: 429 with retry-after: 1
+    limiter = RateLimiter(requests_per_minute=10000, tokens_per_minute=10 ** 6)
+
+    start = time.monotonic()
+    response = limiter.call(_send(client), tokens=100)
+    assert time.monotonic() - start >= 1.0
+    assert response.parse().content[0].text == DEMO_ARTICLE_DATA["headline"]
+    assert server.counts == {"ok": 1, "rate_limited": 1, "overloaded": 0}
+    assert limiter.stats["rate_limited"] == 1 and limiter.stats["calls"] == 1
+
+
+def test_429_pauses_the_whole_queue(api_server, monkeypatch):
+    monkeypatch.setattr(ratelimit, "BASE_BACKOFF", 0.0)
+    server, client = api_server(requests_per_minute=600)
+    server.limits.requests.level = -5
+    limiter = RateLimiter(requests_per_minute=10000, tokens_per_minute=10 ** 6)
+
+    first = threading.Thread(target=limiter.call, args=(_send(client), 100))
+    first.start()
+    while not limiter.blocked_until:
+        time.sleep(0.01)
+    start = time.monotonic()
+    limiter.call(_send(client), tokens=100, session="other")
+    assert time.monotonic() - start >= 0.5
+    first.join()
+    assert server.counts["rate_limited"] == 1 and server.counts["ok"] == 2
+
+
+def test_overloaded_errors_give_up_after_max_retries(api_server, monkeypatch):
+    monkeypatch.setattr(ratelimit, "BASE_BACKOFF", 0.01)
+    server, client = api_server(overload=1.0)
+    limiter = RateLimiter(max_retries=2)
+    with pytest.raises(Exception) as error:
+        limiter.call(_send(client), tokens=100)
+    assert getattr(error.value, "status_code", None) == 529
+    assert server.counts["overloaded"] == 3 and limiter.stats["overloaded"] == 2
+
+
+def test_create_message_goes_through_the_limiter(api_server, monkeypatch):
+    server, client = api_server()
+    limiter = RateLimiter()
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda: limiter)
+    message = create_message(client, **REQUEST)
+    assert message.content[0].text == DEMO_ARTICLE_DATA["headline"]
+    assert limiter.stats["calls"] == 1 and server.counts["ok"] == 1
@@ -0,0 +1,22 @@
+import copy
+
+from demo import DEMO_ARTICLE_DATA, DEMO_FINANCIAL_DATA
+from report import generate_full_html_report, generate_metrics_csv
+
+
+def _without_consensus():
+    financial_data = copy.deepcopy(DEMO_FINANCIAL_DATA)
+    financial_data["estimates"] = {"revenue_estimate": None, "eps_estimate": None}
+    return financial_data
+
+
+def test_missing_estimates_show_na_in_html_report():
+    html = generate_full_html_report(_without_consensus(), DEMO_ARTICLE_DATA)
+    assert "$0M" not in html and "$0.00" not in html
+    assert "<td>N/A</td>" in html
+
+
+def test_missing_estimates_show_na_in_csv():
+    rows = generate_metrics_csv(_without_consensus()).splitlines()
+    assert rows[1].split(",")[2] == "N/A"
+    assert rows[2].split(",")[2] == "N/A"
@@ -0,0 +1,39 @@
+import copy
+
+import ratelimit
+from demo import DEMO_ARTICLE_DATA, DEMO_FINANCIAL_DATA
+from sections import (
+    affected_sections, changed_fields, flatten_fields, regenerate_sections, unflatten_fields
+)
+
+
+def test_flatten_round_trips_nested_data():
+    fields = flatten_fields(DEMO_FINANCIAL_DATA)
+    assert "current_quarter.revenue.value" in fields
+    assert "segment_performance.0.segment" in fields
+    assert unflatten_fields(fields) == DEMO_FINANCIAL_DATA
+
+
+def test_an_edited_number_only_touches_the_sections_written_from_it():
+    edited = copy.deepcopy(DEMO_FINANCIAL_DATA)
+    edited["segment_performance"][0]["revenue"] += 1
+    changed = changed_fields(DEMO_FINANCIAL_DATA, edited)
+    assert changed == ["segment_performance.0.revenue"]
+    assert affected_sections(changed) == ["subheadline", "segment_details"]
+
+    edited["guidance"] = {"revenue": "raised"}
+    assert "outlook" in affected_sections(changed_fields(DEMO_FINANCIAL_DATA, edited))
+    # Prefixes match whole path components only
+    assert affected_sections(["tickers"]) == []
+
+
+def test_regenerate_sections_replaces_only_the_requested_sections(api_server, monkeypatch):
+    server, client = api_server()
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda: ratelimit.RateLimiter())
+    article = {**DEMO_ARTICLE_DATA, "lead": "old lead", "outlook": "old outlook"}
+
+    updated = regenerate_sections(client, DEMO_FINANCIAL_DATA, article, ["lead", "outlook", "not_a_section"])
+    assert updated["lead"] == updated["outlook"] == DEMO_ARTICLE_DATA["headline"]
+    assert {key: value for key, value in updated.items() if key not in ("lead", "outlook")} == \
+        {key: value for key, value in article.items() if key not in ("lead", "outlook")}
+    assert server.counts["ok"] == 2
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from singleflight import SingleFlight
+
+
+def _start(flight, key, fn, outcomes, **options):
+    """Call flight.do in a thread, appending its result or exception to outcomes"""
+    def run():
+        try:
+            outcomes.append(flight.do(key, fn, **options))
+        except BaseException as exc:
+            outcomes.append(exc)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _lead_and_follow(fn, follower_fn=None):
+    """(leader outcomes, follower outcomes) with the follower joining while fn runs"""
+    flight, release, joined = SingleFlight(), threading.Event(), threading.Event()
+    leader_outcomes, follower_outcomes = [], []
+
+    def held():
+        release.wait(5)
+        return fn()
+
+    leader = _start(flight, "key", held, leader_outcomes)
+    while not flight.in_flight("key"):
+        time.sleep(0.001)
+    follower = _start(flight, "key", follower_fn or fn, follower_outcomes, on_join=joined.set)
+    assert joined.wait(5)
+    release.set()
+    leader.join()
+    follower.join()
+    assert not flight.in_flight("key")
+    return leader_outcomes, follower_outcomes
+
+
+def test_concurrent_callers_share_one_execution():
+    calls = []
+
+    def work():
+        calls.append(1)
+        return "report"
+
+    assert _lead_and_follow(work) == ([("report", False)], [("report", True)])
+    assert len(calls) == 1
+
+
+def test_followers_reraise_the_leaders_error():
+    def work():
+        raise ValueError("extraction failed")
+
+    (leader_error,), (follower_error,) = _lead_and_follow(work)
+    assert isinstance(leader_error, ValueError) and follower_error is leader_error
+
+
+def test_a_follower_takes_over_from_a_cancelled_leader():
+    def cancelled():
+        raise KeyboardInterrupt()
+
+    (leader_error,), follower_outcomes = _lead_and_follow(cancelled, lambda: "rerun")
+    assert isinstance(leader_error, KeyboardInterrupt)
+    assert follower_outcomes == [("rerun", False)]
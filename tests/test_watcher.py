@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+
+import pytest
+
+import dedup
+import ratelimit
+from checkpoints import CheckpointStore
+from demo import DEMO_ARTICLE_DATA, DEMO_FINANCIAL_DATA
+from store import ReportStore
+from watcher import MANIFEST_FILE, WatchFolder, publish_transcript, watch_paths
+
+
+TRANSCRIPT = "Operator: Welcome to the fourth quarter earnings call. Revenue grew twelve percent."
+
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def _fake_publish(calls, fail=()):
+    def publish(transcript):
+        calls.append(transcript)
+        if transcript in fail:
+            raise ValueError("could not extract financial data")
+        return "report-id", DEMO_FINANCIAL_DATA, DEMO_ARTICLE_DATA
+    return publish
+
+
+def test_publish_transcript_stores_the_report_and_clears_checkpoints(tmp_path, api_server, monkeypatch):
+    server, client = api_server()
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda: ratelimit.RateLimiter())
+    store, checkpoints, index = ReportStore(str(tmp_path)), CheckpointStore(str(tmp_path)), dedup.FingerprintIndex()
+
+    report_id, financial_data, article_data = publish_transcript(
+        client, TRANSCRIPT, store, index, checkpoints, writer="template")
+    assert store.load(report_id)["article_data"] == article_data
+    assert financial_data["ticker"] == DEMO_FINANCIAL_DATA["ticker"]
+    assert index.query(*dedup.fingerprint_transcript(TRANSCRIPT)).report_id == report_id
+    assert set(checkpoints.counts().values()) == {0}
+
+
+def test_watch_folder_publishes_each_content_once(tmp_path):
+    watch_dir, out_dir = str(tmp_path / "in"), str(tmp_path / "out")
+    os.makedirs(watch_dir)
+    paths = [
+        _write(watch_dir, "a.txt", "first transcript"),
+        _write(watch_dir, "copy-of-a.txt", "first transcript"),
+        _write(watch_dir, "b.txt", "second transcript"),
+        _write(watch_dir, "notes.md", "not a transcript"),
+        _write(watch_dir, "empty.txt", "  "),
+    ]
+    calls = []
+    folder = WatchFolder(watch_dir, out_dir, _fake_publish(calls, fail={"second transcript"}))
+    folder.run(paths, threading.Event())
+
+    assert sorted(calls) == ["first transcript", "second transcript"]
+    with open(os.path.join(out_dir, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    statuses = sorted((entry["file"], entry["status"]) for entry in manifest.values())
+    assert statuses == [("a.txt", "published"), ("b.txt", "failed")]
+    published = next(entry for entry in manifest.values() if entry["status"] == "published")
+    assert all(os.path.exists(os.path.join(out_dir, name)) for name in published["outputs"])
+    assert folder.latency_summary()["count"] == 1
+
+    # After a restart only the failed transcript is tried again
+    calls.clear()
+    WatchFolder(watch_dir, out_dir, _fake_publish(calls)).run(paths, threading.Event())
+    assert calls == ["second transcript"]
+
+
+@pytest.mark.parametrize("use_inotify", [True, False], ids=["inotify", "polling"])
+def test_watch_paths_reports_existing_and_new_files(tmp_path, use_inotify):
+    existing = _write(str(tmp_path), "existing.txt", "already here")
+    stop = threading.Event()
+    _, paths = watch_paths(str(tmp_path), stop, poll=0.05, use_inotify=use_inotify)
+    assert next(paths) == existing
+
+    new = _write(str(tmp_path), "new.txt", "just arrived")
+    assert next(paths) == new
+    stop.set()
+    paths.close()
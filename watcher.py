@@ -0,0 +1,324 @@
+"""
+Watch Folder
+Long-running daemon that picks up transcripts as the vendor drops them into a
+directory and runs each new or changed file through the extraction and
+article pipeline, a few at a time. The report HTML and JSON are written to an
+output directory next to a manifest of processed content hashes, so a restart
+skips everything already published, and the latency from a file's arrival to
+its published HTML is recorded per file
+
+Uses inotify on Linux and falls back to polling elsewhere (or with --poll-only)
+
+Usage: python watcher.py WATCH_DIR [--out DIR] [--data-dir DIR] [--workers 2] [--writer claude|template] [--site DIR]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import dedup
+from checkpoints import CheckpointStore, article_inputs, extract_inputs
+from consensus import ConsensusStore, attach_consensus
+from hedging import percentile
+from pipeline import MODEL, create_client, extract_financial_data, generate_news_article
+from store import ReportStore, DEFAULT_DATA_DIR, transcript_hash, write_json_atomic
+
+
+MANIFEST_FILE = "manifest.json"
+POLL_SECONDS = 2.0
+DEFAULT_WORKERS = 2
+
+IN_CLOSE_WRITE = 0x0008
+IN_MOVED_TO = 0x0080
+IN_Q_OVERFLOW = 0x4000
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _scan(directory):
+    with os.scandir(directory) as entries:
+        return sorted(entry.path for entry in entries if entry.is_file())
+
+
+def _open_inotify(directory):
+    """inotify descriptor watching directory for finished writes and moves-in, or None if unavailable"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _inotify_paths(fd, directory, stop, poll):
+    try:
+        # The watch is already in place, so nothing written from here on is missed
+        yield from _scan(directory)
+        while not stop.is_set():
+            if not select.select([fd], [], [], poll)[0]:
+                continue
+            data = os.read(fd, 65536)
+            offset = 0
+            while offset < len(data):
+                _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b"\0")
+                offset += _INOTIFY_EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    yield from _scan(directory)
+                elif name:
+                    yield os.path.join(directory, os.fsdecode(name))
+    finally:
+        os.close(fd)
+
+
+def _polled_paths(directory, stop, poll):
+    """Files whose size and mtime held still across two scans (so half-written files wait)"""
+    published, candidates = {}, {}
+    while True:
+        for path in _scan(directory):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if published.get(path) == signature:
+                continue
+            if candidates.get(path) == signature:
+                published[path] = signature
+                yield path
+            candidates[path] = signature
+        if stop.wait(poll):
+            return
+
+
+def watch_paths(directory, stop, poll=POLL_SECONDS, use_inotify=True):
+    """(mode, generator of paths that are new or were rewritten), starting with the files already there
+
+    A path can come up more than once; callers dedupe by content.
+    """
+    fd = _open_inotify(directory) if use_inotify else None
+    if fd is None:
+        return "polling", _polled_paths(directory, stop, poll)
+    return "inotify", _inotify_paths(fd, directory, stop, poll)
+
+
+def publish_transcript(client, transcript, store, index, checkpoints, consensus=None, writer="claude"):
+    """Checkpointed extract, derive and article for one transcript, stored like interactive runs
+
+    Returns (report_id, financial_data, article_data); raises ValueError when a
+    stage produces nothing usable (completed stages stay checkpointed until
+    the report is stored).
+    """
+    from metrics import apply_derived_metrics
+    from nlg import write_article
+
+    run_inputs = {"extract": extract_inputs(transcript, MODEL)}
+    financial_data, _ = checkpoints.run("extract", run_inputs["extract"],
+                                        lambda: extract_financial_data(client, transcript))
+    if not financial_data:
+        raise ValueError("could not extract financial data")
+    financial_data = attach_consensus(financial_data, consensus)
+    run_inputs["derive"] = (financial_data,)
+    derived, _ = checkpoints.run("derive", run_inputs["derive"], lambda: dict(zip(
+        ("financial_data", "metric_flags"), apply_derived_metrics(financial_data)
+    )))
+    financial_data = derived["financial_data"]
+    run_inputs["article"] = article_inputs(financial_data, transcript, writer, MODEL)
+    article_data, _ = checkpoints.run(
+        "article", run_inputs["article"],
+        lambda: write_article(financial_data) if writer == "template" else
+        generate_news_article(client, financial_data, transcript)
+    )
+    if not article_data:
+        raise ValueError("could not generate the article")
+
+    report_id = store.save(transcript, financial_data, article_data)
+    checkpoints.complete(run_inputs)
+    index.add(report_id, *dedup.fingerprint_transcript(transcript))
+    return report_id, financial_data, article_data
+
+
+class WatchFolder:
+    """Processes transcripts from watch_dir with bounded concurrency, publishing to out_dir
+
+    The manifest maps each content hash to its source file, report id,
+    outputs, status and timings. Hashes already published are skipped, and
+    failed ones are retried when the file changes or the daemon restarts.
+    """
+
+    def __init__(self, watch_dir, out_dir, publish, workers=DEFAULT_WORKERS, pattern="*.txt", on_published=None):
+        self.watch_dir = watch_dir
+        self.out_dir = out_dir
+        self.publish = publish
+        self.pattern = pattern
+        self.on_published = on_published
+        self.workers = workers
+        self.manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self.latencies = []
+        self._in_flight = set()
+        self._lock = threading.Lock()
+        # At most one queued file per worker beyond those running, so a burst doesn't pile up in memory
+        self._slots = threading.BoundedSemaphore(workers * 2)
+
+    def _save_manifest(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        write_json_atomic(self.manifest_path, self.manifest)
+
+    def _claim(self, path):
+        """(content hash, transcript, arrival time) if this file needs processing, else None"""
+        try:
+            arrived = os.stat(path).st_mtime
+            with open(path, encoding="utf-8", errors="replace") as f:
+                transcript = f.read()
+        except FileNotFoundError:
+            return None
+        if not transcript.strip():
+            return None
+        content = transcript_hash(transcript)
+        with self._lock:
+            if content in self._in_flight or self.manifest.get(content, {}).get("status") == "published":
+                return None
+            self._in_flight.add(content)
+        return content, transcript, arrived
+
+    def _process(self, path, content, transcript, arrived):
+        entry = {"file": os.path.basename(path), "arrived_at": datetime.fromtimestamp(arrived).isoformat()}
+        try:
+            report_id, financial_data, article_data = self.publish(transcript)
+            from report import generate_full_html_report, generate_json_export
+
+            stem = os.path.splitext(os.path.basename(path))[0]
+            os.makedirs(self.out_dir, exist_ok=True)
+            outputs = {
+                f"{stem}.html": generate_full_html_report(financial_data, article_data),
+                f"{stem}.json": generate_json_export(financial_data, article_data),
+            }
+            for name, text in outputs.items():
+                tmp_path = os.path.join(self.out_dir, f"{name}.{threading.get_ident()}.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, os.path.join(self.out_dir, name))
+            published = time.time()
+            entry.update({
+                "status": "published", "report_id": report_id, "outputs": sorted(outputs),
+                "ticker": financial_data.get('ticker'), "headline": article_data.get('headline'),
+                "published_at": datetime.fromtimestamp(published).isoformat(),
+                "latency": round(published - arrived, 3),
+            })
+        except Exception as exc:
+            entry.update({"status": "failed", "error": f"{type(exc).__name__}: {exc}"})
+        finally:
+            with self._lock:
+                self._in_flight.discard(content)
+                self.manifest[content] = entry
+                if entry.get("status") == "published":
+                    self.latencies.append(entry["latency"])
+                self._save_manifest()
+            self._slots.release()
+        if self.on_published:
+            self.on_published(entry)
+
+    def run(self, paths, stop):
+        """Process every matching path from the iterable until it ends or stop is set"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="watch") as executor:
+            for path in paths:
+                if stop.is_set():
+                    break
+                if not fnmatch.fnmatch(os.path.basename(path), self.pattern):
+                    continue
+                claimed = self._claim(path)
+                if claimed is None:
+                    continue
+                self._slots.acquire()
+                executor.submit(self._process, path, *claimed)
+
+    def latency_summary(self):
+        """Arrival-to-published latency over this run: count, p50, p95 and max seconds"""
+        if not self.latencies:
+            return None
+        return {"count": len(self.latencies), "p50": percentile(self.latencies, 50),
+                "p95": percentile(self.latencies, 95), "max": max(self.latencies)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process transcripts as they arrive in a directory")
+    parser.add_argument("watch_dir")
+    parser.add_argument("--out", help="directory for report HTML/JSON and the manifest (default WATCH_DIR/published)")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="transcripts processed at once")
+    parser.add_argument("--writer", choices=["claude", "template"], default="claude")
+    parser.add_argument("--pattern", default="*.txt")
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="seconds between directory scans when polling")
+    parser.add_argument("--poll-only", action="store_true", help="don't use inotify")
+    parser.add_argument("--site", help="also rebuild the static site in this directory after each report")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise SystemExit("Set ANTHROPIC_API_KEY")
+
+    client = create_client(api_key)
+    store = ReportStore(args.data_dir)
+    index = dedup.FingerprintIndex(os.path.join(args.data_dir, "fingerprints.jsonl"))
+    checkpoints = CheckpointStore(args.data_dir)
+    consensus = ConsensusStore(args.data_dir)
+    site_lock = threading.Lock()
+
+    def on_published(entry):
+        if entry["status"] != "published":
+            print(f"{time.strftime('%H:%M:%S')}  FAILED {entry['file']}: {entry['error']}")
+            return
+        print(f"{time.strftime('%H:%M:%S')}  {entry['file']} -> {entry['ticker'] or '?'} "
+              f"({entry['latency']:.1f}s after arrival)")
+        if args.site:
+            from sitegen import build_site
+            with site_lock:
+                build_site(store, args.site)
+
+    daemon = WatchFolder(
+        args.watch_dir, args.out or os.path.join(args.watch_dir, "published"),
+        lambda transcript: publish_transcript(client, transcript, store, index, checkpoints, consensus, args.writer),
+        workers=args.workers, pattern=args.pattern, on_published=on_published,
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    mode, paths = watch_paths(args.watch_dir, stop, args.poll, use_inotify=not args.poll_only)
+    print(f"Watching {args.watch_dir} ({mode}, {args.workers} worker(s)); "
+          f"{sum(e.get('status') == 'published' for e in daemon.manifest.values())} transcript(s) already published")
+    daemon.run(paths, stop)
+
+    summary = daemon.latency_summary()
+    if summary:
+        print(f"Published {summary['count']} transcript(s); arrival to HTML p50 {summary['p50']:.1f}s, "
+              f"p95 {summary['p95']:.1f}s, max {summary['max']:.1f}s")
+
+        from parquet_archive import ParquetArchive, ARCHIVE_DIR
+        archive = ParquetArchive(os.path.join(args.data_dir, ARCHIVE_DIR))
+        print(f"Archived {archive.sync(store)} report(s) to {archive.root}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())